@@ -19,10 +19,19 @@
 # %%
 import numpy as np
 import pandas as pd
-import missingno as msno
 import matplotlib.pyplot as plt
 from IPython.display import display
 
+from pipeline import config, figures, nullity, plots, runlog
+from pipeline.clickstreams import replace_with_nan
+from pipeline.profiling import DataProfile
+from pipeline.reports import render_unique_values_summary
+from pipeline.rules import evaluate as evaluate_rules, normalize_gender
+from pipeline.users import load_users, merge_categories
+
+# Laufprotokoll der Schritte (scripts/outputs/run_log.jsonl)
+runlog.enable()
+
 # %% [markdown]
 # # Datenaufbereitung und Fehleranalyse: user.csv
 #
@@ -43,7 +52,7 @@ from IPython.display import display
 
 # %%
 # Daten laden
-df_user_raw = pd.read_csv('data/user.csv')
+df_user_raw = load_users()
 df_user = df_user_raw.copy()
 
 rows_initial = len(df_user)
@@ -62,58 +71,41 @@ df_user.describe()
 
 # %% [markdown]
 # ## 2. Prüfung auf Duplikate
+#
+# Alle Prüfregeln (Duplikate, Datumsreihenfolge, user_gender, Alter, first_booking_date ↔ destination_country; siehe `pipeline/rules.py`) werden hier in einem Durchlauf ausgewertet. Die folgenden Abschnitte lesen Anzahlen und Beispiele aus diesem Ergebnis; die betroffenen Zeilen werden einmalig am Ende von Abschnitt 6 entfernt.
+
+# %%
+validation = evaluate_rules(df_user)
+validation.summary()
 
 # %%
 # Ganze Zeilen
-num_duplicates = df_user.duplicated().sum()
+num_duplicates = validation.count('duplicates')
 print(f"Anzahl der Duplikate: {num_duplicates}")
 
 if num_duplicates > 0:
     print(f"\nBeispiele für Duplikate:")
-    display(df_user[df_user.duplicated(keep=False)].head())
-    
-    # Duplikate entfernen
-    df_user = df_user.drop_duplicates()
-    print(f"\n{num_duplicates} Duplikate wurden entfernt")
-    print(f"Neue Anzahl der Zeilen: {len(df_user)}")
+    display(validation.examples(df_user, 'duplicates'))
+    print(f"\n{num_duplicates} Duplikate werden entfernt")
+    print(f"Neue Anzahl der Zeilen: {validation.keep_mask(through='duplicates').sum()}")
 
 # %%
 # Nur user_id
-num_duplicates_user_id = df_user['user_id'].duplicated().sum()
+num_duplicates_user_id = df_user.loc[validation.keep_mask(through='duplicates'), 'user_id'].duplicated().sum()
 print(f"\nAnzahl der Duplikate in 'user_id': {num_duplicates_user_id}")
 
 # %% [markdown]
 # ## 3. Konvertierung von Datumsangaben
 #
-# Die Datumsfelder werden in datetime-Format konvertiert:
+# Die Datumsfelder werden bereits beim Laden (`load_users`) als datetime dekodiert:
 # - `first_active_timestamp` -> datetime (in-place) + neues Feld `first_active_date` (nur Datum)
 # - `account_created_date` -> datetime (in-place)
 # - `first_booking_date` -> datetime (in-place)
 
 # %%
-# Datumskonvertierung
-# first_active_timestamp konvertieren und first_active_date erstellen
-df_user['first_active_timestamp'] = pd.to_datetime(
-    df_user['first_active_timestamp'], 
-    format='%Y%m%d%H%M%S', 
-    errors='coerce'
-)
+# first_active_date aus first_active_timestamp erstellen
 df_user['first_active_date'] = df_user['first_active_timestamp'].dt.normalize()
 
-# account_created_date konvertieren
-df_user['account_created_date'] = pd.to_datetime(
-    df_user['account_created_date'], 
-    format='%Y-%m-%d', 
-    errors='coerce'
-)
-
-# first_booking_date konvertieren
-df_user['first_booking_date'] = pd.to_datetime(
-    df_user['first_booking_date'], 
-    format='%Y-%m-%d', 
-    errors='coerce'
-)
-
 print("Datumsbereiche:")
 print(f"  first_active_timestamp: {df_user['first_active_timestamp'].min()} bis {df_user['first_active_timestamp'].max()}")
 print(f"  account_created_date: {df_user['account_created_date'].min()} bis {df_user['account_created_date'].max()}")
@@ -127,29 +119,17 @@ print(f"  first_booking_date: {df_user['first_booking_date'].min()} bis {df_user
 # Zeilen mit Fehlern werden identifiziert und entfernt.
 
 # %%
-# Fehlerhafte Datumsreihenfolge identifizieren
-# first_active_date > account_created_date
-error1 = (df_user['first_active_date'] > df_user['account_created_date'])
-
-# account_created_date > first_booking_date  
-error2 = (df_user['first_booking_date'].notna()) & \
-         (df_user['account_created_date'] > df_user['first_booking_date'])
-
-# Kombinierte Fehlermaske
-date_errors = error1 | error2
-
-num_date_errors = date_errors.sum()
+# Fehlerhafte Datumsreihenfolge (aus der Regelauswertung)
+num_date_errors = validation.count('active_after_created', 'created_after_booking')
 print(f"Anzahl der Zeilen mit fehlerhafter Datumsreihenfolge: {num_date_errors}")
-print(f"  - first_active_date > account_created_date: {error1.sum()}")
-print(f"  - account_created_date > first_booking_date: {error2.sum()}")
+print(f"  - first_active_date > account_created_date: {validation.count('active_after_created')}")
+print(f"  - account_created_date > first_booking_date: {validation.count('created_after_booking')}")
 
 if num_date_errors > 0:
     print(f"\nBeispiele für fehlerhafte Datumsreihenfolge:")
-    display(df_user[date_errors][['user_id', 'first_active_date', 'account_created_date', 'first_booking_date']].head())
-    
-    # Fehlerhafte Zeilen entfernen
-    df_user = df_user[~date_errors]
-    print(f"\n{num_date_errors} Zeilen mit fehlerhafter Datumsreihenfolge wurden entfernt.")
+    display(validation.examples(df_user, 'active_after_created', 'created_after_booking',
+                                columns=['user_id', 'first_active_date', 'account_created_date', 'first_booking_date']))
+    print(f"\n{num_date_errors} Zeilen mit fehlerhafter Datumsreihenfolge werden entfernt.")
 else:
     print("Keine Fehler in der Datumsreihenfolge gefunden")
 
@@ -159,46 +139,44 @@ else:
 # %%
 # Analyse der ursprünglichen Werte in user_gender
 print("Ursprüngliche eindeutige Werte in user_gender:")
-print(df_user['user_gender'].value_counts(dropna=False))
+print(df_user.loc[validation.keep_mask(through='date_order'), 'user_gender'].value_counts(dropna=False))
 
 # %% [markdown]
 # Der Wert `-unknown-` wird beibehalten, da er die Informationen liefern könnte, dass der Nutzer sein Geschlecht absichtlich nicht angegeben hat.
 
 # %%
 # Normalisierung: Groß-/Kleinschreibung vereinheitlichen
-df_user['user_gender'] = df_user['user_gender'].str.lower()
+df_user['user_gender'] = normalize_gender(df_user['user_gender'])
 
 print("\nBereinigte Werte:")
-print(df_user['user_gender'].value_counts(dropna=False))
+print(df_user.loc[validation.keep_mask(through='date_order'), 'user_gender'].value_counts(dropna=False))
 
 # %% [markdown]
 # ## 6. Filterung unrealistischer Altersangaben
 #
-# Zeilen mit user_age < 18 oder > 90 werden entfernt.
+# Zeilen mit user_age < 18 oder > 90 werden entfernt. Anschließend werden alle in den Abschnitten 2, 4 und 6 gefundenen Zeilen in einem Schritt entfernt.
 
 # %%
 # Altersstatistik vor der Bereinigung
 print("Altersstatistik vor der Bereinigung:")
-print(df_user['user_age'].describe())
+print(df_user.loc[validation.keep_mask(through='date_order'), 'user_age'].describe())
 print()
 
-# Unrealistische Altersangaben identifizieren
-age_too_young = df_user['user_age'] < 18
-age_too_old = df_user['user_age'] > 90
-invalid_age = age_too_young | age_too_old
-
-num_invalid_age = invalid_age.sum()
+# Unrealistische Altersangaben (aus der Regelauswertung; fehlendes Alter ist kein Fehler)
+num_invalid_age = validation.count('age')
 print(f"Anzahl der Zeilen mit unrealistischem Alter: {num_invalid_age}")
-print(f"  - Alter < 18: {age_too_young.sum()}")
-print(f"  - Alter > 90: {age_too_old.sum()}")
+print(f"  - Alter < {config.AGE_MIN}: {validation.count('age_too_young')}")
+print(f"  - Alter > {config.AGE_MAX}: {validation.count('age_too_old')}")
 
 # %%
 print(f"\nBeispiele für unrealistische Altersangaben:")
-display(df_user[invalid_age][['user_id', 'user_age', 'account_created_date']].head())
-    
-# Zeilen mit unrealistischem Alter entfernen
-df_user = df_user[~invalid_age]
+display(validation.examples(df_user, 'age', columns=['user_id', 'user_age', 'account_created_date']))
+
+# Alle markierten Zeilen (Duplikate, Datumsreihenfolge, Alter) auf einmal entfernen
+df_user = validation.apply(df_user)
 print(f"\n{num_invalid_age} Zeilen mit unrealistischem Alter wurden entfernt")
+print(f"Entfernte Zeilen insgesamt: {rows_initial - len(df_user)} "
+      f"(Duplikate: {num_duplicates}, Datumsreihenfolge: {num_date_errors}, Alter: {num_invalid_age})")
 
 # Konvertierung von user_age in Integer
 df_user['user_age'] = df_user['user_age'].astype('int', errors='ignore')
@@ -215,54 +193,29 @@ columns_to_analyze = ['user_gender', 'signup_platform', 'signup_process', 'user_
                       'marketing_channel', 'marketing_provider', 'first_tracked_affiliate',
                       'signup_application', 'first_device', 'first_web_browser', 'destination_country']
 
-# Erstelle den Inhalt der Datei
-print("Zusammenfassung der eindeutigen Werte pro Spalte in df_user_filtered")
-print("=" * 60)
-print("")
-
-for column in columns_to_analyze:
-    if column in df_user.columns:
-        # Zähle eindeutige Werte und deren Häufigkeiten
-        value_counts = df_user[column].value_counts()
-        total_count = len(df_user)
-        
-        print(f"Spalte: {column}")
-        print(f"Anzahl eindeutiger Werte: {len(value_counts)}")
-        print("Wert - Anzahl - Prozent")
-        
-        for value, count in value_counts.items():
-            percentage = (count / total_count) * 100
-            print(f"'{value}' - {count} - {percentage:.2f}%")
-        
-        # Füge NaN-Zählung hinzu
-        nan_count = df_user[column].isna().sum()
-        if nan_count > 0:
-            nan_percentage = (nan_count / total_count) * 100
-            print(f"NaN - {nan_count} - {nan_percentage:.2f}%")
-        
-        print("")
-        print("-" * 60)
-        print("")
+# Profil der Textspalten in einem Durchlauf
+profile = DataProfile.from_frame(df_user, columns=[col for col in columns_to_analyze if col in df_user.columns])
+print(render_unique_values_summary(profile, 'df_user_filtered', numeric_columns=[]))
 
 # %%
 # Zähle die Häufigkeit jedes Wertes in 'first_web_browser'
 browser_counts = df_user['first_web_browser'].value_counts()
 
-# Identifiziere Werte mit Häufigkeit < 500
-rare_browsers = browser_counts[browser_counts < 500].index.tolist()
+# Identifiziere Werte mit Häufigkeit < 500 (config.RARE_BROWSER_THRESHOLD)
+rare_browsers = browser_counts[browser_counts < config.RARE_BROWSER_THRESHOLD].index.tolist()
 
 # Ersetze diese Werte durch 'Other'
-df_user['first_web_browser'] = df_user['first_web_browser'].replace(rare_browsers, 'Other')
+df_user['first_web_browser'] = merge_categories(df_user['first_web_browser'], rare_browsers, 'Other')
 
 # %%
 # Zähle die Häufigkeit jedes Wertes in 'marketing_provider'
 provider_counts = df_user['marketing_provider'].value_counts()
 
-# Identifiziere Werte mit Häufigkeit < 100
-rare_providers = provider_counts[provider_counts < 100].index.tolist()
+# Identifiziere Werte mit Häufigkeit < 100 (config.RARE_PROVIDER_THRESHOLD)
+rare_providers = provider_counts[provider_counts < config.RARE_PROVIDER_THRESHOLD].index.tolist()
 
 # Ersetze diese Werte durch 'other'
-df_user['marketing_provider'] = df_user['marketing_provider'].replace(rare_providers, 'other')
+df_user['marketing_provider'] = merge_categories(df_user['marketing_provider'], rare_providers, 'other')
 
 # %% [markdown]
 # ## 8. Analyse der Abhängigkeit: first_booking_date ↔ destination_country
@@ -273,30 +226,28 @@ df_user['marketing_provider'] = df_user['marketing_provider'].replace(rare_provi
 
 # %%
 # Fall 1: Keine Buchung (first_booking_date = NaN), aber destination != NDF
-no_booking_but_dest = (df_user['first_booking_date'].isna()) & \
-                       (df_user['destination_country'] != 'NDF')
-num_case1 = no_booking_but_dest.sum()
+num_case1 = validation.count('no_booking_but_destination')
 
 print(f"\n1. Zeilen ohne Buchungsdatum, aber destination_country != 'NDF': {num_case1}")
 
 if num_case1 > 0:
     print("INKONSISTENZ gefunden!")
     print("\n   Beispiele:")
-    display(df_user[no_booking_but_dest][['user_id', 'first_booking_date', 'destination_country']].head())
+    display(validation.examples(df_user, 'no_booking_but_destination',
+                                columns=['user_id', 'first_booking_date', 'destination_country']))
 else:
     print("Keine Inkonsistenz")
 
 # Fall 2: Buchung vorhanden (first_booking_date != NaN), aber destination = NDF
-booking_but_ndf = (df_user['first_booking_date'].notna()) & \
-                   (df_user['destination_country'] == 'NDF')
-num_case2 = booking_but_ndf.sum()
+num_case2 = validation.count('booking_but_ndf')
 
 print(f"\n2. Zeilen mit Buchungsdatum, aber destination_country = 'NDF': {num_case2}")
 
 if num_case2 > 0:
     print("INKONSISTENZ gefunden!")
     print("\n   Beispiele:")
-    display(df_user[booking_but_ndf][['user_id', 'first_booking_date', 'destination_country']].head())
+    display(validation.examples(df_user, 'booking_but_ndf',
+                                columns=['user_id', 'first_booking_date', 'destination_country']))
 else:
     print("Keine Inkonsistenz")
 
@@ -321,11 +272,11 @@ df_nan_analysis = df_user.copy()
 
 # Bereinigung von user_gender
 print(f"Zeilen mit unbekanntem user_gender: {(df_nan_analysis['user_gender'] == '-unknown-').sum()}")
-df_nan_analysis['user_gender'] = df_nan_analysis['user_gender'].replace('-unknown-', np.nan)
+df_nan_analysis['user_gender'] = replace_with_nan(df_nan_analysis['user_gender'], '-unknown-')
 
 # Bereinigung von first_web_browser
 print(f"Zeilen mit unbekanntem first_web_browser: {(df_nan_analysis['first_web_browser'] == '-unknown-').sum()}")
-df_nan_analysis['first_web_browser'] = df_nan_analysis['first_web_browser'].replace('-unknown-', np.nan)
+df_nan_analysis['first_web_browser'] = replace_with_nan(df_nan_analysis['first_web_browser'], '-unknown-')
 
 # %%
 # Fehlende Werte pro Spalte
@@ -346,27 +297,20 @@ else:
     print("Keine fehlenden Werte gefunden")
 
 # %%
-# Visualisierung mit missingno
+# Visualisierung fehlender Werte (Bitmaps, pipeline/nullity.py)
+nulls = nullity.NullityProfile.from_frame(df_nan_analysis)
 
 # Matrix-Plot
-msno.matrix(df_nan_analysis, sparkline=False, figsize=(12, 6))
-plt.title('Matrix fehlender Werte in user.csv', fontsize=14, pad=20)
-plt.tight_layout()
-plt.show()
-    
+figures.show('I_missing_values_matrix', plots.missing_matrix, profile=nulls,
+             title='Matrix fehlender Werte in user.csv')
+
 # Bar-Plot
-msno.bar(df_nan_analysis, figsize=(12, 6))
-plt.title('Vollständigkeit der Daten pro Spalte', fontsize=14, pad=20)
-plt.tight_layout()
-plt.show()
-    
+figures.show('I_missing_values_bar', plots.missing_bar, profile=nulls)
+
 # Heatmap-Plot
-msno.heatmap(df_nan_analysis, figsize=(12, 8))
-plt.title('Korrelation fehlender Werte', fontsize=14, pad=20)
-plt.tight_layout()
-plt.show()
+figures.show('I_missing_values_heatmap', plots.missing_heatmap, profile=nulls)
 
-del df_nan_analysis
+del df_nan_analysis, nulls
 
 # %% [markdown]
 # ## 10. Zusammenfassung
@@ -391,39 +335,14 @@ columns_to_analyze = ['user_gender', 'signup_platform', 'signup_process', 'user_
                       'marketing_channel', 'marketing_provider', 'first_tracked_affiliate',
                       'signup_application', 'first_device', 'first_web_browser', 'destination_country']
 
-# Erstelle den Inhalt der Datei
-output_lines = ["Zusammenfassung der eindeutigen Werte pro Spalte in df_user_filtered"]
-output_lines.append("=" * 60)
-output_lines.append("")
-
-for column in columns_to_analyze:
-    if column in df_user.columns:
-        # Zähle eindeutige Werte und deren Häufigkeiten
-        value_counts = df_user[column].value_counts()
-        total_count = len(df_user)
-        
-        output_lines.append(f"Spalte: {column}")
-        output_lines.append(f"Anzahl eindeutiger Werte: {len(value_counts)}")
-        output_lines.append("Wert - Anzahl - Prozent")
-        
-        for value, count in value_counts.items():
-            percentage = (count / total_count) * 100
-            output_lines.append(f"'{value}' - {count} - {percentage:.2f}%")
-        
-        # Füge NaN-Zählung hinzu
-        nan_count = df_user[column].isna().sum()
-        if nan_count > 0:
-            nan_percentage = (nan_count / total_count) * 100
-            output_lines.append(f"NaN - {nan_count} - {nan_percentage:.2f}%")
-        
-        output_lines.append("")
-        output_lines.append("-" * 60)
-        output_lines.append("")
+# Profil der Textspalten nach dem Zusammenfassen seltener Werte
+profile = DataProfile.from_frame(df_user, columns=[col for col in columns_to_analyze if col in df_user.columns])
+output_text = render_unique_values_summary(profile, 'df_user_filtered', numeric_columns=[])
 
 # Speichere in Datei
 output_file_path = 'scripts/outputs/df_user_filtered_unique_values_summary.txt'
 with open(output_file_path, 'w', encoding='utf-8') as f:
-    f.write('\n'.join(output_lines))
+    f.write(output_text)
 
 print(f"Datei erfolgreich gespeichert: {output_file_path}")
 
@@ -431,5 +350,6 @@ print(f"Datei erfolgreich gespeichert: {output_file_path}")
 # Exportieren:
 
 # %%
-df_user.to_parquet('data/user_filtered.parquet', index=False)
+with runlog.step('users.export', rows_in=len(df_user)):
+    df_user.to_parquet('data/user_filtered.parquet', index=False)
 print("df_user erfolgreich in 'data/user_filtered.parquet' exportiert")
@@ -16,10 +16,19 @@
 # %%
 import numpy as np
 import pandas as pd
-import missingno as msno
 import matplotlib.pyplot as plt
 from IPython.display import display
 
+from pipeline import config, figures, nullity, plots, runlog
+from pipeline.buckets import load_user_events, write_bucketed
+from pipeline.cleaning import clean_clickstreams
+from pipeline.clickstreams import RAW_SUMMARY_COLUMNS, load_clickstreams
+from pipeline.reports import render_unique_values_summary, render_top_values
+from pipeline.sessions import build_sessions, SESSIONS_PATH
+
+# Laufprotokoll der Schritte (scripts/outputs/run_log.jsonl)
+runlog.enable()
+
 # %% [markdown]
 # # Datenaufbereitung und Fehleranalyse: clickstreams.parquet
 #
@@ -29,83 +38,81 @@ from IPython.display import display
 # 3. Analyse fehlender Werte
 # 4. Bereinigung von '-unknown-' Werten
 # 5. Detaillierte Analyse aller Spalten
-# 6. Visualisierung fehlender Werte mit missingno
+# 6. Visualisierung fehlender Werte
 # 7. Export der bereinigten Daten
 
 # %% [markdown]
 # ## 1. Daten laden und allgemeine Inspektion
 
+# %% [markdown]
+# Die Daten werden in kompakter Form geladen: die Textspalten liegen als Kategorien (Dictionary-Codes) vor, `session_user_id` wird interniert und `time_passed_in_seconds` als float32 gespeichert. Duplikatsprüfung, `value_counts` und der Export arbeiten direkt auf dieser Darstellung.
+#
+# Alle Bereinigungsschritte (Duplikate, '-unknown-', `is_new_session`, Null-Zeiten, fehlende Schlüssel) laufen in einem Aufruf (pipeline/cleaning.py); die folgenden Abschnitte werten dessen Profile und Kennzahlen aus. Mit `config.CLICKSTREAM_BACKEND = 'arrow'` laufen die Schritte direkt auf den Arrow-Arrays, erst der bereinigte DataFrame wird nach pandas konvertiert. Beide Backends liefern dieselben Ergebnisse.
+
 # %%
-# Daten laden
-df_clickstreams = pd.read_parquet('data/clickstreams.parquet')
+# Daten laden und bereinigen
+cleaning = clean_clickstreams('data/clickstreams.parquet', backend=config.CLICKSTREAM_BACKEND,
+                              gap_seconds=config.SESSION_GAP_SECONDS)
 
-rows_initial = len(df_clickstreams)
+rows_initial = cleaning.rows_initial
 print(f"Anzahl der Zeilen: {rows_initial:,}")
-print(f"Anzahl der Spalten: {len(df_clickstreams.columns)}")
-print(f"\nSpalten: {list(df_clickstreams.columns)}")
+print(f"Anzahl der Spalten: {len(cleaning.dtypes)}")
+print(f"\nSpalten: {list(cleaning.dtypes.index)}")
 
 # Speicherverbrauch
-memory_usage = df_clickstreams.memory_usage(deep=True).sum() / 1024**2
+memory_usage = cleaning.memory_bytes / 1024**2
 print(f"\nSpeicherverbrauch: {memory_usage:.2f} MB")
 
 # %%
-df_clickstreams.head(25)
+# Profil aller Spalten in einem Durchlauf (Häufigkeiten, fehlende Werte, '-unknown-', Statistiken)
+raw_profile = cleaning.raw_profile
+
+with open('scripts/outputs/clickstreams_unique_values_summary.txt', 'w', encoding='utf-8') as f:
+    f.write(render_unique_values_summary(raw_profile, 'df_clickstreams', columns=RAW_SUMMARY_COLUMNS, top=15))
+
+# %%
+cleaning.preview
 
 # %%
-df_clickstreams.info()
+# Datentypen und vorhandene Werte pro Spalte
+pd.DataFrame({'Typ': cleaning.dtypes.astype(str),
+              'Vorhanden': [raw_profile[col].count for col in cleaning.dtypes.index]})
 
 # %%
 # Grundlegende Statistiken für numerische Spalten
-df_clickstreams.describe()
+pd.concat([raw_profile[col].describe() for col in raw_profile.columns if raw_profile[col].numeric], axis=1)
 
 # %% [markdown]
 # ## 2. Prüfung auf Duplikate
 
 # %%
-# Duplikate prüfen
-num_duplicates = df_clickstreams.duplicated().sum()
+# Duplikate: pandas verdichtet jede Zeile zu einem 64-Bit-Fingerabdruck,
+# Arrow gruppiert exakt über alle Spalten; das erste Vorkommen bleibt erhalten
+num_duplicates = cleaning.num_duplicates
 print(f"Anzahl der Duplikate: {num_duplicates:,}")
 print(f"Prozentsatz: {num_duplicates / rows_initial * 100:.2f}%")
 print('-' * 60)
 
-# Duplikate in separaten DataFrame speichern
-df_duplicates = df_clickstreams[df_clickstreams.duplicated()]
-print(f"Anzahl der Duplikate im separaten DataFrame: {len(df_duplicates):,}")
-
-# Eindeutige Werte für session_action
-print("\nEindeutige Werte in session_action:")
-unique_action = df_duplicates['session_action'].value_counts(dropna=False)
-print(unique_action)
-print(f"Anzahl eindeutiger Werte: {df_duplicates['session_action'].nunique(dropna=False)}\n")
-print(f"Prozentuale Verteilung:\n{(unique_action / len(df_duplicates) * 100).round(2)}")
-print('-' * 60)
-
-# Eindeutige Werte für session_action_type
-print("\nEindeutige Werte in session_action_type:")
-unique_action_type = df_duplicates['session_action_type'].value_counts(dropna=False)
-print(unique_action_type)
-print(f"Anzahl eindeutiger Werte: {df_duplicates['session_action_type'].nunique(dropna=False)}\n")
-print(f"Prozentuale Verteilung:\n{(unique_action_type / len(df_duplicates) * 100).round(2)}")
-print('-' * 60)
+# Profil der Duplikate (ohne separaten DataFrame aufzubewahren)
+duplicates_profile = cleaning.duplicates_profile
+print(f"Anzahl der Duplikate im separaten DataFrame: {duplicates_profile.rows:,}")
 
-# Eindeutige Werte für session_action_detail
-print("\nEindeutige Werte in session_action_detail:")
-unique_action_detail = df_duplicates['session_action_detail'].value_counts(dropna=False)
-print(unique_action_detail)
-print(f"Anzahl eindeutiger Werte: {df_duplicates['session_action_detail'].nunique(dropna=False)}\n")
-print(f"Prozentuale Verteilung:\n{(unique_action_detail / len(df_duplicates) * 100).round(2)}")
-print('-' * 60)
+for col in ['session_action', 'session_action_type', 'session_action_detail']:
+    print(f"\nEindeutige Werte in {col}:")
+    unique_values = duplicates_profile[col].value_counts(dropna=False)
+    print(unique_values)
+    print(f"Anzahl eindeutiger Werte: {len(unique_values)}\n")
+    print(f"Prozentuale Verteilung:\n{(unique_values / duplicates_profile.rows * 100).round(2)}")
+    print('-' * 60)
 
 # Statistiken für time_passed_in_seconds
 print("\nStatistiken für time_passed_in_seconds:")
-print(df_duplicates['time_passed_in_seconds'].describe())
+print(duplicates_profile['time_passed_in_seconds'].describe())
 
-# Anzahl eindeutiger session_user_id
-# Duplikate aus df_clickstreams entfernen
-df_clickstreams = df_clickstreams.drop_duplicates()
+with open('scripts/outputs/clickstreams_duplicates_unique_values_summary.txt', 'w', encoding='utf-8') as f:
+    f.write(render_unique_values_summary(duplicates_profile, 'df_duplicates', top=15))
 
-# df_duplicates löschen
-del df_duplicates
+del duplicates_profile
 
 print('-' * 60)
 print('Duplikate entfernt.')
@@ -115,8 +122,11 @@ print('Duplikate entfernt.')
 # ## 3. Analyse fehlender Werte (vor Bereinigung)
 
 # %%
+# Profil nach Entfernung der Duplikate (für Abschnitte 3 und 4)
+dedup_profile = cleaning.dedup_profile
+
 # Fehlende Werte pro Spalte
-missing_before = df_clickstreams.isnull().sum()
+missing_before = dedup_profile.missing()
 missing_pct = (missing_before / rows_initial * 100).round(2)
 
 missing_df = pd.DataFrame({
@@ -138,75 +148,42 @@ text_cols = ['session_user_id', 'session_action_type', 'session_action_detail',
 
 print("Anzahl der '-unknown-' Werte pro Spalte:\n")
 for col in text_cols:
-    count = (df_clickstreams[col] == '-unknown-').sum()
+    count = dedup_profile[col].sentinel_count('-unknown-')
     pct = count / rows_initial * 100
     print(f"{col}: {count:,} ({pct:.2f}%)")
 
 # %%
-# Bereinigung: '-unknown-' durch NaN ersetzen
-print("Bereinigung durchführen: '-unknown-' durch NaN ersetzen\n")
+# Bereinigung: '-unknown-' durch NaN ersetzt
+print("Bereinigung durchgeführt: '-unknown-' durch NaN ersetzt\n")
 
 for col in text_cols:
-    count_before = (df_clickstreams[col] == '-unknown-').sum()
-    df_clickstreams[col] = df_clickstreams[col].replace('-unknown-', np.nan)
+    count_before = dedup_profile[col].sentinel_count('-unknown-')
     print(f"{col}: {count_before:,} Werte ersetzt")
 
 # %% [markdown]
 # ## 5. Analyse der Spalten nach Bereinigung
 
+# %%
+# Profil nach der Bereinigung: alle folgenden Kennzahlen ohne erneuten Durchlauf
+profile = cleaning.profile
+
 # %%
 # session_user_id
 print("=== session_user_id ===")
-print(f"Eindeutige Benutzer: {df_clickstreams['session_user_id'].nunique():,}")
-print(f"Fehlende Werte: {df_clickstreams['session_user_id'].isna().sum():,}")
+print(f"Eindeutige Benutzer: {profile['session_user_id'].nunique:,}")
+print(f"Fehlende Werte: {profile['session_user_id'].missing:,}")
 
 # %%
-# session_action
-print("=== session_action ===")
-print(f"Eindeutige Werte: {df_clickstreams['session_action'].nunique()}")
-print(f"Fehlende Werte: {df_clickstreams['session_action'].isna().sum():,}")
-print("\nTop 10 häufigste Werte:")
-
-counts = df_clickstreams['session_action'].value_counts().head(10)
-for val, count in counts.items():
-    pct = (count / len(df_clickstreams) * 100)
-    print(f"'{val}' - {count:,} - {pct:.2f}%")
+print(render_top_values(profile, 'session_action'))
 
 # %%
-# session_action_type
-print("=== session_action_type ===")
-print(f"Eindeutige Werte: {df_clickstreams['session_action_type'].nunique()}")
-print(f"Fehlende Werte: {df_clickstreams['session_action_type'].isna().sum():,}")
-print("\nTop 10 häufigste Werte:")
-
-counts = df_clickstreams['session_action_type'].value_counts().head(10)
-for val, count in counts.items():
-    pct = (count / len(df_clickstreams) * 100)
-    print(f"'{val}' - {count:,} - {pct:.2f}%")
+print(render_top_values(profile, 'session_action_type'))
 
 # %%
-# session_action_detail
-print("=== session_action_detail ===")
-print(f"Eindeutige Werte: {df_clickstreams['session_action_detail'].nunique()}")
-print(f"Fehlende Werte: {df_clickstreams['session_action_detail'].isna().sum():,}")
-print("\nTop 10 häufigste Werte:")
-
-counts = df_clickstreams['session_action_detail'].value_counts().head(10)
-for val, count in counts.items():
-    pct = (count / len(df_clickstreams) * 100)
-    print(f"'{val}' - {count:,} - {pct:.2f}%")
+print(render_top_values(profile, 'session_action_detail'))
 
 # %%
-# session_device_type
-print("=== session_device_type ===")
-print(f"Eindeutige Werte: {df_clickstreams['session_device_type'].nunique()}")
-print(f"Fehlende Werte: {df_clickstreams['session_device_type'].isna().sum():,}")
-print("\nTop 10 häufigste Werte:")
-
-counts = df_clickstreams['session_device_type'].value_counts().head(10)
-for val, count in counts.items():
-    pct = (count / len(df_clickstreams) * 100)
-    print(f"'{val}' - {count:,} - {pct:.2f}%")
+print(render_top_values(profile, 'session_device_type'))
 
 # %% [markdown]
 # # 6. Zeitanalyse
@@ -214,72 +191,38 @@ for val, count in counts.items():
 # %%
 # time_passed_in_seconds
 print("=== time_passed_in_seconds ===")
-time_col = df_clickstreams['time_passed_in_seconds']
-print(f"Fehlende Werte: {time_col.isna().sum():,}")
-print(f"Min: {time_col.min()}")
-print(f"Max: {time_col.max()}")
-print(f"Mittelwert: {time_col.mean():.2f}")
-print(f"Median: {time_col.median():.2f}")
-print(f"Standardabweichung: {time_col.std():.2f}")
+time_profile = profile['time_passed_in_seconds']
+print(f"Fehlende Werte: {time_profile.missing:,}")
+print(f"Min: {time_profile.min}")
+print(f"Max: {time_profile.max}")
+print(f"Mittelwert: {time_profile.mean:.2f}")
+print(f"Median: {time_profile.median:.2f}")
+print(f"Standardabweichung: {time_profile.std:.2f}")
 
-extreme_time = time_col > 1800  # > 30 Minuten
-print(f"\nUnrealistische Werte (> 30 Minuten): {extreme_time.sum():,} ({(extreme_time.sum() / len(df_clickstreams) * 100):.2f}%)")
+rows_dedup = cleaning.rows_dedup
 
-zero_time = time_col == 0 # = 0 Sekunden
-print(f"Null-Werte (= 0 Sekunden): {zero_time.sum():,} ({(zero_time.sum() / len(df_clickstreams) * 100):.2f}%)")
+extreme_count = cleaning.extreme_count  # > 30 Minuten
+print(f"\nUnrealistische Werte (> 30 Minuten): {extreme_count:,} ({(extreme_count / rows_dedup * 100):.2f}%)")
+
+zero_count = cleaning.zero_count  # = 0 Sekunden
+print(f"Null-Werte (= 0 Sekunden): {zero_count:,} ({(zero_count / rows_dedup * 100):.2f}%)")
 
 # %% [markdown]
 # Mehr als 30 Minuten Inaktivität innerhalb einer Sitzung sind ein unrealistischer Wert.
 #
 # Möglicherweise entstehen solche Werte, wenn ein Benutzer den Tab geöffnet lässt und weggeht, später zurückkehrt und die nächste Aktion ausführt. Es handelt sich dann eigentlich bereits um eine neue Sitzung.
 #
-# Daher fügen wir eine Spalte `is_new_session` hinzu, in der 1 steht, wenn `time_passed_in_seconds` größer als 30 Minuten ist, und 0, wenn sie kleiner ist.
-
-# %%
-df_clickstreams['is_new_session'] = extreme_time  # Markiere als neue Sitzung, wenn Zeit > 30 Minuten
+# Daher enthalten die bereinigten Daten eine Spalte `is_new_session`, in der 1 steht, wenn `time_passed_in_seconds` größer als 30 Minuten ist, und 0, wenn sie kleiner ist.
 
 # %%
 # Detaillierte Analyse der Einträge mit time_passed_in_seconds == 0
-df_zero_time = df_clickstreams[time_col == 0]
-
-print("=== session_action ===")
-print(f"Eindeutige Werte: {df_zero_time['session_action'].nunique()}")
-print(f"Fehlende Werte: {df_zero_time['session_action'].isna().sum():,}")
-print("\nTop 10 häufigste Werte:")
-
-counts = df_zero_time['session_action'].value_counts().head(10)
-for val, count in counts.items():
-    pct = (count / len(df_zero_time) * 100)
-    print(f"'{val}' - {count:,} - {pct:.2f}%")
-
-print("\n=== session_action_type ===")
-print(f"Eindeutige Werte: {df_zero_time['session_action_type'].nunique()}")
-print(f"Fehlende Werte: {df_zero_time['session_action_type'].isna().sum():,}")
-print("\nTop 10 häufigste Werte:")
-
-counts = df_zero_time['session_action_type'].value_counts().head(10)
-for val, count in counts.items():
-    pct = (count / len(df_zero_time) * 100)
-    print(f"'{val}' - {count:,} - {pct:.2f}%")
-
-print("\n=== session_action_detail ===")
-print(f"Eindeutige Werte: {df_zero_time['session_action_detail'].nunique()}")
-print(f"Fehlende Werte: {df_zero_time['session_action_detail'].isna().sum():,}")
-print("\nTop 10 häufigste Werte:")  
-
-counts = df_zero_time['session_action_detail'].value_counts().head(10)
-for val, count in counts.items():
-    pct = (count / len(df_zero_time) * 100)
-    print(f"'{val}' - {count:,} - {pct:.2f}%")
-
-print("\n=== session_device_type ===")
-print(f"Eindeutige Werte: {df_zero_time['session_device_type'].nunique()}")
-print(f"Fehlende Werte: {df_zero_time['session_device_type'].isna().sum():,}")
-print("\nTop 10 häufigste Werte:")  
-counts = df_zero_time['session_device_type'].value_counts().head(10)
-for val, count in counts.items():
-    pct = (count / len(df_zero_time) * 100)
-    print(f"'{val}' - {count:,} - {pct:.2f}%")
+zero_time_profile = cleaning.zero_time_profile
+
+zero_time_summary = '\n\n'.join(render_top_values(zero_time_profile, col) for col in zero_time_profile.columns)
+print(zero_time_summary)
+
+with open('scripts/outputs/clickstreams_zero_time_unique_values_summary.txt', 'w', encoding='utf-8') as f:
+    f.write(zero_time_summary)
 
 # %% [markdown]
 # In `df_zero_time` wird eine Verteilung der Werte beobachtet, die sich vom `df_clickstreams` unterscheidet:
@@ -301,7 +244,7 @@ for val, count in counts.items():
 
 # %%
 # Fehlende Werte nach Bereinigung
-missing_after = df_clickstreams.isnull().sum()
+missing_after = cleaning.missing_after
 missing_pct_after = (missing_after / rows_initial * 100).round(2)
 
 missing_df_after = pd.DataFrame({
@@ -313,34 +256,31 @@ missing_df_after = missing_df_after.sort_values('Fehlend', ascending=False)
 missing_df_after
 
 # %%
-# Löschen der Zeilen mit fehlenden session_user_id, session_action und time_passed_in_seconds
-df_clickstreams = df_clickstreams.dropna(subset=['session_user_id', 'session_action', 'time_passed_in_seconds'])
+# Bereinigte Daten: ohne Zeilen mit fehlenden session_user_id, session_action und time_passed_in_seconds
+df_clickstreams = cleaning.frame
 
 del missing_df_after
 
 # %% [markdown]
-# ## 7. Visualisierung fehlender Werte mit missingno
+# ## 7. Visualisierung fehlender Werte
+#
+# Die Masken der fehlenden Werte werden als Bitmaps gepackt; die Plots entstehen
+# aus Bitzählungen und Zeilen-Bins statt aus den einzelnen Zeilen (pipeline/nullity.py).
 
 # %%
+nulls = nullity.NullityProfile.from_frame(df_clickstreams)
+
 # Matrix-Plot
-msno.matrix(df_clickstreams, sparkline=False, figsize=(12, 6))
-plt.title('Matrix fehlender Werte in clickstreams.parquet', fontsize=14, pad=20)
-plt.tight_layout()
-plt.show()
+figures.show('II_missing_values_matrix', plots.missing_matrix, profile=nulls,
+             title='Matrix fehlender Werte in clickstreams.parquet')
 
 # %%
 # Bar-Plot
-msno.bar(df_clickstreams, figsize=(12, 6))
-plt.title('Vollständigkeit der Daten pro Spalte', fontsize=14, pad=20)
-plt.tight_layout()
-plt.show()
+figures.show('II_missing_values_bar', plots.missing_bar, profile=nulls)
 
 # %%
 # Heatmap-Plot
-msno.heatmap(df_clickstreams, figsize=(12, 8))
-plt.title('Korrelation fehlender Werte', fontsize=14, pad=20)
-plt.tight_layout()
-plt.show()
+figures.show('II_missing_values_heatmap', plots.missing_heatmap, profile=nulls)
 
 # %% [markdown]
 # ## 8. Zusammenfassung
@@ -356,8 +296,65 @@ print("1. Duplikate entfernt;")
 print("2. `-unknown-` in `session_action_type`, `session_action_detail` und `session_device_type` durch NaN ersetzt;")
 print("3. Zeilen mit fehlenden `session_user_id`, `session_action` und `time_passed_in_seconds` entfernt.")
 
+# %% [markdown]
+# Die bereinigten Daten werden nach Benutzer partitioniert abgelegt: `data/clickstreams_filtered.parquet` ist ein Verzeichnis mit 16 Dateien (`bucket-00.parquet`, …), die Zuordnung ergibt sich aus einem stabilen Hash von `session_user_id`. Innerhalb jeder Datei sind die Zeilen nach Benutzer sortiert (die Reihenfolge der Ereignisse eines Benutzers bleibt erhalten), die Row-Groups umfassen höchstens 65.536 Zeilen. Auswertungen pro Benutzer können so Bucket für Bucket laufen, Abfragen für einzelne Benutzer lesen nur eine Datei und wenige Row-Groups.
+
 # %%
 # Export der bereinigten Daten
-df_clickstreams.to_parquet('data/clickstreams_filtered.parquet', index=False)
+write_bucketed(df_clickstreams, 'data/clickstreams_filtered.parquet')
 print("Bereinigte Daten erfolgreich in 'data/clickstreams_filtered.parquet' exportiert")
 
+# %% [markdown]
+# ## 9. Sitzungen
+#
+# Aus der Regel für `is_new_session` werden echte Sitzungen gebildet: Eine Sitzung beginnt mit der ersten Aktion eines Benutzers und mit jeder Aktion nach mehr als 30 Minuten Pause (`config.SESSION_GAP_SECONDS`). Die Sitzungstabelle enthält pro Sitzung Benutzer, laufende Nummer, Anzahl der Aktionen, Dauer, erste und letzte Aktion sowie das Gerät. Auswertungen auf Sitzungsebene müssen damit nicht mehr die einzelnen Ereignisse durchlaufen.
+
+# %%
+df_sessions = build_sessions(df_clickstreams, gap_seconds=config.SESSION_GAP_SECONDS)
+
+print(f"Anzahl der Sitzungen: {len(df_sessions):,}")
+print(f"Benutzer mit Sitzungen: {df_sessions['session_user_id'].nunique():,}")
+print(f"Sitzungen pro Benutzer (Mittelwert): {len(df_sessions) / df_sessions['session_user_id'].nunique():.2f}")
+
+print("\nAktionen pro Sitzung:")
+print(df_sessions['event_count'].describe())
+
+print("\nDauer pro Sitzung (Sekunden):")
+print(df_sessions['duration_seconds'].describe())
+
+# %%
+print("Geräte (erste Aktion der Sitzung):")
+print(df_sessions['device'].value_counts(dropna=False).head(10))
+
+print("\nHäufigste erste Aktionen:")
+print(df_sessions['first_action'].value_counts().head(10))
+
+# %%
+with runlog.step('sessions.export', rows_in=len(df_sessions)):
+    df_sessions.to_parquet(SESSIONS_PATH, index=False)
+print(f"Sitzungstabelle erfolgreich in '{SESSIONS_PATH}' exportiert")
+
+
+# %% [markdown]
+# ## 10. Gezielte Abfragen auf den bereinigten Daten
+#
+# Für spätere Detailanalysen müssen nicht alle Daten geladen werden: `load_clickstreams` liest nur die angegebenen Spalten und überspringt Row-Groups, die laut Parquet-Statistiken keine passenden Zeilen enthalten. `load_user_events` öffnet für einzelne Benutzer zusätzlich nur deren Bucket-Dateien.
+
+# %%
+# Nur Einträge mit time_passed_in_seconds == 0 und nur die benötigten Spalten
+df_zero_time_slice = load_clickstreams(
+    'data/clickstreams_filtered.parquet',
+    columns=['session_action', 'session_action_type', 'session_action_detail', 'session_device_type'],
+    filters=[('time_passed_in_seconds', '==', 0)]
+)
+print(f"Einträge mit 0 Sekunden: {len(df_zero_time_slice):,}")
+
+# Ereignisse einzelner Benutzer auf einem bestimmten Gerätetyp
+sample_users = set(df_clickstreams['session_user_id'].dropna().unique()[:5])
+df_user_slice = load_user_events(
+    'data/clickstreams_filtered.parquet', sample_users,
+    filters=[('session_device_type', '==', 'iPhone')]
+)
+print(f"Ereignisse der Beispielbenutzer auf iPhone: {len(df_user_slice):,}")
+
+del df_zero_time_slice, df_user_slice
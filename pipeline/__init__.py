@@ -0,0 +1,14 @@
+"""
+Gemeinsame Bausteine für die Datenaufbereitung (I → II → III).
+
+Die Notebooks im Projektstammverzeichnis und die Skripte in `scripts/`
+importieren die Module dieses Pakets direkt, z. B.:
+
+    from pipeline.clickstreams import load_clickstreams
+
+Die Skripte sind außerdem über `python -m pipeline <befehl>` erreichbar
+(pipeline/cli.py).
+
+Das Paket selbst importiert keine schweren Bibliotheken, damit einzelne
+Module ohne unnötige Ladezeit verwendet werden können.
+"""
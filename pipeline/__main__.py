@@ -0,0 +1,7 @@
+"""`python -m pipeline`: siehe pipeline/cli.py."""
+
+import sys
+
+from pipeline.cli import main
+
+sys.exit(main())
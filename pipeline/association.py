@@ -0,0 +1,166 @@
+"""
+Zusammenhänge aller Paare kategorialer Spalten in einem Durchgang.
+
+`AssociationMatrix.from_cube` nimmt die bereits kodierten Zellen des
+Conversion-Würfels (pipeline/conversion.py) einschließlich des Zielorts
+als weitere Dimension und bildet für jedes Spaltenpaar die Kreuztabelle
+mit einem `np.bincount` über die kombinierten Codes (gewichtet mit der
+Anzahl der Benutzer je Zelle). Alle Tabellen liegen gepolstert in einem
+Array (Paare × Zeilen × Spalten); χ², Freiheitsgrade, p-Wert, Cramér's V
+und die Affinitäten (Lift) werden darauf für alle Paare gleichzeitig
+berechnet.
+
+Die Werte entsprechen `pd.crosstab` + `scipy.stats.chi2_contingency`
+(mit Yates-Korrektur bei einem Freiheitsgrad); Cramér's V wird wie bei
+`scipy.stats.contingency.association` ohne Korrektur berechnet.
+"""
+
+import numpy as np
+import pandas as pd
+from scipy.stats import chi2 as chi2_distribution
+
+from pipeline import runlog
+from pipeline.bookings import DESTINATION_COLUMN
+from pipeline.conversion import category_values
+
+
+class AssociationMatrix:
+    """Kreuztabellen und Zusammenhangsmaße aller Spaltenpaare."""
+
+    def __init__(self, dimensions, categories, dtypes, pairs, tables):
+        self.dimensions = list(dimensions)
+        self.categories = categories
+        self.dtypes = dtypes
+        # pairs[(i, j)] mit i < j: Position in `tables`
+        self.pairs = pairs
+        self.tables = tables
+        self._statistics()
+
+    @classmethod
+    @runlog.measured('association.tables', rows_in=lambda cls, cube: len(cube))
+    def from_cube(cls, cube):
+        """Alle Paare aus den Dimensionen des Würfels und dem Zielort."""
+        num_destinations = len(cube.destinations)
+        # Zellen × Zielorte als Zeilen; Benutzer ohne Zielort mit Code -1
+        missing = cube.users - cube.counts.sum(axis=1)
+        weights = np.concatenate([cube.counts.T.ravel(), missing])
+        cell = np.concatenate([np.tile(np.arange(len(cube)), num_destinations), np.arange(len(cube))])
+        destination = np.concatenate([np.repeat(np.arange(num_destinations), len(cube)),
+                                      np.full(len(cube), -1)])
+        keep = weights > 0
+        codes = np.column_stack([cube.codes[cell[keep]], destination[keep]])
+
+        dimensions = cube.dimensions + [DESTINATION_COLUMN]
+        categories = dict(cube.categories, **{DESTINATION_COLUMN: cube.destinations})
+        dtypes = dict(cube.dtypes, **{DESTINATION_COLUMN: cube.destination_dtype})
+        return cls.from_codes(codes, weights[keep], dimensions, categories, dtypes)
+
+    @classmethod
+    def from_codes(cls, codes, weights, dimensions, categories, dtypes):
+        """Kreuztabellen aller Paare aus kodierten Zeilen (Codes ≥ -1, -1 = fehlend)."""
+        cardinalities = [len(categories[dim]) for dim in dimensions]
+        size = max(cardinalities, default=0)
+        pairs = {}
+        for i in range(len(dimensions)):
+            for j in range(i + 1, len(dimensions)):
+                pairs[(i, j)] = len(pairs)
+        tables = np.zeros((len(pairs), size, size), dtype=np.int64)
+        for (i, j), position in pairs.items():
+            valid = (codes[:, i] >= 0) & (codes[:, j] >= 0)
+            combined = codes[valid, i] * cardinalities[j] + codes[valid, j]
+            table = np.bincount(combined, weights=weights[valid], minlength=cardinalities[i] * cardinalities[j])
+            tables[position, :cardinalities[i], :cardinalities[j]] = table.reshape(cardinalities[i], cardinalities[j])
+        return cls(dimensions, categories, dtypes, pairs, tables)
+
+    def _statistics(self):
+        """χ², Freiheitsgrade, p-Wert und Cramér's V für alle Paare (vektorisiert)."""
+        observed = self.tables.astype(np.float64)
+        rows = observed.sum(axis=2)
+        cols = observed.sum(axis=1)
+        n = observed.sum(axis=(1, 2))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            expected = rows[:, :, None] * cols[:, None, :] / n[:, None, None]
+        present = expected > 0
+        num_rows = (rows > 0).sum(axis=1)
+        num_cols = (cols > 0).sum(axis=1)
+        dof = np.maximum(num_rows - 1, 0) * np.maximum(num_cols - 1, 0)
+
+        def chi2(obs):
+            with np.errstate(divide='ignore', invalid='ignore'):
+                return np.where(present, (obs - expected) ** 2 / expected, 0).sum(axis=(1, 2))
+
+        # Yates-Korrektur bei einem Freiheitsgrad (wie chi2_contingency)
+        diff = expected - observed
+        corrected = observed + np.sign(diff) * np.minimum(0.5, np.abs(diff))
+        uncorrected = chi2(observed)
+        self.chi2 = np.where(dof == 1, chi2(corrected), uncorrected)
+        self.chi2[dof == 0] = 0.0
+        self.dof = dof
+        self.p_value = np.where(dof > 0, chi2_distribution.sf(self.chi2, np.maximum(dof, 1)), 1.0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.cramers_v = np.sqrt(uncorrected / (n * (np.minimum(num_rows, num_cols) - 1)))
+        self.cramers_v[np.minimum(num_rows, num_cols) < 2] = np.nan
+        self.n = n
+
+    def _pair(self, var1, var2):
+        """Position des Paares und ob die Tabelle transponiert werden muss."""
+        i, j = self.dimensions.index(var1), self.dimensions.index(var2)
+        return (self.pairs[(i, j)], False) if i < j else (self.pairs[(j, i)], True)
+
+    def _frame(self, var1, var2, values):
+        """Tabelle eines Paares mit Beschriftung; leere Zeilen und Spalten entfallen (wie `pd.crosstab`)."""
+        position, transposed = self._pair(var1, var2)
+        counts = self.tables[position].T if transposed else self.tables[position]
+        values = values.T if transposed else values
+        row_codes = np.flatnonzero(counts.sum(axis=1) > 0)
+        col_codes = np.flatnonzero(counts.sum(axis=0) > 0)
+        index = pd.Index(category_values(row_codes, self.categories[var1], self.dtypes[var1]), name=var1)
+        columns = pd.Index(category_values(col_codes, self.categories[var2], self.dtypes[var2]), name=var2)
+        return pd.DataFrame(values[np.ix_(row_codes, col_codes)], index=index, columns=columns)
+
+    def table(self, var1, var2):
+        """Kreuztabelle (wie `pd.crosstab(df[var1], df[var2])`)."""
+        position, _ = self._pair(var1, var2)
+        return self._frame(var1, var2, self.tables[position])
+
+    def lift_tables(self, min_sample=25):
+        """
+        Affinitäten aller Paare: Anteil je Zeile geteilt durch den Anteil
+        der Spalte insgesamt (symmetrisch: n·beobachtet / (Zeilensumme·Spaltensumme));
+        Zellen mit weniger als `min_sample` Benutzern = NaN.
+        """
+        observed = self.tables.astype(np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            normalized = observed / observed.sum(axis=2, keepdims=True)
+            overall = observed.sum(axis=1, keepdims=True) / observed.sum(axis=(1, 2), keepdims=True)
+            lift = normalized / overall
+        lift[self.tables < min_sample] = np.nan
+        return lift
+
+    def lift(self, var1, var2, min_sample=25):
+        position, _ = self._pair(var1, var2)
+        return self._frame(var1, var2, self.lift_tables(min_sample)[position])
+
+    def test(self, var1, var2):
+        """χ², p-Wert, Freiheitsgrade und Cramér's V eines Paares."""
+        position, _ = self._pair(var1, var2)
+        return {'chi2': float(self.chi2[position]), 'p_value': float(self.p_value[position]),
+                'dof': int(self.dof[position]), 'cramers_v': float(self.cramers_v[position])}
+
+    def matrix(self, measure='cramers_v'):
+        """Symmetrische Matrix eines Maßes (`cramers_v`, `chi2`, `p_value`, `dof`) über alle Spalten."""
+        values = getattr(self, measure)
+        result = np.full((len(self.dimensions), len(self.dimensions)), np.nan)
+        for (i, j), position in self.pairs.items():
+            result[i, j] = result[j, i] = values[position]
+        if measure == 'cramers_v':
+            np.fill_diagonal(result, 1.0)
+        return pd.DataFrame(result, index=self.dimensions, columns=self.dimensions)
+
+    def summary(self):
+        """Alle Paare mit ihren Kennzahlen, nach Cramér's V absteigend."""
+        records = [{'var1': self.dimensions[i], 'var2': self.dimensions[j], 'chi2': self.chi2[position],
+                    'dof': self.dof[position], 'p_value': self.p_value[position],
+                    'cramers_v': self.cramers_v[position], 'n': int(self.n[position])}
+                   for (i, j), position in self.pairs.items()]
+        return pd.DataFrame(records).sort_values('cramers_v', ascending=False, ignore_index=True)
@@ -0,0 +1,227 @@
+"""
+Laufzeit- und Speichermessung der Pipeline-Stufen.
+
+Jede Stufe aus `pipeline.stages.STAGES` wird in einem eigenen Prozess
+ausgeführt. Der Kindprozess (`python -m pipeline.bench <skript> <json>`)
+teilt das Skript an den Zellgrenzen (`# %%`) auf, führt die Codezellen
+nacheinander in einem gemeinsamen Namensraum aus und ordnet sie dem
+jeweils letzten Abschnitt zu (Markdown-Überschrift `# #`/`# ##`). Pro
+Abschnitt werden festgehalten:
+- Laufzeit (Wanduhr) und CPU-Zeit,
+- belegter Speicher (RSS) nach dem Abschnitt und Spitzenwert des
+  Prozesses (`ru_maxrss`) bis zum Ende des Abschnitts.
+
+Der Elternprozess misst Gesamtlaufzeit und Spitzenspeicher des
+Kindprozesses (`os.wait4`). Gemessen wird in einem Arbeitsverzeichnis mit
+synthetischen Daten (`pipeline/synth.py`): Die Skripte laufen dort mit
+ihren relativen Pfaden (`data/…`, `scripts/outputs/…`), der Code stammt
+aus dem Projektverzeichnis.
+"""
+
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+
+from pipeline.runlog import MIN_SECONDS, REGRESSION_THRESHOLD, memory_mb, regressed_metrics
+from pipeline.stages import PROJECT_ROOT, STAGES, get_stage
+
+_CELL_MARKER = re.compile(r'^# %%(.*)$')
+_HEADING = re.compile(r'^#\s+#+\s+(.*\S)')
+
+
+def split_cells(source):
+    """Zerlegt ein Skript im Jupytext-Format in Zellen: Liste von (Art, erste Zeile, Text)."""
+    cells = []
+    kind, first, lines = 'code', 1, []
+    for number, line in enumerate(source.splitlines(), start=1):
+        marker = _CELL_MARKER.match(line)
+        if marker:
+            cells.append((kind, first, '\n'.join(lines)))
+            kind = 'markdown' if '[markdown]' in marker.group(1) else 'code'
+            first, lines = number + 1, []
+        else:
+            lines.append(line)
+    cells.append((kind, first, '\n'.join(lines)))
+    return [cell for cell in cells if cell[2].strip()]
+
+
+def _heading(text):
+    for line in text.splitlines():
+        match = _HEADING.match(line)
+        if match:
+            return match.group(1)
+    return None
+
+
+def profile_script(path):
+    """
+    Führt das Skript zellenweise aus und liefert die Messwerte pro Abschnitt
+    (Liste von dicts mit section, cells, seconds, cpu_seconds, rss_mb, peak_rss_mb).
+    """
+    with open(path, encoding='utf-8') as f:
+        cells = split_cells(f.read())
+
+    namespace = {'__name__': '__main__', '__file__': path}
+    sys.argv = [path]
+    sections = []
+    current = None
+    for kind, first, text in cells:
+        if kind == 'markdown':
+            heading = _heading(text)
+            if heading is None:
+                continue
+            if current is not None and not current['cells']:
+                # Überschrift ohne Code (z. B. '# 1.' direkt vor '## 1.1.'): die tiefere gilt
+                current['section'] = heading
+            else:
+                current = _new_section(heading)
+                sections.append(current)
+            continue
+        if current is None:
+            current = _new_section('Vorbereitung')
+            sections.append(current)
+        # Leerzeilen voranstellen, damit Zeilennummern in Fehlermeldungen stimmen
+        code = compile('\n' * (first - 1) + text, path, 'exec')
+        wall, cpu = time.perf_counter(), time.process_time()
+        exec(code, namespace)
+        current['seconds'] += time.perf_counter() - wall
+        current['cpu_seconds'] += time.process_time() - cpu
+        current['cells'] += 1
+        current['rss_mb'], current['peak_rss_mb'] = memory_mb()
+    return [section for section in sections if section['cells']]
+
+
+def _new_section(name):
+    return {'section': name, 'cells': 0, 'seconds': 0.0, 'cpu_seconds': 0.0,
+            'rss_mb': None, 'peak_rss_mb': None}
+
+
+def prepare_workdir(workdir, keep_cache=False):
+    """Legt `scripts/outputs/` an und entfernt (außer bei keep_cache) den Lade-Cache in `data/.cache/`."""
+    os.makedirs(os.path.join(workdir, 'scripts', 'outputs'), exist_ok=True)
+    if not keep_cache:
+        cache_dir = os.path.join(workdir, 'data', '.cache')
+        for root, dirs, files in os.walk(cache_dir, topdown=False):
+            for name in files:
+                os.remove(os.path.join(root, name))
+            for name in dirs:
+                os.rmdir(os.path.join(root, name))
+
+
+def run_stage(stage, workdir, log=None):
+    """Misst eine Stufe im Arbeitsverzeichnis `workdir` in einem Kindprozess."""
+    for path in stage.inputs:
+        if not os.path.exists(os.path.join(workdir, path)):
+            raise FileNotFoundError(f"Eingabe der Stufe '{stage.name}' fehlt in {workdir}: {path}")
+    result_path = os.path.join(workdir, 'data', '.cache', 'bench', f'{stage.name}.json')
+    os.makedirs(os.path.dirname(result_path), exist_ok=True)
+
+    env = dict(os.environ)
+    env.setdefault('MPLBACKEND', 'Agg')
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [PROJECT_ROOT, env.get('PYTHONPATH')]))
+    command = [sys.executable, '-m', 'pipeline.bench', os.path.join(PROJECT_ROOT, stage.script), result_path]
+
+    start = time.perf_counter()
+    with open(log or os.devnull, 'a', encoding='utf-8') as out:
+        process = subprocess.Popen(command, cwd=workdir, env=env, stdout=out, stderr=subprocess.STDOUT)
+        if hasattr(os, 'wait4'):
+            _, wait_status, usage = os.wait4(process.pid, 0)
+            process.returncode = os.waitstatus_to_exitcode(wait_status)
+            peak = usage.ru_maxrss / (1024 ** 2 if sys.platform == 'darwin' else 1024)
+        else:
+            process.wait()
+            peak = None
+    elapsed = time.perf_counter() - start
+    if process.returncode != 0:
+        raise RuntimeError(f"Stufe '{stage.name}' ist fehlgeschlagen (Exitcode {process.returncode}), "
+                           f"siehe {log or 'Ausgabe'}")
+
+    with open(result_path, encoding='utf-8') as f:
+        sections = json.load(f)
+    return {'stage': stage.name, 'script': stage.script, 'seconds': elapsed,
+            'peak_rss_mb': peak, 'sections': sections}
+
+
+def benchmark(workdir, names=None, repeat=1, keep_cache=False, log=None):
+    """
+    Misst die Stufen (None = alle) in Pipeline-Reihenfolge. Bei repeat > 1
+    wird je Stufe der schnellste Lauf behalten.
+    Rückgabe: Liste der Ergebnisse pro Stufe.
+    """
+    selected = STAGES if names is None else [get_stage(name) for name in names]
+    results = []
+    for stage in STAGES:
+        if stage not in selected:
+            continue
+        runs = []
+        for _ in range(repeat):
+            prepare_workdir(workdir, keep_cache=keep_cache)
+            runs.append(run_stage(stage, workdir, log=log))
+        best = min(runs, key=lambda r: r['seconds'])
+        print(f"[{stage.name}] {best['seconds']:.1f} s, Spitzenspeicher {_format_mb(best['peak_rss_mb'])}")
+        results.append(best)
+    return results
+
+
+def compare(current, baseline, threshold=REGRESSION_THRESHOLD, min_seconds=MIN_SECONDS):
+    """
+    Vergleicht zwei Benchmark-Ergebnisse (Format von `scripts/benchmark_stages.py`)
+    pro Maßstab, Stufe und Abschnitt. Rückgabe: Liste der Verschlechterungen
+    (Maßstab, Stufe, Abschnitt, Messgröße, alt, neu).
+    """
+    regressions = []
+    old_runs = {run['scale']: run for run in baseline['runs']}
+    for run in current['runs']:
+        old_run = old_runs.get(run['scale'])
+        if old_run is None:
+            continue
+        old_stages = {s['stage']: s for s in old_run['stages']}
+        for stage in run['stages']:
+            old_stage = old_stages.get(stage['stage'])
+            if old_stage is None:
+                continue
+            pairs = [(None, old_stage, stage)]
+            old_sections = {s['section']: s for s in old_stage['sections']}
+            pairs += [(s['section'], old_sections[s['section']], s)
+                      for s in stage['sections'] if s['section'] in old_sections]
+            for section, old, new in pairs:
+                for metric, old_value, new_value in regressed_metrics(old, new, ('seconds', 'peak_rss_mb'),
+                                                                      threshold, min_seconds):
+                    regressions.append((run['scale'], stage['stage'], section, metric, old_value, new_value))
+    return regressions
+
+
+def render_markdown(report):
+    """Markdown-Tabellen (eine pro Maßstab) mit Laufzeit und Speicher je Stufe und Abschnitt."""
+    lines = ['# Benchmark der Pipeline-Stufen', '']
+    for run in report['runs']:
+        lines.append(f"## Maßstab {run['scale']:g} ({run['users']:,} Benutzer, {run['events']:,} Ereignisse)")
+        lines.append('')
+        lines.append('| Stufe | Abschnitt | Zeit (s) | CPU (s) | RSS danach (MB) | Spitze (MB) |')
+        lines.append('|---|---|---:|---:|---:|---:|')
+        for stage in run['stages']:
+            lines.append(f"| **{stage['stage']}** | gesamt | {stage['seconds']:.2f} | | "
+                         f"| {_format_mb(stage['peak_rss_mb'], unit=False)} |")
+            for section in stage['sections']:
+                lines.append(f"| | {section['section']} | {section['seconds']:.2f} | "
+                             f"{section['cpu_seconds']:.2f} | {_format_mb(section['rss_mb'], unit=False)} | "
+                             f"{_format_mb(section['peak_rss_mb'], unit=False)} |")
+        lines.append('')
+    return '\n'.join(lines)
+
+
+def _format_mb(value, unit=True):
+    if value is None:
+        return '–'
+    return f'{value:,.0f} MB' if unit else f'{value:,.0f}'
+
+
+if __name__ == '__main__':
+    # Kindprozess: python -m pipeline.bench <skript> <ergebnis.json>
+    script, result = sys.argv[1], sys.argv[2]
+    measurements = profile_script(script)
+    with open(result, 'w', encoding='utf-8') as f:
+        json.dump(measurements, f, indent=2, ensure_ascii=False)
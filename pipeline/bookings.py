@@ -0,0 +1,167 @@
+"""
+Buchungen nach Zielort und Zeitraum als vorab aggregierte Tabelle.
+
+`BookingCube` zählt Benutzer je Zeitraum (Tag, Woche oder Monat der
+Registrierung) und Zielort in einem Durchlauf: Zeiträume werden als
+Period-Ordinalzahlen, Zielorte als Kategorien-Codes kodiert und über
+ein gemeinsames `np.bincount` gezählt. Die Tabelle hat eine Zeile pro
+Zeitraum (lückenlos zwischen erstem und letztem) und eine Spalte pro
+Zielort einschließlich 'NDF' (keine Buchung); kumulative Werte,
+gröbere Zeiträume (`rollup`) und die Monatsübersicht aus III entstehen
+daraus ohne erneuten Zugriff auf die Benutzer.
+
+Für neu hinzukommende Benutzer genügt `add`: Deren Zählungen werden
+addiert, Zeitraum und Zielorte bei Bedarf erweitert. Tabellen lassen
+sich als JSON speichern.
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+
+from pipeline import runlog
+from pipeline.codes import category_codes
+
+NO_BOOKING = 'NDF'
+HOME_DESTINATION = 'US'
+DATE_COLUMN = 'account_created_date'
+DESTINATION_COLUMN = 'destination_country'
+
+FREQUENCIES = ('D', 'W', 'M')
+
+
+def period_ordinals(dates, freq):
+    """Ordinalzahlen der Perioden wie bei `Series.dt.to_period(freq)` (D, W = W-SUN, M); NaT → -1."""
+    values = np.asarray(dates, dtype='datetime64[D]')
+    missing = np.isnat(values)
+    if freq == 'M':
+        ordinals = values.astype('datetime64[M]').astype(np.int64)
+    else:
+        ordinals = values.astype(np.int64)
+        if freq == 'W':
+            # Wochen enden am Sonntag; Woche 1 beginnt am Montag, 29.12.1969
+            ordinals = (ordinals + 3) // 7 + 1
+        elif freq != 'D':
+            raise ValueError(f"Unbekannter Zeitraum: {freq!r} (erlaubt: {', '.join(FREQUENCIES)})")
+    ordinals[missing] = -1
+    return ordinals, ~missing
+
+
+class BookingCube:
+    """Anzahl der Benutzer je Zeitraum × Zielort."""
+
+    def __init__(self, freq, start, destinations, counts):
+        self.freq = freq
+        self.start = start
+        self.destinations = list(destinations)
+        self.counts = counts
+
+    @classmethod
+    def empty(cls, freq='D'):
+        return cls(freq, 0, [], np.zeros((0, 0), dtype=np.int64))
+
+    @classmethod
+    @runlog.measured('bookings.cube', rows_in=lambda cls, df, *args, **kwargs: len(df))
+    def from_frame(cls, df, freq='D', date_column=DATE_COLUMN, destination_column=DESTINATION_COLUMN):
+        """Zählt die Benutzer in `df` (Zeilen ohne Datum oder Zielort werden ausgelassen)."""
+        ordinals, valid = period_ordinals(df[date_column], freq)
+        destinations = df[destination_column]
+        codes, values = category_codes(destinations)
+        valid &= codes >= 0
+        if not valid.any():
+            return cls(freq, 0, list(values), np.zeros((0, len(values)), dtype=np.int64))
+
+        ordinals = ordinals[valid]
+        start = int(ordinals.min())
+        num_periods = int(ordinals.max()) - start + 1
+        flat = (ordinals - start) * len(values) + codes[valid]
+        counts = np.bincount(flat, minlength=num_periods * len(values)).reshape(num_periods, len(values))
+        return cls(freq, start, list(values), counts.astype(np.int64))
+
+    def add(self, df, date_column=DATE_COLUMN, destination_column=DESTINATION_COLUMN):
+        """Ergänzt die Zählungen um neu hinzugekommene Benutzer."""
+        return self.merge(BookingCube.from_frame(df, self.freq, date_column, destination_column))
+
+    def merge(self, other):
+        if other.freq != self.freq:
+            raise ValueError(f"Zeiträume passen nicht zusammen: {self.freq!r} und {other.freq!r}")
+        destinations = self.destinations + [d for d in other.destinations if d not in self.destinations]
+        cubes = [cube for cube in (self, other) if len(cube.counts) > 0]
+        if not cubes:
+            return BookingCube(self.freq, 0, destinations, np.zeros((0, len(destinations)), dtype=np.int64))
+        start = min(cube.start for cube in cubes)
+        stop = max(cube.start + len(cube.counts) for cube in cubes)
+        counts = np.zeros((stop - start, len(destinations)), dtype=np.int64)
+        for cube in cubes:
+            offset = cube.start - start
+            positions = [destinations.index(d) for d in cube.destinations]
+            counts[offset:offset + len(cube.counts), positions] += cube.counts
+        return BookingCube(self.freq, start, destinations, counts)
+
+    # Abfragen
+
+    @property
+    def periods(self):
+        return pd.PeriodIndex.from_ordinals(np.arange(self.start, self.start + len(self.counts)), freq=self.freq)
+
+    def table(self, destinations=None):
+        """Anzahl je Zeitraum (Zeilen) und Zielort (Spalten), lückenlos."""
+        df = pd.DataFrame(self.counts, index=self.periods, columns=self.destinations)
+        return df if destinations is None else df.reindex(columns=destinations, fill_value=0)
+
+    def cumulative(self, destinations=None):
+        """Kumulative Anzahl bis zum Ende jedes Zeitraums."""
+        return self.table(destinations).cumsum()
+
+    def totals(self):
+        """Registrierungen und Buchungen (alle Zielorte außer NDF) je Zeitraum."""
+        table = self.table()
+        booked = table.drop(columns=[NO_BOOKING], errors='ignore').sum(axis=1)
+        return pd.DataFrame({'total_users': table.sum(axis=1), 'booked_users': booked})
+
+    def rollup(self, freq):
+        """Dieselben Zählungen für gröbere Zeiträume (z. B. Tage → Monate)."""
+        if freq == self.freq:
+            return self
+        if len(self.counts) == 0:
+            return BookingCube(freq, 0, self.destinations, self.counts.copy())
+        ordinals = self.periods.asfreq(freq).asi8
+        start = int(ordinals[0])
+        counts = np.zeros((int(ordinals[-1]) - start + 1, len(self.destinations)), dtype=np.int64)
+        np.add.at(counts, ordinals - start, self.counts)
+        return BookingCube(freq, start, self.destinations, counts)
+
+    def summary(self, period_name='period', destinations=None):
+        """
+        Übersicht wie die Monatszusammenfassung in III: total_users,
+        booked_users, booked_<Zielort>, booked_non_US und conversion_rate (%).
+        """
+        booked_destinations = [d for d in (destinations or self.destinations) if d != NO_BOOKING]
+        table = self.table(booked_destinations)
+        df = self.totals()
+        for destination in booked_destinations:
+            df[f'booked_{destination}'] = table[destination]
+        df[f'booked_non_{HOME_DESTINATION}'] = table.drop(columns=[HOME_DESTINATION], errors='ignore').sum(axis=1)
+        df['conversion_rate'] = round(df['booked_users'] / df['total_users'] * 100, 2)
+        return df.rename_axis(period_name).reset_index()
+
+    # Serialisierung
+
+    def to_dict(self):
+        return {'freq': self.freq, 'start': self.start, 'destinations': self.destinations,
+                'counts': self.counts.tolist()}
+
+    @classmethod
+    def from_dict(cls, data):
+        counts = np.array(data['counts'], dtype=np.int64).reshape(-1, len(data['destinations']))
+        return cls(data['freq'], data['start'], data['destinations'], counts)
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
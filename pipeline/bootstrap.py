@@ -0,0 +1,157 @@
+"""
+Bootstrap- und Permutationsintervalle für Conversion Rates und Affinitäten.
+
+Die Benutzer gehen nur über ihre Anzahlen je Zelle ein: Ein Bootstrap
+(Ziehen von n Benutzern mit Zurücklegen) entspricht einer
+Multinomialverteilung über die Zellen einer Zusammenfassung oder
+Kreuztabelle, der Poisson-Bootstrap unabhängigen Poisson-Zahlen je
+Zelle. Beides wird für viele Replikate auf einmal gezogen
+(Replikate × Zellen) und daraus die Kennzahl je Replikat und Zelle
+vektorisiert berechnet.
+
+Permutationen (Zuordnung der Zielorte zufällig vertauscht) entsprechen
+Zufallstabellen mit festen Zeilen- und Spaltensummen
+(`scipy.stats.random_table`); daraus ergeben sich p-Werte je Zelle der
+Affinitätsmatrix.
+
+Die Replikate werden in Blöcken mit eigenem Seed gezogen (Ergebnis
+unabhängig von der Anzahl der Prozesse) und bei workers > 1 auf einen
+Prozesspool verteilt; alle Spalten bzw. Paare teilen sich einen Lauf.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy.stats import random_table
+
+from pipeline import runlog
+
+REPLICATES = 1000
+BLOCK_REPLICATES = 250
+METHODS = ('multinomial', 'poisson')
+
+
+def _draw(task):
+    """Ein Block von Replikaten: (Replikate × Zellen) Anzahlen."""
+    method, counts, size, seed = task
+    rng = np.random.default_rng(seed)
+    if method == 'permutation':
+        table = np.asarray(counts)
+        tables = random_table(table.sum(axis=1), table.sum(axis=0), seed=rng).rvs(size=size)
+        return tables.reshape(size, -1)
+    if method == 'poisson':
+        return rng.poisson(counts, size=(size, len(counts)))
+    total = counts.sum()
+    if total == 0:
+        return np.zeros((size, len(counts)), dtype=np.int64)
+    return rng.multinomial(total, counts / total, size=size)
+
+
+def resample(jobs, replicates=REPLICATES, seed=0, workers=None):
+    """
+    Zieht für jeden Auftrag (Methode, Anzahlen) `replicates` Replikate und
+    liefert die Arrays (Replikate × Zellen) in Auftragsreihenfolge.
+    workers > 1 (None = Anzahl der CPUs): Blöcke parallel in eigenen Prozessen.
+    """
+    sizes = [BLOCK_REPLICATES] * (replicates // BLOCK_REPLICATES)
+    if replicates % BLOCK_REPLICATES:
+        sizes.append(replicates % BLOCK_REPLICATES)
+    seeds = np.random.SeedSequence(seed).spawn(len(jobs) * len(sizes))
+    tasks = [(method, counts, size, seeds[i * len(sizes) + k])
+             for i, (method, counts) in enumerate(jobs) for k, size in enumerate(sizes)]
+
+    workers = os.cpu_count() if workers is None else workers
+    if workers <= 1 or len(tasks) <= 1:
+        blocks = [_draw(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as executor:
+            blocks = list(executor.map(_draw, tasks))
+    return [np.concatenate(blocks[i * len(sizes):(i + 1) * len(sizes)]) for i in range(len(jobs))]
+
+
+def _bounds(values, confidence):
+    """Perzentilintervall je Zelle über die Replikate (Achse 0)."""
+    alpha = (1 - confidence) / 2 * 100
+    with np.errstate(invalid='ignore'):
+        return np.nanpercentile(values, [alpha, 100 - alpha], axis=0)
+
+
+@runlog.measured('bootstrap.conversion_intervals', rows_in=lambda cube, *args, **kwargs: len(cube))
+def conversion_intervals(cube, columns, replicates=REPLICATES, confidence=0.95, method='multinomial',
+                         seed=0, workers=None):
+    """
+    Conversion Rate mit Bootstrap-Intervall je Wert jeder Spalte. Rückgabe:
+    {Spalte: `cube.summary(Spalte)` mit conversion_low/conversion_high (%)}.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unbekannte Methode: {method!r} (erlaubt: {', '.join(METHODS)})")
+    summaries = {col: cube.summary(col) for col in columns}
+    # Zellen je Spalte: gebucht und nicht gebucht je Wert
+    jobs = [(method, np.concatenate([s['booked_users'].to_numpy(),
+                                     (s['total_users'] - s['booked_users']).to_numpy()]))
+            for s in summaries.values()]
+
+    results = {}
+    for (col, summary), draws in zip(summaries.items(), resample(jobs, replicates, seed, workers)):
+        booked, not_booked = np.split(draws, 2, axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rates = booked / (booked + not_booked) * 100
+        low, high = _bounds(rates, confidence)
+        summary = summary.copy()
+        summary['conversion_low'] = np.round(low, 2)
+        summary['conversion_high'] = np.round(high, 2)
+        results[col] = summary
+    return results
+
+
+def _lift(tables):
+    """Affinität n·beobachtet / (Zeilensumme·Spaltensumme) für (… × Zeilen × Spalten)."""
+    tables = tables.astype(np.float64)
+    rows = tables.sum(axis=-1, keepdims=True)
+    cols = tables.sum(axis=-2, keepdims=True)
+    n = tables.sum(axis=(-2, -1), keepdims=True)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return tables * n / (rows * cols)
+
+
+@runlog.measured('bootstrap.lift_intervals', rows_out=len)
+def lift_intervals(associations, pairs, min_sample=25, replicates=REPLICATES, confidence=0.95,
+                   method='multinomial', permutations=True, seed=0, workers=None):
+    """
+    Affinitäten aller Zellen der Kreuztabellen `pairs` [(var1, var2), …] mit
+    Bootstrap-Intervall (lift_low/lift_high) und, falls `permutations`,
+    zweiseitigem Permutations-p-Wert. Zellen mit weniger als `min_sample`
+    Benutzern erhalten wie in der Heatmap keine Werte.
+    Rückgabe: eine Zeile pro Zelle aller Paare.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unbekannte Methode: {method!r} (erlaubt: {', '.join(METHODS)})")
+    tables = [associations.table(var1, var2) for var1, var2 in pairs]
+    jobs = [(method, table.to_numpy().ravel()) for table in tables]
+    if permutations:
+        jobs += [('permutation', table.to_numpy()) for table in tables]
+    draws = resample(jobs, replicates, seed, workers)
+
+    parts = []
+    for k, ((var1, var2), table) in enumerate(zip(pairs, tables)):
+        counts = table.to_numpy()
+        shape = (replicates,) + counts.shape
+        lift = _lift(counts)
+        low, high = _bounds(_lift(draws[k].reshape(shape)).reshape(replicates, -1), confidence)
+        part = pd.DataFrame({
+            'var1': var1, 'value1': np.repeat(table.index.astype(object), counts.shape[1]),
+            'var2': var2, 'value2': np.tile(table.columns.astype(object), counts.shape[0]),
+            'count': counts.ravel(), 'lift': lift.ravel(), 'lift_low': low, 'lift_high': high,
+        })
+        if permutations:
+            null = draws[len(tables) + k]
+            observed = counts.ravel()
+            upper = (null >= observed).mean(axis=0)
+            lower = (null <= observed).mean(axis=0)
+            part['p_value'] = np.minimum(1.0, 2 * np.minimum(upper, lower))
+        small = part['count'] < min_sample
+        part.loc[small, [c for c in part.columns if c.startswith('lift') or c == 'p_value']] = np.nan
+        parts.append(part)
+    return pd.concat(parts, ignore_index=True)
@@ -0,0 +1,175 @@
+"""
+Nach Benutzer partitionierte Ablage der bereinigten Clickstreams.
+
+`write_bucketed` verteilt die Ereignisse über einen stabilen Hash von
+`session_user_id` auf NUM_BUCKETS Dateien (`bucket-00.parquet`, …) in
+einem Verzeichnis. Innerhalb jeder Datei sind die Zeilen nach Benutzer
+sortiert; die Reihenfolge der Ereignisse eines Benutzers bleibt erhalten.
+Die Row-Groups umfassen höchstens ROW_GROUP_ROWS Zeilen und damit einen
+schmalen, nicht überlappenden Bereich von Benutzer-IDs, sodass die
+Min/Max-Statistiken Filter auf `session_user_id` abschneiden.
+
+Damit lassen sich Auswertungen pro Benutzer Bucket für Bucket ausführen
+(`iter_buckets`, parallel mit `map_buckets`): Alle Ereignisse eines
+Benutzers liegen in genau einer Datei, der Speicherbedarf ist durch die
+Größe eines Buckets begrenzt. `load_user_events` liest für einzelne
+Benutzer nur die betroffenen Dateien und Row-Groups.
+
+Das Verzeichnis kann auch mit `load_clickstreams` als Ganzes gelesen
+werden.
+"""
+
+import json
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from pipeline import runlog
+from pipeline.clickstreams import (ClickstreamWriter, DICTIONARY_COLUMNS, USER_ID_COLUMN,
+                                   compact_clickstreams, drop_unused_categories)
+from pipeline.codes import category_codes
+
+NUM_BUCKETS = 16
+ROW_GROUP_ROWS = 65_536
+LAYOUT_FILE = '_layout.json'
+
+
+def _bucket_file(bucket):
+    return f'bucket-{bucket:02d}.parquet'
+
+
+def user_buckets(user_ids, num_buckets=NUM_BUCKETS):
+    """
+    Bucket (0 … num_buckets-1) je Benutzer-ID; stabil über Prozesse und
+    Plattformen (`pd.util.hash_array` mit festem Schlüssel). Fehlende IDs
+    erhalten -1.
+    """
+    series = user_ids if isinstance(user_ids, pd.Series) else pd.Series(user_ids)
+    codes, values = category_codes(series)
+    value_buckets = (pd.util.hash_array(np.asarray(values, dtype=object)) % np.uint64(num_buckets)).astype(np.int64)
+    buckets = np.full(len(codes), -1, dtype=np.int64)
+    valid = codes >= 0
+    buckets[valid] = value_buckets[codes[valid]]
+    return buckets
+
+
+def user_rank(series):
+    """Rang der Benutzer-ID in lexikographischer Reihenfolge (wie die Parquet-Statistiken)."""
+    codes, categories = category_codes(series)
+    rank = np.empty(len(categories), dtype=np.int64)
+    rank[np.argsort(np.asarray(categories, dtype=object), kind='stable')] = np.arange(len(categories))
+    return np.where(codes >= 0, rank[np.maximum(codes, 0)], -1)
+
+
+@runlog.measured('buckets.write', rows_in=lambda df, *args, **kwargs: len(df))
+def write_bucketed(df, path, num_buckets=NUM_BUCKETS, row_group_size=ROW_GROUP_ROWS):
+    """
+    Schreibt `df` nach Benutzer partitioniert und sortiert in das Verzeichnis
+    `path` (eine vorhandene Datei oder ein Verzeichnis gleichen Namens wird ersetzt).
+    Zeilen ohne session_user_id landen in Bucket 0.
+    """
+    buckets = np.maximum(user_buckets(df[USER_ID_COLUMN], num_buckets), 0)
+    # Stabile Sortierung nach (Bucket, Benutzer): Ereignisfolge je Benutzer bleibt erhalten
+    order = np.lexsort((user_rank(df[USER_ID_COLUMN]), buckets))
+    bounds = np.searchsorted(buckets[order], np.arange(num_buckets + 1))
+
+    tmp_dir = path + '.tmp'
+    if os.path.exists(tmp_dir):
+        shutil.rmtree(tmp_dir)
+    os.makedirs(tmp_dir)
+    for bucket in range(num_buckets):
+        part = drop_unused_categories(df.iloc[order[bounds[bucket]:bounds[bucket + 1]]])
+        with ClickstreamWriter(os.path.join(tmp_dir, _bucket_file(bucket)), row_group_size=row_group_size) as writer:
+            writer.write(part)
+    with open(os.path.join(tmp_dir, LAYOUT_FILE), 'w', encoding='utf-8') as f:
+        json.dump({'num_buckets': num_buckets, 'key': USER_ID_COLUMN,
+                   'row_group_size': row_group_size, 'rows': len(df)}, f, indent=2)
+
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+    elif os.path.exists(path):
+        os.remove(path)
+    os.replace(tmp_dir, path)
+
+
+def read_layout(path):
+    with open(os.path.join(path, LAYOUT_FILE), encoding='utf-8') as f:
+        return json.load(f)
+
+
+def bucket_paths(path):
+    """Pfade aller Bucket-Dateien (Index = Bucket)."""
+    layout = read_layout(path)
+    return [os.path.join(path, _bucket_file(bucket)) for bucket in range(layout['num_buckets'])]
+
+
+def _read(paths, columns=None, filters=None):
+    read_columns = pq.read_schema(paths[0]).names if columns is None else list(columns)
+    read_dictionary = [col for col in DICTIONARY_COLUMNS if col in read_columns]
+    source = paths[0] if len(paths) == 1 else paths
+    table = pq.read_table(source, columns=columns, filters=filters, read_dictionary=read_dictionary)
+    return drop_unused_categories(compact_clickstreams(table.to_pandas()))
+
+
+def _empty(path, columns=None):
+    """Leerer DataFrame mit den Spalten und Typen, die `_read` für diese Datei liefert."""
+    schema = pq.ParquetFile(path, read_dictionary=DICTIONARY_COLUMNS).schema_arrow
+    if columns is not None:
+        schema = pa.schema([schema.field(col) for col in columns])
+    df = compact_clickstreams(schema.empty_table().to_pandas())
+    # Leere Dictionaries ergeben Kategorien vom Typ object; `_read` liefert Text-Kategorien
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = pd.Categorical([], categories=pd.Index([], dtype='str'))
+    return df
+
+
+def read_bucket(path, bucket, columns=None):
+    """Alle Ereignisse eines Buckets (kompakte Darstellung)."""
+    return _read([bucket_paths(path)[bucket]], columns=columns)
+
+
+def iter_buckets(path, columns=None):
+    """Liefert (Bucket, DataFrame) nacheinander; immer nur ein Bucket im Speicher."""
+    for bucket, bucket_path in enumerate(bucket_paths(path)):
+        yield bucket, _read([bucket_path], columns=columns)
+
+
+def load_user_events(path, user_ids, columns=None, filters=None):
+    """
+    Ereignisse der angegebenen Benutzer: nur deren Bucket-Dateien werden
+    geöffnet, und darin nur Row-Groups, deren Benutzerbereich passt.
+    `filters` (pyarrow-Format, eine Liste) wird zusätzlich angewendet.
+    """
+    user_ids = list(user_ids)
+    layout = read_layout(path)
+    buckets = np.unique(user_buckets(pd.Series(user_ids, dtype=object), layout['num_buckets']))
+    paths = [bucket_paths(path)[bucket] for bucket in buckets if bucket >= 0]
+    if not paths:
+        # Keine Benutzer angegeben: leerer DataFrame mit dem Schema der Daten (ohne Filter)
+        return _empty(bucket_paths(path)[0], columns=columns)
+    return _read(paths, columns=columns, filters=[(USER_ID_COLUMN, 'in', user_ids)] + list(filters or []))
+
+
+def _apply(args):
+    func, path, columns = args
+    return func(_read([path], columns=columns))
+
+
+def map_buckets(func, path, columns=None, workers=None):
+    """
+    Wendet `func(df)` auf jeden Bucket an und liefert die Ergebnisse in
+    Bucket-Reihenfolge. workers > 1 (None = Anzahl der CPUs): parallel in
+    eigenen Prozessen; `func` muss dann auf Modulebene definiert sein.
+    """
+    tasks = [(func, bucket_path, columns) for bucket_path in bucket_paths(path)]
+    workers = os.cpu_count() if workers is None else workers
+    if workers <= 1:
+        return [_apply(task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as executor:
+        return list(executor.map(_apply, tasks))
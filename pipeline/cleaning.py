@@ -0,0 +1,304 @@
+"""
+Bereinigung der Clickstream-Daten (II) mit austauschbarem Backend.
+
+Beide Backends führen dieselben Schritte aus und liefern ein
+`CleaningResult` mit denselben Profilen, Kennzahlen und demselben
+bereinigten DataFrame:
+
+1. Duplikate entfernen (das erste Vorkommen bleibt erhalten),
+2. '-unknown-' durch fehlende Werte ersetzen,
+3. `is_new_session` setzen (Pause > `config.SESSION_GAP_SECONDS`),
+4. Profil der Zeilen mit `time_passed_in_seconds == 0`,
+5. Zeilen ohne Benutzer, Aktion oder Zeit entfernen.
+
+`pandas`: kompakter DataFrame aus `load_clickstreams`, Duplikate über
+64-Bit-Fingerabdrücke (pipeline/dedup.py).
+
+`arrow`: alle Schritte auf der Arrow-Tabelle mit den Kernels aus
+`pyarrow.compute`. Die Textspalten bleiben Dictionary-Arrays; Profile
+entstehen aus den Dictionary-Indizes, '-unknown-' wird durch Umcodieren
+der Indizes entfernt, Duplikate werden exakt über `group_by` über alle
+Spalten erkannt. Nach pandas wird nur an den Rändern konvertiert: die
+bereinigte Tabelle am Ende sowie die Vorschau der ersten Zeilen.
+"""
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from pipeline import config, runlog
+from pipeline.clickstreams import (CLICKSTREAMS_PATH, DICTIONARY_COLUMNS, REQUIRED_COLUMNS, TIME_COLUMN,
+                                   UNKNOWN_COLUMNS, UNKNOWN_VALUE, ZERO_TIME_COLUMNS, _schema_names,
+                                   compact_time_dtype, dataset_schema, load_clickstreams, replace_with_nan)
+from pipeline.dedup import duplicated
+from pipeline.profiling import ColumnProfile, DataProfile
+
+BACKENDS = ('pandas', 'arrow')
+PREVIEW_ROWS = 25
+
+# Hilfsspalte mit der Zeilennummer (Duplikaterkennung)
+ROW_COLUMN = '__row'
+
+
+class CleaningResult:
+    """Profile und Kennzahlen der einzelnen Schritte sowie der bereinigte DataFrame."""
+
+    def __init__(self, frame, rows_initial, dtypes, memory_bytes, preview, raw_profile, duplicates_profile,
+                 dedup_profile, profile, extreme_count, zero_count, zero_time_profile, missing_after):
+        self.frame = frame
+        self.rows_initial = rows_initial
+        self.dtypes = dtypes
+        self.memory_bytes = memory_bytes
+        self.preview = preview
+        self.raw_profile = raw_profile
+        self.duplicates_profile = duplicates_profile
+        self.dedup_profile = dedup_profile
+        self.profile = profile
+        self.extreme_count = extreme_count
+        self.zero_count = zero_count
+        self.zero_time_profile = zero_time_profile
+        self.missing_after = missing_after
+
+    @property
+    def num_duplicates(self):
+        return self.duplicates_profile.rows
+
+    @property
+    def rows_dedup(self):
+        """Zeilen nach Entfernung der Duplikate (Bezug der Zeitkennzahlen)."""
+        return self.dedup_profile.rows
+
+
+def clean_clickstreams(path=CLICKSTREAMS_PATH, backend='pandas', gap_seconds=config.SESSION_GAP_SECONDS):
+    """Lädt und bereinigt die Clickstream-Daten mit dem angegebenen Backend."""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unbekanntes Backend: {backend!r} (erlaubt: {', '.join(BACKENDS)})")
+    with runlog.step('clickstreams.load', backend=backend) as step:
+        data = load_clickstreams(path) if backend == 'pandas' else read_table(path)
+        step.rows_out = len(data)
+    if backend == 'pandas':
+        return clean_frame(data, gap_seconds)
+    return clean_table(data, gap_seconds)
+
+
+# pandas
+
+def clean_frame(df, gap_seconds=config.SESSION_GAP_SECONDS):
+    """Bereinigt einen kompakten Clickstream-DataFrame (aus `load_clickstreams`)."""
+    rows_initial = len(df)
+    dtypes = df.dtypes
+    memory_bytes = int(df.memory_usage(deep=True).sum())
+    preview = df.head(PREVIEW_ROWS)
+    with runlog.step('clickstreams.profile_raw', rows_in=len(df)):
+        raw_profile = DataProfile.from_frame(df)
+
+    with runlog.step('clickstreams.dedup', rows_in=len(df), backend='pandas') as step:
+        duplicate_mask = duplicated(df)
+        duplicates_profile = DataProfile.from_frame(df[duplicate_mask])
+        df = df[~duplicate_mask].copy(deep=False)
+        step.rows_out = len(df)
+    with runlog.step('clickstreams.profile_dedup', rows_in=len(df)):
+        dedup_profile = DataProfile.from_frame(df)
+
+    with runlog.step('clickstreams.replace_unknown', rows_in=len(df), backend='pandas'):
+        for col in UNKNOWN_COLUMNS:
+            df[col] = replace_with_nan(df[col], UNKNOWN_VALUE)
+    with runlog.step('clickstreams.profile_clean', rows_in=len(df)):
+        profile = DataProfile.from_frame(df)
+
+    with runlog.step('clickstreams.new_session_flag', rows_in=len(df), backend='pandas'):
+        time_col = df[TIME_COLUMN]
+        extreme_time = time_col > gap_seconds
+        df['is_new_session'] = extreme_time
+    with runlog.step('clickstreams.zero_time_profile', rows_in=len(df), backend='pandas') as step:
+        zero_time = time_col == 0
+        zero_time_profile = DataProfile.from_frame(df[zero_time], columns=ZERO_TIME_COLUMNS)
+        step.rows_out = zero_time_profile.rows
+
+    with runlog.step('clickstreams.drop_missing', rows_in=len(df), backend='pandas') as step:
+        missing_after = df.isnull().sum()
+        df = df.dropna(subset=REQUIRED_COLUMNS)
+        step.rows_out = len(df)
+    return CleaningResult(df, rows_initial, dtypes, memory_bytes, preview, raw_profile, duplicates_profile,
+                          dedup_profile, profile, int(extreme_time.sum()), int(zero_time.sum()),
+                          zero_time_profile, missing_after)
+
+
+# Arrow
+
+def read_table(path=CLICKSTREAMS_PATH, columns=None):
+    """
+    Liest die Clickstream-Daten als Arrow-Tabelle in derselben kompakten
+    Darstellung wie `load_clickstreams`: Textspalten als Dictionary-Arrays
+    (ein gemeinsames Dictionary pro Spalte), Zeitspalte als float32,
+    sofern alle Werte exakt darstellbar sind.
+    """
+    read_columns = _schema_names(path) if columns is None else list(columns)
+    read_dictionary = [col for col in DICTIONARY_COLUMNS if col in read_columns]
+    table = pq.read_table(path, columns=columns, read_dictionary=read_dictionary,
+                          schema=dataset_schema(path, read_dictionary))
+    # Ein Chunk pro Spalte; die Dictionaries entsprechen den Kategorien nach to_pandas()
+    table = table.unify_dictionaries().combine_chunks()
+    if TIME_COLUMN in table.column_names:
+        position = table.column_names.index(TIME_COLUMN)
+        table = table.set_column(position, TIME_COLUMN, _compact_float(table.column(TIME_COLUMN)))
+    return table
+
+
+def _compact_float(column):
+    values = column.to_numpy()
+    # Dieselbe Regel wie compact_clickstreams (float32 nur bei exakter Darstellung)
+    dtype = compact_time_dtype(values)
+    if dtype == values.dtype:
+        return column
+    return pa.array(values.astype(dtype), from_pandas=True)
+
+
+def _present(array):
+    """Maske der vorhandenen Werte (NaN gilt wie in pandas als fehlend)."""
+    mask = pc.is_valid(array)
+    if pa.types.is_floating(array.type):
+        mask = pc.and_(mask, pc.invert(pc.fill_null(pc.is_nan(array), True)))
+    return mask
+
+
+def _count(mask):
+    return pc.sum(mask, min_count=0).as_py()
+
+
+def _categories(dictionary):
+    """Kategorien, die pandas für dieses Dictionary erzeugt."""
+    empty = pa.DictionaryArray.from_arrays(pa.array([], type=pa.int32()), dictionary)
+    return empty.to_pandas().cat.categories
+
+
+def pandas_memory_bytes(table):
+    """
+    Speicherbedarf von `table.to_pandas()` wie `memory_usage(deep=True).sum()`,
+    ohne die Tabelle zu konvertieren (vergleichbar mit dem pandas-Backend).
+    Dictionary-Spalten: pandas-Codes (int8/int16/…, je nach Anzahl der
+    Kategorien) statt der int32-Indizes von Arrow.
+    """
+    total = pd.RangeIndex(table.num_rows).memory_usage(deep=True)
+    for column in table.columns:
+        if pa.types.is_dictionary(column.type):
+            categories = _categories(column.combine_chunks().dictionary)
+            codes = pd.Categorical.from_codes([], categories=categories).codes
+            total += table.num_rows * codes.itemsize + categories.memory_usage(deep=True)
+        elif pa.types.is_primitive(column.type):
+            total += table.num_rows * np.dtype(column.type.to_pandas_dtype()).itemsize
+        else:
+            total += column.to_pandas().memory_usage(deep=True, index=False)
+    return int(total)
+
+
+def column_profile(name, array):
+    """`ColumnProfile` eines Arrow-Arrays, wie `ColumnProfile.from_series` nach to_pandas()."""
+    if isinstance(array, pa.ChunkedArray):
+        array = array.combine_chunks()
+    if pa.types.is_dictionary(array.type):
+        counts = np.bincount(pc.drop_null(array.indices).to_numpy(), minlength=len(array.dictionary))
+        present = counts > 0
+        counts = pd.Series(counts[present], index=_categories(array.dictionary)[present], dtype='int64')
+        return ColumnProfile(name, 'category', False, counts, array.null_count)
+    if pa.types.is_integer(array.type) or pa.types.is_floating(array.type):
+        values = pc.filter(array, _present(array))
+        value_counts = pc.value_counts(values)
+        counts = pd.Series(value_counts.field('counts').to_numpy(), dtype='int64',
+                           index=pd.Index(value_counts.field('values').to_numpy()))
+        dtype = str(np.dtype(array.type.to_pandas_dtype()))
+        return ColumnProfile(name, dtype, True, counts.sort_index(), len(array) - len(values))
+    return ColumnProfile.from_series(array.to_pandas().rename(name))
+
+
+def profile_table(table, columns=None):
+    """`DataProfile` einer Arrow-Tabelle, wie `DataProfile.from_frame` nach to_pandas()."""
+    columns = table.column_names if columns is None else columns
+    return DataProfile(table.num_rows, {col: column_profile(col, table.column(col)) for col in columns})
+
+
+def first_occurrences(table):
+    """
+    Maske der ersten Vorkommen jeder Zeile (wie `~df.duplicated()`): je
+    Gruppe gleicher Zeilen die kleinste Zeilennummer, exakt ohne Hash-Kollisionen.
+    """
+    rows = pa.array(np.arange(table.num_rows, dtype=np.int64))
+    first = (table.append_column(ROW_COLUMN, rows)
+             .group_by(table.column_names, use_threads=False)
+             .aggregate([(ROW_COLUMN, 'min')]))
+    return pc.is_in(rows, value_set=first.column(f'{ROW_COLUMN}_min').combine_chunks())
+
+
+def replace_with_null(array, value=UNKNOWN_VALUE):
+    """
+    Ersetzt `value` in einem Dictionary-Array durch null, ohne die Werte zu
+    dekodieren: Der Eintrag wird aus dem Dictionary entfernt und die
+    Indizes werden umcodiert. Wie `cat.remove_categories` werden die
+    übrigen Einträge dabei sortiert.
+    """
+    if isinstance(array, pa.ChunkedArray):
+        array = array.combine_chunks()
+    dictionary = array.dictionary
+    kept = np.flatnonzero(pc.not_equal(dictionary, value).to_numpy(zero_copy_only=False))
+    if len(kept) == len(dictionary):
+        return array
+    kept = kept[pc.sort_indices(dictionary.take(kept)).to_numpy()]
+    # Alter Index -> neuer Index (null für den entfernten Eintrag)
+    mapping = np.full(len(dictionary), -1, dtype=np.int64)
+    mapping[kept] = np.arange(len(kept))
+    mapping = pa.array(mapping, mask=mapping < 0).cast(array.indices.type)
+    return pa.DictionaryArray.from_arrays(pc.take(mapping, array.indices), dictionary.take(kept))
+
+
+def clean_table(table, gap_seconds=config.SESSION_GAP_SECONDS):
+    """Bereinigt eine Clickstream-Tabelle (aus `read_table`) mit Arrow-Kernels."""
+    rows_initial = table.num_rows
+    memory_bytes = pandas_memory_bytes(table)
+    dtypes = table.schema.empty_table().to_pandas().dtypes
+    preview = table.slice(0, PREVIEW_ROWS).to_pandas()
+    with runlog.step('clickstreams.profile_raw', rows_in=table.num_rows):
+        raw_profile = profile_table(table)
+
+    with runlog.step('clickstreams.dedup', rows_in=table.num_rows, backend='arrow') as step:
+        keep = first_occurrences(table)
+        duplicates_profile = profile_table(table.filter(pc.invert(keep)))
+        # Zeilennummern der Rohdaten (Index des DataFrames wie nach Filtern in pandas)
+        rows = pc.indices_nonzero(keep)
+        table = table.filter(keep)
+        step.rows_out = table.num_rows
+    with runlog.step('clickstreams.profile_dedup', rows_in=table.num_rows):
+        dedup_profile = profile_table(table)
+
+    with runlog.step('clickstreams.replace_unknown', rows_in=table.num_rows, backend='arrow'):
+        for col in UNKNOWN_COLUMNS:
+            table = table.set_column(table.column_names.index(col), col, replace_with_null(table.column(col)))
+    with runlog.step('clickstreams.profile_clean', rows_in=table.num_rows):
+        profile = profile_table(table)
+
+    with runlog.step('clickstreams.new_session_flag', rows_in=table.num_rows, backend='arrow'):
+        time_col = table.column(TIME_COLUMN)
+        extreme_time = pc.fill_null(pc.greater(time_col, gap_seconds), False)
+        table = table.append_column('is_new_session', extreme_time)
+    with runlog.step('clickstreams.zero_time_profile', rows_in=table.num_rows, backend='arrow') as step:
+        zero_time = pc.fill_null(pc.equal(time_col, 0), False)
+        zero_time_profile = profile_table(table.filter(zero_time), columns=ZERO_TIME_COLUMNS)
+        step.rows_out = zero_time_profile.rows
+
+    with runlog.step('clickstreams.drop_missing', rows_in=table.num_rows, backend='arrow') as step:
+        missing_after = pd.Series({col: table.num_rows - _count(_present(table.column(col)))
+                                   for col in table.column_names}, dtype='int64')
+        required = _present(table.column(REQUIRED_COLUMNS[0]))
+        for col in REQUIRED_COLUMNS[1:]:
+            required = pc.and_(required, _present(table.column(col)))
+        rows = pc.filter(rows, required)
+        table = table.filter(required)
+        step.rows_out = table.num_rows
+
+    with runlog.step('clickstreams.to_pandas', rows_in=table.num_rows):
+        df = table.to_pandas()
+        df.index = pd.Index(rows.to_numpy(), dtype='int64')
+    return CleaningResult(df, rows_initial, dtypes, memory_bytes, preview, raw_profile,
+                          duplicates_profile, dedup_profile, profile, _count(extreme_time),
+                          _count(zero_time), zero_time_profile, missing_after)
@@ -0,0 +1,95 @@
+"""
+Gemeinsamer Einstiegspunkt: `python -m pipeline <befehl> [optionen]`.
+
+Jeder Befehl führt eines der Skripte aus `scripts/` im selben Prozess
+aus (Optionen werden unverändert weitergereicht, `<befehl> --help`
+zeigt die Optionen des Skripts) und schaltet das Laufprotokoll ein
+(pipeline/runlog.py). Dieses Modul selbst importiert nur die
+Standardbibliothek und pipeline/runlog.py (ebenfalls nur
+Standardbibliothek); NumPy, pandas, Matplotlib, seaborn und SciPy werden
+erst von dem Skript geladen, das sie braucht. Befehle ohne Abbildungen
+(`validate`, `errors`, `clean-users`, `reports`, `runs`, `run`) laden daher weder
+Matplotlib noch SciPy.
+
+`run` führt die Pipeline I → II → III mit Stufen-Cache aus
+(pipeline/stages.py, wie `scripts/run_pipeline.py`).
+
+Aufruf aus dem Projektstammverzeichnis, Datenpfade relativ dazu.
+"""
+
+import argparse
+import os
+import runpy
+import sys
+
+from pipeline import runlog
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Befehl: (Skript, Beschreibung)
+COMMANDS = {
+    'clean-users': ('scripts/clean_user_data.py', 'Datenbereinigung von user.csv mit Bericht'),
+    'clean-clickstreams': ('scripts/clean_clickstream_data.py',
+                           'Datenbereinigung von clickstreams.parquet mit Bericht und Plots'),
+    'missing-values': ('scripts/visualize_missing_values.py', 'Visualisierung fehlender Werte in user.csv'),
+    'errors': ('scripts/find_user_csv_errors.py', 'Fehlersuche in user.csv mit Bericht'),
+    'validate': ('scripts/validate_eda.py', 'Schnelle Validierung der Hauptschritte der EDA'),
+    'reports': ('scripts/render_reports.py', 'Berichte aus gespeicherten Kennzahlen neu erzeugen'),
+    'eda': ('scripts/render_figures.py', 'Notebooks (Standard: III) ausführen und Abbildungen ohne Bildschirm rendern'),
+    'runs': ('scripts/summarize_run_log.py', 'Laufprotokoll der Pipeline-Schritte zusammenfassen'),
+}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m pipeline',
+                                     description='Datenaufbereitung und EDA (I → II → III).')
+    subparsers = parser.add_subparsers(dest='command', metavar='BEFEHL', required=True)
+    for name, (script, description) in COMMANDS.items():
+        # Optionen (auch --help) gehören dem Skript
+        subparsers.add_parser(name, help=description, add_help=False)
+
+    run_parser = subparsers.add_parser('run', help='Pipeline I → II → III mit Stufen-Cache ausführen',
+                                       description='Pipeline I → II → III mit Stufen-Cache ausführen.')
+    run_parser.add_argument('stages', nargs='*', metavar='STUFE',
+                            help='auszuführende Stufen (users, clickstreams, features, events, eda; Standard: alle)')
+    run_parser.add_argument('--force', action='store_true',
+                            help='angegebene Stufen unabhängig vom Cache ausführen')
+    run_parser.add_argument('--dry-run', action='store_true',
+                            help='nur den Status der Stufen anzeigen')
+    return parser
+
+
+def run_script(script, argv):
+    """Führt ein Skript aus `scripts/` wie `python <skript> <argv>` im aktuellen Prozess aus."""
+    path = os.path.join(PROJECT_ROOT, script)
+    saved_argv = sys.argv
+    sys.argv = [path] + list(argv)
+    try:
+        runpy.run_path(path, run_name='__main__')
+    finally:
+        sys.argv = saved_argv
+    return 0
+
+
+def run_stages(parser, args):
+    from pipeline.stages import STAGES, run
+
+    stage_names = [stage.name for stage in STAGES]
+    unknown = [name for name in args.stages if name not in stage_names]
+    if unknown:
+        parser.error(f"unbekannte Stufe(n): {', '.join(unknown)}")
+    executed = run(args.stages or None, force=args.force, dry_run=args.dry_run)
+    if not args.dry_run:
+        print(f"Ausgeführte Stufen: {', '.join(executed) if executed else 'keine'}")
+    return 0
+
+
+def main(argv=None):
+    runlog.enable()
+    parser = build_parser()
+    args, extra = parser.parse_known_args(sys.argv[1:] if argv is None else argv)
+    if args.command in COMMANDS:
+        return run_script(COMMANDS[args.command][0], extra)
+    if extra:
+        parser.error(f"unbekannte Argumente: {' '.join(extra)}")
+    return run_stages(parser, args)
@@ -0,0 +1,270 @@
+"""
+Laden der Clickstream-Daten (data/clickstreams.parquet).
+
+Im kompakten Modus werden die Textspalten direkt als Dictionary-Codes
+(pandas `category`) aus Parquet gelesen, ohne die Zeichenketten als
+Python-Objekte zu materialisieren. `session_user_id` wird ebenfalls
+interniert (eine Kategorie pro Benutzer), `time_passed_in_seconds` wird
+auf float32 reduziert, wenn alle Werte exakt als float32 darstellbar sind
+(`compact_time_dtype`). Beim stapelweisen Lesen wird dieser Typ einmal
+für die gesamte Datei bestimmt, damit alle Stapel denselben Typ haben.
+
+Statt einer einzelnen Datei kann auch ein Verzeichnis mit Parquet-Dateien
+(z. B. die inkrementell bereinigten Partitionen aus pipeline/incremental.py)
+angegeben werden; Dateien, deren Name mit '_' oder '.' beginnt, werden
+dabei ignoriert.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+CLICKSTREAMS_PATH = 'data/clickstreams.parquet'
+
+USER_ID_COLUMN = 'session_user_id'
+TIME_COLUMN = 'time_passed_in_seconds'
+CATEGORICAL_COLUMNS = ['session_action', 'session_action_type',
+                       'session_action_detail', 'session_device_type']
+
+# Spalten, die als Dictionary-Codes gelesen werden
+DICTIONARY_COLUMNS = [USER_ID_COLUMN] + CATEGORICAL_COLUMNS
+
+UNKNOWN_VALUE = '-unknown-'
+
+# Bereinigungsschritte (II, pipeline/cleaning.py und pipeline/incremental.py)
+UNKNOWN_COLUMNS = [USER_ID_COLUMN, 'session_action_type', 'session_action_detail', 'session_device_type']
+REQUIRED_COLUMNS = [USER_ID_COLUMN, 'session_action', TIME_COLUMN]
+ZERO_TIME_COLUMNS = ['session_action', 'session_action_type', 'session_action_detail', 'session_device_type']
+# Spalten der Zusammenfassung der Rohdaten (wie im ursprünglichen Bericht nur die Textspalten)
+RAW_SUMMARY_COLUMNS = ['session_action', 'session_action_type', 'session_action_detail', 'session_device_type']
+
+
+def load_clickstreams(path=CLICKSTREAMS_PATH, compact=True, columns=None, filters=None):
+    """
+    Lädt die Clickstream-Daten bzw. einen Ausschnitt davon.
+
+    compact=True: kategoriale Spalten und interniertes session_user_id,
+    reduzierte Breite für time_passed_in_seconds.
+    compact=False: entspricht `pd.read_parquet(path)`.
+
+    columns: nur diese Spalten lesen (Projektion), None = alle Spalten.
+    filters: Zeilenfilter im pyarrow-Format, z. B.
+        [('time_passed_in_seconds', '==', 0)]
+        [('session_device_type', '==', 'iPhone')]
+        [('session_user_id', 'in', user_ids)]
+    Tupel innerhalb einer Liste werden mit UND verknüpft, eine Liste von
+    Listen mit ODER. Die Filter werden zuerst gegen die Min/Max-Statistiken
+    der Row-Groups geprüft; übersprungene Row-Groups werden nicht dekodiert.
+    """
+    if not compact:
+        return pd.read_parquet(path, columns=columns, filters=filters, schema=dataset_schema(path))
+
+    read_columns = _schema_names(path) if columns is None else list(columns)
+    read_dictionary = [col for col in DICTIONARY_COLUMNS if col in read_columns]
+    table = pq.read_table(path, columns=columns, filters=filters,
+                          read_dictionary=read_dictionary, schema=dataset_schema(path, read_dictionary))
+    df = compact_clickstreams(table.to_pandas())
+    if filters is not None:
+        # Die Dictionaries enthalten weiterhin alle Werte der Datei
+        df = drop_unused_categories(df)
+    return df
+
+
+def iter_clickstreams(path=CLICKSTREAMS_PATH, batch_size=1_000_000, columns=None):
+    """
+    Liest die Clickstream-Daten stapelweise (kompakte Darstellung).
+
+    Es wird immer nur ein Stapel von höchstens `batch_size` Zeilen im
+    Speicher gehalten, unabhängig von der Größe der Datei. Der Typ der
+    Zeitspalte wird vorab aus der Spalte allein bestimmt (`time_dtype`)
+    und gilt für alle Stapel wie bei `load_clickstreams`.
+    """
+    read_columns = _schema_names(path) if columns is None else list(columns)
+    read_dictionary = [col for col in DICTIONARY_COLUMNS if col in read_columns]
+    dtype = time_dtype(path, batch_size) if TIME_COLUMN in read_columns else None
+    for file_path in parquet_files(path):
+        parquet_file = pq.ParquetFile(file_path, read_dictionary=read_dictionary)
+        for batch in parquet_file.iter_batches(batch_size=batch_size, columns=columns):
+            yield compact_clickstreams(batch.to_pandas(), time_dtype=dtype)
+
+
+def time_dtype(path=CLICKSTREAMS_PATH, batch_size=1_000_000):
+    """
+    Kompakter Typ der Zeitspalte über alle Dateien und Stapel.
+
+    Liest nur `time_passed_in_seconds`; float32 nur, wenn jeder Stapel
+    exakt als float32 darstellbar ist.
+    """
+    dtype = None
+    for file_path in parquet_files(path):
+        parquet_file = pq.ParquetFile(file_path)
+        for batch in parquet_file.iter_batches(batch_size=batch_size, columns=[TIME_COLUMN]):
+            values = batch.column(0).to_numpy(zero_copy_only=False)
+            batch_dtype = compact_time_dtype(values)
+            dtype = batch_dtype if dtype is None else np.result_type(dtype, batch_dtype)
+    return dtype
+
+
+def compact_time_dtype(values):
+    """float32, wenn alle Werte exakt (ohne Rundung) als float32 darstellbar sind, sonst der bisherige Typ."""
+    values = np.asarray(values)
+    if values.dtype != np.float64:
+        return values.dtype
+    with np.errstate(over='ignore'):
+        compact = values.astype(np.float32)
+    if np.array_equal(compact, values, equal_nan=True):
+        return np.dtype(np.float32)
+    return values.dtype
+
+
+def parquet_files(path):
+    """Die Datei selbst bzw. alle Parquet-Dateien eines Verzeichnisses (nach Namen sortiert)."""
+    if not os.path.isdir(path):
+        return [path]
+    return [os.path.join(path, name) for name in sorted(os.listdir(path))
+            if name.endswith('.parquet') and not name.startswith(('_', '.'))]
+
+
+def count_rows(path):
+    """Anzahl der Zeilen aus den Parquet-Metadaten (ohne die Daten zu lesen)."""
+    return sum(pq.ParquetFile(file_path).metadata.num_rows for file_path in parquet_files(path))
+
+
+def dataset_schema(path, dictionary_columns=()):
+    """
+    Gemeinsames Schema aller Dateien eines Verzeichnisses (None bei einer Datei).
+
+    Ohne dieses Schema übernimmt pyarrow das der ersten Datei und rundet
+    z. B. float64-Werte späterer Partitionen still auf float32. Typen werden
+    daher erweitert (float32 und float64 -> float64); `dictionary_columns`
+    werden als Dictionary gelesen (ersetzt `read_dictionary`, das bei
+    vorgegebenem Schema nicht greift).
+    """
+    files = parquet_files(path)
+    if len(files) < 2:
+        return None
+    schema = pa.unify_schemas([pq.read_schema(file_path) for file_path in files], promote_options='permissive')
+    dictionary = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema([field.with_type(dictionary) if field.name in dictionary_columns else field
+                      for field in schema], metadata=schema.metadata)
+
+
+def _schema_names(path):
+    files = parquet_files(path)
+    if not files:
+        raise FileNotFoundError(f"Keine Parquet-Dateien in {path}")
+    return pq.read_schema(files[0]).names
+
+
+class ClickstreamWriter:
+    """
+    Schreibt Clickstream-DataFrames stapelweise in eine Parquet-Datei.
+
+    Kategoriale Spalten werden einheitlich als dictionary<int32, string>
+    geschrieben, damit Stapel mit unterschiedlich vielen Kategorien
+    dasselbe Schema haben. Das Schema des ersten Stapels gilt für alle
+    weiteren; eine Umwandlung, die Werte verändern würde (z. B. float64
+    nach float32 mit Rundung), löst einen ValueError aus.
+
+    row_group_size: höchstens so viele Zeilen pro Row-Group (None = Vorgabe von pyarrow).
+    """
+
+    def __init__(self, path, row_group_size=None):
+        self.path = path
+        self.row_group_size = row_group_size
+        self.schema = None
+        self._writer = None
+
+    def write(self, df):
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        if self._writer is None:
+            self.schema = _unified_schema(table.schema)
+            self._writer = pq.ParquetWriter(self.path, self.schema)
+        self._writer.write_table(_cast_exact(table, self.schema), row_group_size=self.row_group_size)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _unified_schema(schema):
+    fields = []
+    for field in schema:
+        if pa.types.is_dictionary(field.type):
+            field = field.with_type(pa.dictionary(pa.int32(), pa.string()))
+        elif pa.types.is_large_string(field.type):
+            field = field.with_type(pa.string())
+        fields.append(field)
+    return pa.schema(fields, metadata=schema.metadata)
+
+
+def _cast_exact(table, schema):
+    cast = table.cast(schema)
+    for name in schema.names:
+        source, target = table.column(name), cast.column(name)
+        if not (pa.types.is_floating(source.type) and pa.types.is_floating(target.type)):
+            continue
+        if target.type.bit_width >= source.type.bit_width:
+            continue
+        roundtrip = target.cast(source.type)
+        same = pc.or_kleene(pc.equal(roundtrip, source), pc.and_(pc.is_nan(roundtrip), pc.is_nan(source)))
+        if not pc.all(same).as_py():
+            raise ValueError(f"Spalte {name}: {source.type} lässt sich nicht verlustfrei "
+                             f"in {target.type} umwandeln")
+    return cast
+
+
+def compact_clickstreams(df, time_dtype=None):
+    """
+    Überführt einen bereits geladenen Clickstream-DataFrame in die kompakte Darstellung.
+
+    time_dtype: Typ der Zeitspalte (z. B. aus `time_dtype` für alle Stapel
+    einer Datei); None = aus den Werten dieses DataFrames bestimmen.
+    """
+    df = df.copy(deep=False)
+    for col in DICTIONARY_COLUMNS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype('category')
+    if TIME_COLUMN in df.columns:
+        if time_dtype is None:
+            time_dtype = compact_time_dtype(df[TIME_COLUMN].to_numpy())
+        df[TIME_COLUMN] = df[TIME_COLUMN].astype(time_dtype)
+    return df
+
+
+def replace_with_nan(series, value=UNKNOWN_VALUE):
+    """
+    Ersetzt `value` durch NaN.
+
+    Bei kategorialen Spalten wird nur die Kategorie entfernt (Umcodierung
+    der Codes), ohne die Werte zu dekodieren.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        if value in series.cat.categories:
+            return series.cat.remove_categories([value])
+        return series
+    return series.replace(value, np.nan)
+
+
+def drop_unused_categories(df):
+    """
+    Entfernt ungenutzte Kategorien, z. B. nach dem Filtern von Zeilen.
+
+    Damit liefern `value_counts` und `nunique` auf Teilmengen dieselben
+    Ergebnisse wie bei Objektspalten (keine Einträge mit Anzahl 0).
+    """
+    df = df.copy(deep=False)
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].cat.remove_unused_categories()
+    return df
@@ -0,0 +1,20 @@
+"""
+Ganzzahlige Codes für kategoriale und andere Spalten.
+"""
+
+import pandas as pd
+
+
+def category_codes(series, sort=False):
+    """
+    Codes (-1 = fehlend) und Werte einer Spalte.
+
+    Kategoriale Spalten: Codes und Kategorien ohne Dekodieren der Werte
+    (Reihenfolge der Kategorien, `sort` wird ignoriert; Codes in der
+    kleinen Breite von pandas, z. B. int8). Andere Spalten: `pd.factorize`
+    (sort=True: Werte sortiert, sonst in Reihenfolge des ersten Auftretens).
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.codes.to_numpy(), series.cat.categories
+    codes, values = pd.factorize(series, sort=sort)
+    return codes, pd.Index(values)
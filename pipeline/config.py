@@ -0,0 +1,21 @@
+"""
+Parameter der Datenaufbereitung.
+
+Die Werte werden von den Notebooks gelesen und fließen in die Schlüssel
+des Stufen-Caches ein (`pipeline.stages`): Wird ein Parameter geändert,
+werden genau die Stufen neu ausgeführt, die ihn verwenden.
+"""
+
+# I: Altersgrenzen (Zeilen außerhalb werden entfernt)
+AGE_MIN = 18
+AGE_MAX = 90
+
+# I: Seltene Werte zusammenfassen (Häufigkeit unter dem Schwellenwert)
+RARE_BROWSER_THRESHOLD = 500
+RARE_PROVIDER_THRESHOLD = 100
+
+# II: Pause zwischen zwei Aktionen, ab der eine neue Sitzung beginnt
+SESSION_GAP_SECONDS = 30 * 60
+
+# II: Backend der Bereinigung (pipeline/cleaning.py): 'pandas' oder 'arrow'
+CLICKSTREAM_BACKEND = 'pandas'
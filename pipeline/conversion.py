@@ -0,0 +1,158 @@
+"""
+Conversion-Würfel: Benutzer, Buchungen und Zielorte je Kombination
+kategorialer Merkmale.
+
+`ConversionCube.from_frame` kodiert alle Dimensionen (z. B. user_gender,
+age_group, marketing_channel, …) als Kategorien-Codes und fasst die
+Benutzer in einem Durchlauf zu Zellen gleicher Code-Kombination
+zusammen. Je Zelle werden die Anzahl der Benutzer und die Anzahl je
+Zielort gespeichert; Buchungen sind alle Zielorte außer 'NDF'.
+
+Abfragen über eine oder mehrere Dimensionen (`summary`, `table`,
+`crosstab`) summieren nur noch über die Zellen mit `np.bincount`, statt
+die Benutzertabelle erneut zu gruppieren. Fehlende Werte zählen wie bei
+`groupby`/`pd.crosstab` nur in Abfragen nicht mit, in denen die
+betreffende Dimension vorkommt.
+"""
+
+import numpy as np
+import pandas as pd
+
+from pipeline import runlog
+from pipeline.bookings import DESTINATION_COLUMN, NO_BOOKING
+from pipeline.codes import category_codes
+
+
+def _codes(series):
+    """
+    `category_codes` als int64 (für die kombinierten Codes); kategoriale
+    Spalten behalten Reihenfolge und dtype der Kategorien (sonst None),
+    andere werden sortiert.
+    """
+    codes, values = category_codes(series, sort=True)
+    dtype = series.dtype if isinstance(series.dtype, pd.CategoricalDtype) else None
+    return codes.astype(np.int64), values, dtype
+
+
+def category_values(codes, values, dtype):
+    """Werte zu den Codes (kategorial, falls die Spalte kategorial war)."""
+    if dtype is not None:
+        return pd.Categorical.from_codes(codes, dtype=dtype)
+    return values.take(codes)
+
+
+def _group(codes, cardinalities):
+    """
+    Fasst Zeilen gleicher Code-Kombination zusammen (Codes ≥ -1).
+    Rückgabe: eindeutige Kombinationen (lexikographisch sortiert) und Gruppe je Zeile.
+    """
+    if np.prod([c + 1 for c in cardinalities], dtype=np.float64) < 2 ** 62:
+        # Gemischte Basis: ein ganzzahliger Schlüssel je Zeile
+        key = np.zeros(len(codes), dtype=np.int64)
+        for j, cardinality in enumerate(cardinalities):
+            key = key * (cardinality + 1) + codes[:, j] + 1
+        _, first, inverse = np.unique(key, return_index=True, return_inverse=True)
+        return codes[first], inverse
+    unique, inverse = np.unique(codes, axis=0, return_inverse=True)
+    return unique, inverse.ravel()
+
+
+class ConversionCube:
+    """Benutzer und Zielorte je Zelle (Kombination der Dimensionen)."""
+
+    def __init__(self, dimensions, categories, dtypes, codes, users, destinations, counts, destination_dtype=None):
+        self.dimensions = list(dimensions)
+        self.categories = categories
+        self.dtypes = dtypes
+        self.codes = codes
+        self.users = users
+        self.destinations = destinations
+        self.counts = counts
+        self.destination_dtype = destination_dtype
+
+    @classmethod
+    @runlog.measured('conversion.cube', rows_in=lambda cls, df, *args, **kwargs: len(df), rows_out=len)
+    def from_frame(cls, df, dimensions, destination_column=DESTINATION_COLUMN):
+        """Baut den Würfel in einem Durchlauf über `df`."""
+        dimensions = [col for col in dimensions if col != destination_column]
+        codes, categories, dtypes = [], {}, {}
+        for col in dimensions:
+            col_codes, categories[col], dtypes[col] = _codes(df[col])
+            codes.append(col_codes)
+        codes = np.column_stack(codes) if codes else np.zeros((len(df), 0), dtype=np.int64)
+        cells, inverse = _group(codes, [len(categories[col]) for col in dimensions])
+
+        destination_codes, destinations, destination_dtype = _codes(df[destination_column])
+        users = np.bincount(inverse, minlength=len(cells)).astype(np.int64)
+        valid = destination_codes >= 0
+        flat = inverse[valid] * len(destinations) + destination_codes[valid]
+        counts = np.bincount(flat, minlength=len(cells) * len(destinations)).reshape(len(cells), len(destinations))
+        return cls(dimensions, categories, dtypes, cells, users, destinations, counts.astype(np.int64),
+                   destination_dtype)
+
+    def __len__(self):
+        """Anzahl der Zellen."""
+        return len(self.codes)
+
+    @property
+    def rows(self):
+        """Anzahl der Benutzer."""
+        return int(self.users.sum())
+
+    @property
+    def bookings(self):
+        """Buchungen je Zelle (alle Zielorte außer NDF)."""
+        return self.counts.sum(axis=1) - (self.counts[:, self.destinations.get_loc(NO_BOOKING)]
+                                          if NO_BOOKING in self.destinations else 0)
+
+    def _margin(self, dims):
+        """Zellen nach `dims` zusammengefasst (nur Zellen ohne fehlende Werte in `dims`)."""
+        positions = [self.dimensions.index(dim) for dim in dims]
+        codes = self.codes[:, positions]
+        valid = (codes >= 0).all(axis=1)
+        groups, inverse = _group(codes[valid], [len(self.categories[dim]) for dim in dims])
+        return groups, inverse, valid
+
+    def _index(self, dims, groups):
+        arrays = [category_values(groups[:, j], self.categories[dim], self.dtypes[dim]) for j, dim in enumerate(dims)]
+        if len(arrays) == 1:
+            return pd.Index(arrays[0], name=dims[0])
+        return pd.MultiIndex.from_arrays(arrays, names=dims)
+
+    def summary(self, *dims):
+        """
+        Benutzer, Buchungen, Conversion Rate und Benutzeranteil (%) je
+        Kombination der Dimensionen (wie `groupby(dims)` über die Benutzer).
+        """
+        groups, inverse, valid = self._margin(list(dims))
+        users = np.bincount(inverse, weights=self.users[valid], minlength=len(groups)).astype(np.int64)
+        booked = np.bincount(inverse, weights=self.bookings[valid], minlength=len(groups)).astype(np.int64)
+        df = pd.DataFrame({'total_users': users, 'booked_users': booked}, index=self._index(list(dims), groups))
+        df['conversion_rate'] = round(df['booked_users'] / df['total_users'] * 100, 2)
+        df['user_share'] = round(df['total_users'] / df['total_users'].sum() * 100, 2)
+        return df.reset_index()
+
+    def table(self, *dims):
+        """Anzahl der Benutzer je Kombination (Zeilen) und Zielort (Spalten), wie `pd.crosstab`."""
+        groups, inverse, valid = self._margin(list(dims))
+        counts = np.column_stack([np.bincount(inverse, weights=self.counts[valid, k], minlength=len(groups))
+                                  for k in range(len(self.destinations))]).astype(np.int64)
+        df = pd.DataFrame(counts, index=self._index(list(dims), groups),
+                          columns=pd.Index(category_values(np.arange(len(self.destinations)), self.destinations,
+                                                   self.destination_dtype), name=DESTINATION_COLUMN))
+        return df.loc[df.sum(axis=1) > 0, df.sum(axis=0) > 0]
+
+    def crosstab(self, var1, var2):
+        """Kreuztabelle zweier Dimensionen (eine davon darf der Zielort sein)."""
+        if var2 == DESTINATION_COLUMN:
+            return self.table(var1)
+        if var1 == DESTINATION_COLUMN:
+            return self.table(var2).T
+        users = self.summary(var1, var2).set_index([var1, var2])['total_users']
+        return users.unstack(var2, fill_value=0).rename_axis(columns=var2)
+
+    def nunique(self, dim):
+        """Anzahl vorhandener Werte der Dimension (wie `Series.nunique`)."""
+        if dim == DESTINATION_COLUMN:
+            return int((self.counts.sum(axis=0) > 0).sum())
+        return len(self.summary(dim))
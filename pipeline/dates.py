@@ -0,0 +1,235 @@
+"""
+Dekodierung der festen Datumsformate aus user.csv mit Ganzzahlarithmetik.
+
+- `first_active_timestamp`: 14 Ziffern `%Y%m%d%H%M%S` (als Text oder Ganzzahl)
+- `account_created_date`, `first_booking_date`: `%Y-%m-%d`
+
+Statt eines Formatparsers pro Wert werden die Bytes aller Werte auf
+einmal als Ziffernmatrix gelesen (bei pyarrow-Textspalten direkt aus dem
+Datenpuffer), zu Jahr/Monat/Tag/Uhrzeit zusammengesetzt und über
+`days_from_civil` in Tage seit 1970-01-01 umgerechnet. Werte mit
+ungültigen Bestandteilen (Monat 13, 30. Februar, Stunde 24, Jahr 0 bei
+Zeitstempeln, …) werden zu NaT. Die wenigen vorhandenen Werte, die nicht
+dem festen Layout entsprechen (andere Länge oder Trennzeichen, z. B.
+'2014-1-01'), werden einzeln mit `pd.to_datetime(..., format=...,
+errors='coerce')` gelesen; das Ergebnis entspricht damit insgesamt
+`pd.to_datetime` mit demselben Format. Ergebnis sind NumPy-Arrays
+(`datetime64[D]` bzw. `datetime64[s]`); Vergleiche auf diesen Arrays
+bleiben vektorisiert (NaT ergibt False).
+"""
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+DATE_FORMAT = '%Y-%m-%d'
+TIMESTAMP_FORMAT = '%Y%m%d%H%M%S'
+
+SECONDS_PER_DAY = 86400
+# Tage vom 0000-03-01 (proleptischer Gregorianischer Kalender) bis 1970-01-01
+_EPOCH_OFFSET = 719468
+_NAT = np.iinfo(np.int64).min
+
+_DAYS_IN_MONTH = np.array([0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31], dtype=np.int64)
+
+
+def days_from_civil(year, month, day):
+    """Tage seit 1970-01-01 für gültige Datumsbestandteile (Ganzzahl-Arrays)."""
+    year = year - (month <= 2)
+    era = year // 400
+    year_of_era = year - era * 400
+    day_of_year = (153 * np.where(month > 2, month - 3, month + 9) + 2) // 5 + day - 1
+    day_of_era = year_of_era * 365 + year_of_era // 4 - year_of_era // 100 + day_of_year
+    return era * 146097 + day_of_era - _EPOCH_OFFSET
+
+
+def is_leap_year(year):
+    return (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+
+
+def valid_date(year, month, day):
+    """Maske der gültigen Kombinationen aus Jahr, Monat und Tag."""
+    month_ok = (month >= 1) & (month <= 12)
+    last_day = _DAYS_IN_MONTH[np.where(month_ok, month, 0)] + ((month == 2) & is_leap_year(year))
+    return month_ok & (day >= 1) & (day <= last_day)
+
+
+def _string_array(values):
+    """Werte als pyarrow-Textarray (ein Chunk, Dictionaries dekodiert)."""
+    if isinstance(values, pa.ChunkedArray):
+        values = values.combine_chunks() if values.num_chunks != 1 else values.chunk(0)
+    elif not isinstance(values, pa.Array):
+        values = pa.array(np.asarray(values, dtype=object), type=pa.string(), from_pandas=True)
+    if pa.types.is_dictionary(values.type):
+        values = values.dictionary_decode()
+    return values
+
+
+def _fixed_width_bytes(values, width):
+    """
+    Bytes aller Werte mit genau `width` Zeichen als Matrix (n × width, uint8)
+    und Maske dieser Zeilen. Fehlende Werte und Werte anderer Länge fallen heraus.
+    """
+    values = _string_array(values)
+    if pa.types.is_large_string(values.type):
+        offset_type = np.int64
+    elif pa.types.is_string(values.type):
+        offset_type = np.int32
+    else:
+        raise TypeError(f"Textspalte erwartet, nicht {values.type}")
+
+    n = len(values)
+    _, offsets_buffer, data_buffer = values.buffers()
+    if n == 0 or data_buffer is None:
+        return np.empty((0, width), dtype=np.uint8), np.zeros(n, dtype=bool)
+    offsets = np.frombuffer(offsets_buffer, dtype=offset_type)[values.offset:values.offset + n + 1]
+    data = np.frombuffer(data_buffer, dtype=np.uint8)
+    starts = offsets[:-1].astype(np.int64)
+    ok = np.diff(offsets) == width
+    if values.null_count:
+        ok &= values.is_valid().to_numpy(zero_copy_only=False)
+    matrix = data[starts[ok, None] + np.arange(width)]
+    return matrix, ok
+
+
+def _digits(matrix, positions):
+    """Ziffern an den Positionen als Zahl; zweites Ergebnis: alle Zeichen sind Ziffern."""
+    digits = matrix[:, positions].astype(np.int64) - ord('0')
+    ok = ((digits >= 0) & (digits <= 9)).all(axis=1)
+    number = np.zeros(len(matrix), dtype=np.int64)
+    for i in range(len(positions)):
+        number = number * 10 + digits[:, i]
+    return number, ok
+
+
+def _scatter(values, ok, n):
+    """Werte der Zeilen `ok` in ein Array der Länge n (übrige NaT)."""
+    result = np.full(n, _NAT, dtype=np.int64)
+    result[ok] = values
+    return result
+
+
+def _parse_remaining(values, result, formed, format):
+    """
+    Liest vorhandene Werte, die nicht dem festen Layout entsprechen
+    (`formed` = False), mit `pd.to_datetime(..., format=format, errors='coerce')`
+    und trägt sie in `result` ein (in place).
+    """
+    values = _string_array(values)
+    remaining = ~formed
+    if values.null_count:
+        remaining &= values.is_valid().to_numpy(zero_copy_only=False)
+    if remaining.any():
+        parsed = pd.to_datetime(values.filter(pa.array(remaining)).to_pandas(), format=format, errors='coerce')
+        result[remaining] = parsed.to_numpy().astype(result.dtype)
+    return result
+
+
+def decode_dates(values, fallback=True):
+    """
+    `%Y-%m-%d` (Text; pyarrow-Array, Series oder Liste) → `datetime64[D]`.
+    Ungültige oder fehlende Werte werden zu NaT. fallback=False: Werte
+    außerhalb des festen Layouts nicht mit `pd.to_datetime` nachlesen.
+    """
+    matrix, ok = _fixed_width_bytes(values, 10)
+    year, digits_ok = _digits(matrix, [0, 1, 2, 3])
+    month, month_ok = _digits(matrix, [5, 6])
+    day, day_ok = _digits(matrix, [8, 9])
+    layout = digits_ok & month_ok & day_ok & (matrix[:, 4] == ord('-')) & (matrix[:, 7] == ord('-'))
+    valid = layout & valid_date(year, month, day)
+    days = days_from_civil(year[valid], month[valid], day[valid])
+    formed = ok.copy()
+    formed[ok] = layout
+    ok[ok] = valid
+    result = _scatter(days, ok, len(ok)).view('datetime64[D]')
+    if fallback:
+        _parse_remaining(values, result, formed, DATE_FORMAT)
+    return result
+
+
+def decode_timestamps(values, fallback=True):
+    """
+    `%Y%m%d%H%M%S` (14 Ziffern als Text oder Ganzzahl) → `datetime64[s]`.
+    Ungültige oder fehlende Werte werden zu NaT. fallback=False: Textwerte
+    außerhalb des festen Layouts nicht mit `pd.to_datetime` nachlesen.
+    """
+    if _is_numeric(values):
+        return _decode_integer_timestamps(values)
+    matrix, ok = _fixed_width_bytes(values, 14)
+    number, digits_ok = _digits(matrix, list(range(14)))
+    seconds = _timestamp_seconds(number, digits_ok)
+    result = _scatter(seconds, ok, len(ok)).view('datetime64[s]')
+    if fallback:
+        formed = ok.copy()
+        formed[ok] = digits_ok
+        _parse_remaining(values, result, formed, TIMESTAMP_FORMAT)
+    return result
+
+
+def _decode_integer_timestamps(values):
+    numbers = np.asarray(values.to_numpy(dtype='float64', na_value=np.nan) if isinstance(values, pd.Series)
+                         else values)
+    if numbers.dtype.kind == 'f':
+        ok = np.isfinite(numbers) & (numbers == np.floor(numbers))
+        numbers = np.where(ok, numbers, 0).astype(np.int64)
+    else:
+        numbers = numbers.astype(np.int64)
+        ok = np.ones(len(numbers), dtype=bool)
+    # 14 Ziffern: Jahr 1000–9999
+    ok &= (numbers >= 10 ** 13) & (numbers < 10 ** 14)
+    return _timestamp_seconds(numbers, ok).view('datetime64[s]')
+
+
+def _timestamp_seconds(number, ok):
+    """Sekunden seit 1970 aus YYYYMMDDHHMMSS-Zahlen; ungültige Werte (oder ~ok) → NaT."""
+    year, rest = np.divmod(number, 10 ** 10)
+    month, rest = np.divmod(rest, 10 ** 8)
+    day, rest = np.divmod(rest, 10 ** 6)
+    hour, rest = np.divmod(rest, 10 ** 4)
+    minute, second = np.divmod(rest, 100)
+    # Jahr 0 lehnt pd.to_datetime für dieses Format ab (strptime beginnt bei Jahr 1)
+    valid = ok & (year >= 1) & valid_date(year, month, day) & (hour < 24) & (minute < 60) & (second < 60)
+    days = days_from_civil(year[valid], month[valid], day[valid])
+    seconds = days * SECONDS_PER_DAY + hour[valid] * 3600 + minute[valid] * 60 + second[valid]
+    return _scatter(seconds, valid, len(valid))
+
+
+def _is_numeric(values):
+    if isinstance(values, (pa.Array, pa.ChunkedArray)):
+        return pa.types.is_integer(values.type) or pa.types.is_floating(values.type)
+    dtype = getattr(values, 'dtype', None)
+    return dtype is not None and not isinstance(dtype, pd.CategoricalDtype) and dtype.kind in 'iuf'
+
+
+def to_days(values):
+    """
+    Datum ohne Uhrzeit als `datetime64[D]`-Array (NaT für fehlende Werte):
+    datetime-Spalten werden abgeschnitten, Textspalten im Format
+    `%Y-%m-%d` bzw. `%Y%m%d%H%M%S` dekodiert.
+    """
+    if isinstance(values, pd.Series) and pd.api.types.is_datetime64_any_dtype(values.dtype):
+        # Einheit der Spalte beibehalten (Nanosekunden laufen außerhalb 1677–2262 über)
+        values = values.to_numpy()
+    if isinstance(values, np.ndarray) and values.dtype.kind == 'M':
+        return values.astype('datetime64[D]')
+    if _is_numeric(values):
+        return decode_timestamps(values).astype('datetime64[D]')
+    if not isinstance(values, (pa.Array, pa.ChunkedArray)):
+        values = pa.array(np.asarray(values, dtype=object), type=pa.string(), from_pandas=True)
+    days = decode_dates(values, fallback=False)
+    missing = np.isnat(days)
+    if missing.any():
+        days[missing] = decode_timestamps(values, fallback=False)[missing].astype('datetime64[D]')
+        missing = np.isnat(days)
+    if missing.any():
+        # Werte außerhalb beider Layouts wie bei pd.to_datetime (erst Datum, dann Zeitstempel)
+        for format in (DATE_FORMAT, TIMESTAMP_FORMAT):
+            parsed = _parse_remaining(values, np.full(len(days), np.datetime64('NaT', 'D')), ~missing, format)
+            days[missing] = parsed[missing]
+            missing = np.isnat(days)
+    return days
+
+
+def day_strings(days):
+    """`datetime64[D]`-Werte als Text 'YYYY-MM-DD' ('NaT' für fehlende Werte)."""
+    return np.asarray(days, dtype='datetime64[D]').astype(str)
@@ -0,0 +1,265 @@
+"""
+Erkennung doppelter Zeilen über Fingerabdrücke fester Breite.
+
+Jede Zeile wird genau einmal zu einem 64- oder 128-Bit-Hash verdichtet.
+Aus diesem einen Durchlauf ergeben sich Anzahl, Maske und bereinigter
+DataFrame (`duplicated()` und `drop_duplicates()` hashen die Zeilen
+dagegen jeweils erneut).
+
+Die bereits gesehenen Fingerabdrücke werden nach den obersten Bits des
+Hashes partitioniert. Jede Partition besteht aus sortierten Läufen: Ein
+Stapel wird per `searchsorted` gegen die vorhandenen Läufe abgeglichen
+und legt nur seine neuen Fingerabdrücke als weiteren Lauf ab; bestehende
+Läufe werden dabei nicht neu geschrieben. Gleich große Läufe werden wie
+bei einem Binärzähler zusammengeführt, sodass eine Partition höchstens
+log2(Stapel) Läufe hat.
+
+Überschreiten die Fingerabdrücke das Speicherlimit, werden die Läufe auf
+die Festplatte ausgelagert und nur noch als Memory-Map abgefragt. Die
+Anzahl der Partitionen ergibt sich aus Speicherlimit und erwarteter
+Zeilenzahl (`partition_bits_for`), sodass auch das Zusammenführen der
+Läufe einer Partition im Limit bleibt. Jede Partition kann auch
+unabhängig (z. B. auf einem anderen Rechner) verarbeitet werden.
+"""
+
+import os
+import re
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+# Zweiter Schlüssel für die oberen 64 Bit des 128-Bit-Fingerabdrucks
+_HASH_KEY_HI = '0123456789abcdef'
+_HASH_KEY_LO = 'fedcba9876543210'
+
+FINGERPRINT_128 = np.dtype([('hi', '<u8'), ('lo', '<u8')])
+
+DEFAULT_PARTITION_BITS = 4
+MAX_PARTITION_BITS = 16
+
+# partition_0003_000012.npy: Lauf 12 der Partition 3 (partition_0003.npy: ein Lauf im alten Format)
+_RUN_FILE = re.compile(r'partition_(?P<partition>\d{4})(?:_(?P<run>\d+))?\.npy')
+
+
+def row_fingerprints(df, bits=64):
+    """
+    Berechnet einen Fingerabdruck pro Zeile (uint64 bzw. 2 × uint64).
+
+    Kategoriale Spalten werden über ihre Werte gehasht, sodass gleiche
+    Zeilen auch über Stapel mit unterschiedlichen Kategorien hinweg
+    denselben Fingerabdruck erhalten. Gleitkommaspalten werden als float64
+    gehasht: `hash_pandas_object` hasht die Bytes, 0.5 als float32 und als
+    float64 ergäben sonst verschiedene Fingerabdrücke.
+    """
+    df = _hash_dtypes(df)
+    lo = pd.util.hash_pandas_object(df, index=False, hash_key=_HASH_KEY_LO).to_numpy()
+    if bits == 64:
+        return lo
+    if bits != 128:
+        raise ValueError(f"bits muss 64 oder 128 sein, nicht {bits}")
+    fingerprints = np.empty(len(df), dtype=FINGERPRINT_128)
+    fingerprints['hi'] = pd.util.hash_pandas_object(df, index=False, hash_key=_HASH_KEY_HI).to_numpy()
+    fingerprints['lo'] = lo
+    return fingerprints
+
+
+def _hash_dtypes(df):
+    floats = {col: np.float64 for col, dtype in df.dtypes.items()
+              if isinstance(dtype, np.dtype) and dtype.kind == 'f' and dtype != np.float64}
+    return df.astype(floats) if floats else df
+
+
+def partition_bits_for(expected_rows, bits=64, memory_limit_mb=512):
+    """
+    Präfixbits für `expected_rows` Fingerabdrücke: Eine Partition belegt
+    höchstens ein Viertel des Speicherlimits (beim Zusammenführen liegen
+    die Läufe einer Partition und das Ergebnis gleichzeitig im Speicher).
+    """
+    itemsize = 8 if bits == 64 else FINGERPRINT_128.itemsize
+    partition_bytes = max(int(memory_limit_mb * 1024**2) // 4, 1)
+    partitions = -(-int(expected_rows) * itemsize // partition_bytes)
+    return min(max(DEFAULT_PARTITION_BITS, (partitions - 1).bit_length()), MAX_PARTITION_BITS)
+
+
+def _contains(sorted_values, values):
+    """Maske der `values`, die im sortierten Array vorkommen."""
+    if len(sorted_values) == 0:
+        return np.zeros(len(values), dtype=bool)
+    pos = np.searchsorted(sorted_values, values)
+    found = pos < len(sorted_values)
+    found[found] = sorted_values[pos[found]] == values[found]
+    return found
+
+
+class _Run:
+    """Sortierter Lauf einer Partition: Array im Speicher oder Pfad der ausgelagerten .npy-Datei."""
+
+    def __init__(self, number, size, data):
+        self.number = number
+        self.size = size
+        self.data = data
+
+    @property
+    def spilled(self):
+        return isinstance(self.data, str)
+
+    def values(self):
+        return np.load(self.data, mmap_mode='r') if self.spilled else self.data
+
+
+class DuplicateDetector:
+    """
+    Erkennt doppelte Zeilen über einen oder mehrere Stapel hinweg.
+
+    `add(df)` liefert für jeden Stapel eine Maske mit derselben Semantik
+    wie `df.duplicated(keep='first')`, bezogen auf alle bisher gesehenen
+    Zeilen. `count` enthält die Gesamtzahl der Duplikate.
+
+    bits: 64 oder 128 Bit pro Fingerabdruck.
+    memory_limit_mb: Obergrenze für gespeicherte Fingerabdrücke im
+        Arbeitsspeicher; darüber werden die Partitionen ausgelagert.
+    spill_dir: Verzeichnis für ausgelagerte Partitionen (Standard:
+        temporäres Verzeichnis, wird bei `close()` gelöscht).
+    partition_bits: Anzahl der Hash-Präfixbits (2**partition_bits
+        Partitionen); Standard: aus `expected_rows` und `memory_limit_mb`
+        bzw. 4, wenn die Zeilenzahl nicht bekannt ist.
+    expected_rows: erwartete Gesamtzahl der Zeilen (optional).
+    """
+
+    def __init__(self, bits=64, memory_limit_mb=512, spill_dir=None, partition_bits=None, expected_rows=None):
+        if partition_bits is None:
+            partition_bits = (DEFAULT_PARTITION_BITS if expected_rows is None
+                              else partition_bits_for(expected_rows, bits, memory_limit_mb))
+        self.bits = bits
+        self.memory_limit_bytes = memory_limit_mb * 1024**2
+        self.partition_bits = partition_bits
+        self.num_partitions = 2 ** partition_bits
+        self.count = 0
+        self.rows = 0
+
+        self._dtype = np.dtype('uint64') if bits == 64 else FINGERPRINT_128
+        self._runs = [[] for _ in range(self.num_partitions)]
+        self._next_run = 0
+        self._stored_bytes = 0
+        self._spilled = False
+        self._spill_dir = spill_dir
+        self._own_spill_dir = False
+
+    @classmethod
+    def persistent(cls, directory, bits=64, partition_bits=DEFAULT_PARTITION_BITS):
+        """
+        Detektor über einen dauerhaft gespeicherten Index in `directory`
+        (sortierte .npy-Läufe pro Partition). Bereits gespeicherte
+        Fingerabdrücke gelten als gesehen; neue werden als weitere Läufe
+        ergänzt und bleiben nach `close()` erhalten.
+        """
+        os.makedirs(directory, exist_ok=True)
+        detector = cls(bits=bits, spill_dir=directory, partition_bits=partition_bits)
+        detector._spilled = True
+        for name in os.listdir(directory):
+            match = _RUN_FILE.fullmatch(name)
+            if match is None:
+                continue
+            number = -1 if match['run'] is None else int(match['run'])
+            path = os.path.join(directory, name)
+            run = _Run(number, len(np.load(path, mmap_mode='r')), path)
+            detector._runs[int(match['partition'])].append(run)
+            detector._next_run = max(detector._next_run, number + 1)
+        for runs in detector._runs:
+            runs.sort(key=lambda run: run.number)
+        return detector
+
+    def add(self, df):
+        """Gleicht einen Stapel ab und liefert dessen Duplikatmaske (numpy bool)."""
+        fingerprints = row_fingerprints(df, bits=self.bits)
+        mask = np.zeros(len(fingerprints), dtype=bool)
+
+        prefix = self._prefix(fingerprints)
+        order = np.argsort(prefix, kind='stable')
+        bounds = np.searchsorted(prefix[order], np.arange(self.num_partitions + 1))
+
+        for p in range(self.num_partitions):
+            positions = order[bounds[p]:bounds[p + 1]]
+            if len(positions) == 0:
+                continue
+            mask[positions] = self._add_to_partition(p, fingerprints[positions])
+
+        self.rows += len(fingerprints)
+        self.count += int(mask.sum())
+        if not self._spilled and self._stored_bytes > self.memory_limit_bytes:
+            self._spill()
+        return mask
+
+    def close(self):
+        """Löscht ausgelagerte Partitionen (nur ein selbst angelegtes Verzeichnis)."""
+        if self._own_spill_dir and self._spill_dir is not None:
+            shutil.rmtree(self._spill_dir, ignore_errors=True)
+            self._spill_dir = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _prefix(self, fingerprints):
+        hi = fingerprints if self.bits == 64 else fingerprints['hi']
+        return (hi >> np.uint64(64 - self.partition_bits)).astype(np.int64)
+
+    def _add_to_partition(self, p, fingerprints):
+        # Erstes Vorkommen innerhalb des Stapels (np.unique sortiert stabil)
+        unique, first_index, inverse = np.unique(fingerprints, return_index=True, return_inverse=True)
+        mask = np.ones(len(fingerprints), dtype=bool)
+        mask[first_index] = False
+
+        # Bereits in früheren Stapeln gesehen (die Läufe werden nur abgefragt)
+        seen = np.zeros(len(unique), dtype=bool)
+        for run in self._runs[p]:
+            seen |= _contains(run.values(), unique)
+        mask |= seen[inverse]
+
+        if not seen.all():
+            self._append_run(p, unique[~seen])
+        return mask
+
+    def _append_run(self, p, values):
+        runs = self._runs[p]
+        runs.append(self._write_run(p, values))
+        self._stored_bytes += values.nbytes
+        # Gleich große Läufe zusammenführen (Binärzähler)
+        while len(runs) > 1 and runs[-2].size <= runs[-1].size:
+            newer, older = runs.pop(), runs.pop()
+            runs.append(self._write_run(p, np.sort(np.concatenate([older.values(), newer.values()]))))
+            for run in (older, newer):
+                if run.spilled:
+                    os.remove(run.data)
+
+    def _write_run(self, p, values):
+        number = self._next_run
+        self._next_run += 1
+        return _Run(number, len(values), self._save(p, number, values) if self._spilled else values)
+
+    def _save(self, p, number, values):
+        path = os.path.join(self._spill_dir, f'partition_{p:04d}_{number:06d}.npy')
+        # Erst vollständig schreiben, dann umbenennen (kein halber Lauf bei Abbruch)
+        with open(path + '.tmp', 'wb') as f:
+            np.save(f, values)
+        os.replace(path + '.tmp', path)
+        return path
+
+    def _spill(self):
+        if self._spill_dir is None:
+            self._spill_dir = tempfile.mkdtemp(prefix='dedup_')
+            self._own_spill_dir = True
+        os.makedirs(self._spill_dir, exist_ok=True)
+        self._spilled = True
+        for p, runs in enumerate(self._runs):
+            self._runs[p] = [_Run(run.number, run.size, self._save(p, run.number, run.data)) for run in runs]
+
+
+def duplicated(df, bits=64):
+    """Entspricht `df.duplicated()`, berechnet über Fingerabdrücke (numpy bool)."""
+    with DuplicateDetector(bits=bits) as detector:
+        return detector.add(df)
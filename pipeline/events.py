@@ -0,0 +1,236 @@
+"""
+Ereignisse pro Benutzer als speicherabbildbare Arrays mit Offset-Index.
+
+`build_event_index` legt die bereinigten Clickstreams nach Benutzer
+sortiert als eine .npy-Datei pro Spalte ab (kategoriale Spalten als
+Codes plus Kategorienliste) und speichert dazu je Benutzer den Beginn
+seiner Ereignisse (`offsets`, Länge = Anzahl der Benutzer + 1). Die
+Ereignisse eines Benutzers bilden damit einen zusammenhängenden
+Abschnitt in jeder Spalte.
+
+`EventIndex` öffnet die Arrays mit `np.load(mmap_mode='r')`: Es wird
+nichts vollständig geladen. Ein Benutzer wird per Binärsuche über die
+sortierten IDs gefunden und kostet danach einen Slice pro Spalte;
+`iter_users` läuft über die Benutzer als Folge von Sichten ohne Kopie.
+
+Eingabe ist die nach Benutzer partitionierte Ablage aus II
+(pipeline/buckets.py); sie wird Bucket für Bucket gelesen. Zeilenzahl,
+Spaltentypen und Kategorien stehen vorab fest: Zeilen und Typen aus den
+Parquet-Metadaten und dem Schema aller Dateien, Kategorien aus den
+Dictionaries der kategorialen Spalten (als Arrow-Dictionary-Arrays
+gelesen, ohne Umwandlung nach pandas).
+"""
+
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from pipeline.buckets import LAYOUT_FILE, bucket_paths, iter_buckets, user_rank
+from pipeline.clickstreams import DICTIONARY_COLUMNS, USER_ID_COLUMN, load_clickstreams, parquet_files
+from pipeline.codes import category_codes
+
+EVENTS_PATH = 'data/clickstreams_events'
+META_FILE = 'meta.json'
+
+
+def _code_dtype(num_categories):
+    for dtype in (np.int8, np.int16, np.int32):
+        if num_categories < np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+def _files(path):
+    if os.path.exists(os.path.join(path, LAYOUT_FILE)):
+        return bucket_paths(path)
+    return parquet_files(path)
+
+
+def _rows_with_user(parquet_file):
+    """Zeilen mit session_user_id aus den Null-Zählern der Row-Groups."""
+    metadata = parquet_file.metadata
+    index = parquet_file.schema_arrow.get_field_index(USER_ID_COLUMN)
+    rows = 0
+    for i in range(metadata.num_row_groups):
+        statistics = metadata.row_group(i).column(index).statistics
+        if statistics is None or not statistics.has_null_count:
+            # Ohne Statistiken: nur die Spalte der Benutzer-IDs lesen
+            user_ids = parquet_file.read(columns=[USER_ID_COLUMN]).column(0)
+            return len(user_ids) - user_ids.null_count
+        rows += metadata.row_group(i).num_rows - statistics.null_count
+    return rows
+
+
+def _scan(path, columns=None):
+    """
+    Zeilenzahl, Kategorien und Speichertypen aller Dateien, ohne die Daten
+    nach pandas zu lesen. Typen der übrigen Spalten: gemeinsamer Typ über
+    alle Dateien (`np.result_type`), sodass kein Wert beim Schreiben
+    gerundet wird, auch wenn einzelne Buckets kompakter gelesen werden.
+    """
+    categories = {}
+    dtypes = {}
+    rows = 0
+    for file_path in _files(path):
+        parquet_file = pq.ParquetFile(file_path)
+        schema = parquet_file.schema_arrow
+        names = [col for col in (schema.names if columns is None else columns) if col != USER_ID_COLUMN]
+        rows += _rows_with_user(parquet_file)
+        dictionary_columns = [col for col in names if col in DICTIONARY_COLUMNS]
+        table = pq.read_table(file_path, columns=dictionary_columns, read_dictionary=dictionary_columns)
+        for col in dictionary_columns:
+            known = categories.setdefault(col, {})
+            for chunk in table.column(col).chunks:
+                for value in chunk.dictionary.to_pylist():
+                    known.setdefault(value, len(known))
+        for col in names:
+            if col in categories:
+                continue
+            dtype = np.dtype(schema.field(col).type.to_pandas_dtype())
+            dtypes[col] = np.result_type(dtypes[col], dtype) if col in dtypes else dtype
+    return rows, categories, dtypes
+
+
+def _sorted_parts(path, columns=None):
+    """Teile der Eingabe, jeweils nach Benutzer sortiert und mit disjunkten Benutzern."""
+    if os.path.exists(os.path.join(path, LAYOUT_FILE)):
+        for _, df in iter_buckets(path, columns=columns):
+            yield df
+    else:
+        df = load_clickstreams(path, columns=columns)
+        yield df.iloc[np.argsort(user_rank(df[USER_ID_COLUMN]), kind='stable')]
+
+
+def build_event_index(source, path=EVENTS_PATH, columns=None):
+    """
+    Erzeugt den Index in `path` aus den bereinigten Clickstreams `source`
+    (Bucket-Verzeichnis oder Parquet-Datei). Zeilen ohne session_user_id
+    werden ausgelassen. Rückgabe: Anzahl der Benutzer und Ereignisse.
+    """
+    rows, categories, dtypes = _scan(source, columns=columns)
+    storage = {col: _code_dtype(len(values)) for col, values in categories.items()}
+    storage.update(dtypes)
+
+    tmp_dir = path + '.tmp'
+    if os.path.exists(tmp_dir):
+        shutil.rmtree(tmp_dir)
+    os.makedirs(tmp_dir)
+    arrays = {col: np.lib.format.open_memmap(os.path.join(tmp_dir, f'{col}.npy'), mode='w+',
+                                             dtype=dtype, shape=(rows,))
+              for col, dtype in storage.items()}
+
+    # Spalten schreiben, Benutzergrenzen festhalten
+    user_ids, starts = [], []
+    position = 0
+    for df in _sorted_parts(source, columns=columns):
+        df = df[df[USER_ID_COLUMN].notna()]
+        stop = position + len(df)
+        for col, array in arrays.items():
+            series = df[col]
+            if col in categories:
+                mapping = np.array([categories[col][value] for value in series.cat.categories],
+                                   dtype=storage[col])
+                codes = series.cat.codes.to_numpy()
+                array[position:stop] = np.where(codes >= 0, mapping[np.maximum(codes, 0)], -1)
+            else:
+                array[position:stop] = series.to_numpy()
+        # Benutzergrenzen über die Codes (die Zeilen eines Benutzers liegen zusammen)
+        codes, values = category_codes(df[USER_ID_COLUMN])
+        boundaries = np.flatnonzero(np.diff(codes, prepend=-1) != 0)
+        user_ids.extend(np.asarray(values, dtype=object)[codes[boundaries]])
+        starts.extend(position + boundaries)
+        position = stop
+    for array in arrays.values():
+        array.flush()
+    del arrays
+
+    # Benutzer-IDs sortiert (Binärsuche); `order` verweist auf die Position in der Ablage
+    user_ids = np.array(user_ids, dtype=str)
+    offsets = np.append(np.asarray(starts, dtype=np.int64), rows)
+    order = np.argsort(user_ids, kind='stable')
+    np.save(os.path.join(tmp_dir, '_user_ids.npy'), user_ids[order])
+    np.save(os.path.join(tmp_dir, '_user_order.npy'), order.astype(np.int64))
+    np.save(os.path.join(tmp_dir, '_offsets.npy'), offsets)
+    with open(os.path.join(tmp_dir, META_FILE), 'w', encoding='utf-8') as f:
+        json.dump({'rows': rows, 'users': len(user_ids), 'columns': list(storage),
+                   'categories': {col: list(values) for col, values in categories.items()}},
+                  f, ensure_ascii=False)
+
+    if os.path.exists(path):
+        shutil.rmtree(path)
+    os.replace(tmp_dir, path)
+    return len(user_ids), rows
+
+
+class EventIndex:
+    """Lesezugriff auf einen mit `build_event_index` erzeugten Index (speicherabgebildet)."""
+
+    def __init__(self, path=EVENTS_PATH):
+        with open(os.path.join(path, META_FILE), encoding='utf-8') as f:
+            meta = json.load(f)
+        self.rows = meta['rows']
+        self.columns = meta['columns']
+        self.categories = {col: pd.Index(values) for col, values in meta['categories'].items()}
+        self._arrays = {col: np.load(os.path.join(path, f'{col}.npy'), mmap_mode='r') for col in self.columns}
+        self._user_ids = np.load(os.path.join(path, '_user_ids.npy'), mmap_mode='r')
+        self._order = np.load(os.path.join(path, '_user_order.npy'), mmap_mode='r')
+        self.offsets = np.load(os.path.join(path, '_offsets.npy'), mmap_mode='r')
+
+    def __len__(self):
+        """Anzahl der Benutzer."""
+        return len(self._user_ids)
+
+    def __contains__(self, user_id):
+        return self._find(user_id) is not None
+
+    def _find(self, user_id):
+        """Position des Benutzers in der Ablage (None = nicht enthalten)."""
+        i = int(np.searchsorted(self._user_ids, user_id))
+        if i < len(self._user_ids) and self._user_ids[i] == user_id:
+            return int(self._order[i])
+        return None
+
+    def span(self, user_id):
+        """(Beginn, Ende) der Ereignisse des Benutzers; (0, 0) wenn nicht enthalten."""
+        position = self._find(user_id)
+        if position is None:
+            return 0, 0
+        return int(self.offsets[position]), int(self.offsets[position + 1])
+
+    def arrays(self, user_id, columns=None):
+        """Spalten des Benutzers als Sichten auf die Arrays (kategoriale Spalten als Codes)."""
+        start, stop = self.span(user_id)
+        return {col: self._arrays[col][start:stop] for col in (columns or self.columns)}
+
+    def events(self, user_id, columns=None):
+        """Ereignisse des Benutzers als DataFrame (kategoriale Spalten wie beim Laden)."""
+        data = {}
+        for col, values in self.arrays(user_id, columns).items():
+            if col in self.categories:
+                data[col] = pd.Categorical.from_codes(np.asarray(values, dtype=np.int64), self.categories[col])
+            else:
+                data[col] = np.array(values)
+        df = pd.DataFrame(data)
+        df.insert(0, USER_ID_COLUMN, user_id)
+        return df
+
+    def lengths(self):
+        """Anzahl der Ereignisse je Benutzer (in Ablagereihenfolge)."""
+        return np.diff(self.offsets)
+
+    def user_ids(self):
+        """Benutzer-IDs in Ablagereihenfolge."""
+        ids = np.empty(len(self._user_ids), dtype=self._user_ids.dtype)
+        ids[self._order] = self._user_ids
+        return ids
+
+    def iter_users(self, columns=None):
+        """Liefert (user_id, {Spalte: Sicht}) für alle Benutzer in Ablagereihenfolge, ohne Kopien."""
+        arrays = [(col, self._arrays[col]) for col in (columns or self.columns)]
+        offsets = np.asarray(self.offsets)
+        for user_id, start, stop in zip(self.user_ids(), offsets[:-1], offsets[1:]):
+            yield user_id, {col: array[start:stop] for col, array in arrays}
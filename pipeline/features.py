@@ -0,0 +1,132 @@
+"""
+Merkmale pro Benutzer aus den bereinigten Clickstreams.
+
+Für jeden Benutzer aus `data/user_filtered.parquet` (gleiche Zeilen-
+reihenfolge wie `user_id` dort) werden berechnet:
+- Anzahl der Ereignisse je Wert von `session_action`,
+  `session_action_type`, `session_action_detail` und
+  `session_device_type` (dünn besetzt),
+- Anzahl der Ereignisse, Summe, Median, 90%-Quantil und Maximum von
+  `time_passed_in_seconds`,
+- Anteil der Ereignisse mit `time_passed_in_seconds == 0`.
+
+Alle Zählungen laufen über die Kategorien-Codes: Benutzerzeile und
+Spaltenindex werden je Ereignis bestimmt und in einer dünn besetzten
+Matrix aufsummiert (bzw. mit `np.bincount` für die Summen). Quantile
+ergeben sich aus einer einzigen Sortierung nach (Benutzer, Zeit).
+Es wird kein `pivot_table`/`groupby` über die Ereignisse ausgeführt.
+"""
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+from pipeline.clickstreams import USER_ID_COLUMN, TIME_COLUMN, CATEGORICAL_COLUMNS
+from pipeline.codes import category_codes
+
+FEATURES_PATH = 'data/user_features.npz'
+
+TIME_QUANTILES = [0.5, 0.9]
+
+
+def _user_rows(series, user_ids):
+    """Zeile in `user_ids` für jedes Ereignis (-1 = Benutzer nicht enthalten)."""
+    codes, categories = category_codes(series)
+    category_rows = pd.Index(user_ids).get_indexer(categories)
+    rows = np.full(len(codes), -1, dtype=np.int64)
+    valid = codes >= 0
+    rows[valid] = category_rows[codes[valid]]
+    return rows
+
+
+def _group_quantiles(rows, values, num_rows, quantiles):
+    """Quantile (lineare Interpolation) von `values` je Zeile; leere Zeilen erhalten 0."""
+    order = np.lexsort((values, rows))
+    rows, values = rows[order], values[order]
+    counts = np.bincount(rows, minlength=num_rows)
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    present = counts > 0
+
+    result = np.zeros((num_rows, len(quantiles)))
+    for j, q in enumerate(quantiles):
+        position = starts[present] + (counts[present] - 1) * q
+        lower = np.floor(position).astype(np.int64)
+        upper = np.ceil(position).astype(np.int64)
+        result[present, j] = values[lower] + (position - lower) * (values[upper] - values[lower])
+    return result
+
+
+def build_user_features(df, user_ids):
+    """
+    Baut die Merkmalsmatrix (scipy CSR, eine Zeile pro Eintrag in `user_ids`).
+
+    Rückgabe: (Matrix, Merkmalsnamen)
+    """
+    user_ids = pd.Index(user_ids)
+    num_users = len(user_ids)
+    rows = _user_rows(df[USER_ID_COLUMN], user_ids)
+    times = df[TIME_COLUMN].to_numpy(dtype='float64', na_value=np.nan)
+    keep = (rows >= 0) & ~np.isnan(times)
+    rows, times = rows[keep], times[keep]
+
+    blocks = []
+    names = []
+
+    # Zählungen je Kategorie (dünn besetzt)
+    for col in CATEGORICAL_COLUMNS:
+        if col not in df.columns:
+            continue
+        codes, categories = category_codes(df[col])
+        codes = codes[keep]
+        present = codes >= 0
+        counts = sp.coo_matrix(
+            (np.ones(present.sum(), dtype=np.float64), (rows[present], codes[present])),
+            shape=(num_users, len(categories))
+        ).tocsr()
+        counts.sum_duplicates()
+        blocks.append(counts)
+        names.extend(f'{col}={value}' for value in categories)
+
+    # Zeitmerkmale (dicht, wenige Spalten)
+    event_count = np.bincount(rows, minlength=num_users).astype(np.float64)
+    time_sum = np.bincount(rows, weights=times, minlength=num_users)
+    zero_count = np.bincount(rows, weights=(times == 0).astype(np.float64), minlength=num_users)
+    zero_share = np.divide(zero_count, event_count, out=np.zeros(num_users), where=event_count > 0)
+    # Maximum = Quantil 1.0
+    quantiles = _group_quantiles(rows, times, num_users, TIME_QUANTILES + [1.0])
+
+    dense = np.column_stack([event_count, time_sum, quantiles, zero_share])
+    blocks.append(sp.csr_matrix(dense))
+    names.extend(['event_count', f'{TIME_COLUMN}_sum']
+                 + [f'{TIME_COLUMN}_q{int(q * 100)}' for q in TIME_QUANTILES]
+                 + [f'{TIME_COLUMN}_max', 'zero_time_share'])
+
+    return sp.hstack(blocks, format='csr'), names
+
+
+def save_user_features(path, matrix, feature_names, user_ids):
+    """Speichert Matrix, Merkmalsnamen und user_ids in einer .npz-Datei."""
+    matrix = matrix.tocsr()
+    np.savez_compressed(
+        path,
+        data=matrix.data, indices=matrix.indices, indptr=matrix.indptr,
+        shape=np.array(matrix.shape),
+        feature_names=np.array(feature_names, dtype=str),
+        user_ids=np.array(user_ids, dtype=str),
+    )
+
+
+def load_user_features(path=FEATURES_PATH):
+    """Lädt (Matrix, Merkmalsnamen, user_ids) aus `save_user_features`."""
+    with np.load(path) as f:
+        matrix = sp.csr_matrix((f['data'], f['indices'], f['indptr']), shape=tuple(f['shape']))
+        return matrix, f['feature_names'].tolist(), pd.Index(f['user_ids'], name='user_id')
+
+
+def features_frame(matrix, feature_names, user_ids, columns=None):
+    """Ausgewählte Merkmale als (dünn besetzten) DataFrame mit user_id als Index."""
+    if columns is not None:
+        positions = [feature_names.index(col) for col in columns]
+        matrix, feature_names = matrix[:, positions], list(columns)
+    return pd.DataFrame.sparse.from_spmatrix(matrix, index=pd.Index(user_ids, name='user_id'),
+                                             columns=feature_names)
@@ -0,0 +1,162 @@
+"""
+Abbildungen als Aufträge: interaktiv anzeigen oder im Stapel rendern.
+
+Jede Abbildung ist ein `FigureJob` aus einem Namen, einer Funktion auf
+Modulebene (z. B. aus pipeline/plots.py), die eine Figure zurückgibt,
+und den bereits aggregierten Daten, aus denen sie gezeichnet wird. Die
+Notebooks rufen `show(name, func, **daten)` auf:
+
+- normal (Jupyter, Skript): die Abbildung wird sofort gezeichnet und
+  mit `plt.show()` angezeigt,
+- innerhalb von `collect()`: der Auftrag wird nur gesammelt.
+
+`render` zeichnet gesammelte Aufträge ohne Bildschirm (Agg-Backend) in
+einem Prozesspool und schreibt je Format eine Datei
+`<ausgabeverzeichnis>/<name>.<format>`. Der Schlüssel eines Auftrags
+besteht aus Name, Funktion, Hash des Moduls der Funktion, Hash der
+Daten, Formaten und Auflösung; er wird in `data/.cache/figures.json`
+festgehalten. Stimmen Schlüssel überein und liegen alle Dateien vor,
+wird die Abbildung übersprungen.
+
+I und II importieren dieses Modul und pipeline/plots.py nur zum Zeichnen.
+Beide gehören daher nicht zum Code-Hash der Datenstufen (siehe
+`_EXCLUDED_MODULES` in pipeline/stages.py): eine geänderte Abbildung
+invalidiert weder data/users.parquet noch die bereinigten Klickdaten.
+"""
+
+import inspect
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+import matplotlib
+import matplotlib.pyplot as plt
+
+from pipeline.hashing import data_hash, file_hash, value_hash
+
+OUTPUT_DIR = os.path.join('scripts', 'outputs')
+MANIFEST_PATH = os.path.join('data', '.cache', 'figures.json')
+FORMATS = ('png',)
+DPI = 150
+
+# Gesammelte Aufträge innerhalb von collect() (sonst None)
+_batch = None
+
+
+class FigureJob:
+    """Eine Abbildung: Name, zeichnende Funktion und ihre Daten."""
+
+    def __init__(self, name, func, data):
+        self.name = name
+        self.func = func
+        self.data = data
+
+    def key(self, formats=FORMATS, dpi=DPI):
+        """Schlüssel aus Funktion, deren Modul, Daten, Formaten und Auflösung."""
+        source = inspect.getsourcefile(self.func)
+        return value_hash({
+            'name': self.name,
+            'func': f'{self.func.__module__}.{self.func.__qualname__}',
+            'code': file_hash(source) if source else None,
+            'data': data_hash(self.data),
+            'formats': list(formats),
+            'dpi': dpi,
+        })
+
+    def paths(self, output_dir=OUTPUT_DIR, formats=FORMATS):
+        return [os.path.join(output_dir, f'{self.name}.{fmt}') for fmt in formats]
+
+
+@contextmanager
+def collect():
+    """Sammelt alle `show`-Aufrufe im Block als Aufträge, statt sie zu zeichnen."""
+    global _batch
+    previous, _batch = _batch, []
+    try:
+        yield _batch
+    finally:
+        _batch = previous
+
+
+def show(name, func, **data):
+    """
+    Zeichnet und zeigt die Abbildung `func(**data)` bzw. sammelt sie innerhalb von `collect()`.
+    Gibt nichts zurück, damit Jupyter die Abbildung nicht ein zweites Mal als Zellergebnis ausgibt.
+    """
+    if _batch is not None:
+        if any(job.name == name for job in _batch):
+            raise ValueError(f"Abbildung doppelt benannt: {name!r}")
+        _batch.append(FigureJob(name, func, data))
+        return None
+    func(**data)
+    plt.show()
+    return None
+
+
+def _init_worker():
+    matplotlib.use('Agg')
+
+
+def _render(task):
+    """Zeichnet eine Abbildung und speichert sie in allen Formaten."""
+    func, data, paths, dpi = task
+    fig = func(**data)
+    try:
+        for path in paths:
+            fig.savefig(path, dpi=dpi, bbox_inches='tight')
+    finally:
+        plt.close(fig)
+    return paths
+
+
+def load_manifest(path=MANIFEST_PATH):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def render(jobs, output_dir=OUTPUT_DIR, formats=FORMATS, dpi=DPI, workers=None, force=False,
+           manifest_path=MANIFEST_PATH):
+    """
+    Rendert die Aufträge, deren Schlüssel oder Dateien sich geändert haben
+    (alle bei `force`). workers > 1 (None = Anzahl der CPUs): parallel in
+    eigenen Prozessen mit Agg-Backend. Rückgabe: (gerendert, übersprungen) als Namenslisten.
+    """
+    formats = tuple(formats)
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = load_manifest(manifest_path)
+
+    pending, skipped, keys = [], [], {}
+    for job in jobs:
+        keys[job.name] = job.key(formats, dpi)
+        paths = job.paths(output_dir, formats)
+        if (not force and manifest.get(job.name) == keys[job.name]
+                and all(os.path.exists(path) for path in paths)):
+            skipped.append(job.name)
+        else:
+            pending.append((job, paths))
+
+    tasks = [(job.func, job.data, paths, dpi) for job, paths in pending]
+    rendered = []
+    try:
+        workers = os.cpu_count() if workers is None else workers
+        if workers <= 1 or len(tasks) <= 1:
+            for (job, _), task in zip(pending, tasks):
+                _render(task)
+                rendered.append(job.name)
+        else:
+            with ProcessPoolExecutor(max_workers=min(workers, len(tasks)), initializer=_init_worker) as executor:
+                futures = [executor.submit(_render, task) for task in tasks]
+                for (job, _), future in zip(pending, futures):
+                    future.result()
+                    rendered.append(job.name)
+    finally:
+        # Auch bei einem Fehler bleiben die bereits gerenderten Abbildungen gültig
+        for name in rendered:
+            manifest[name] = keys[name]
+        os.makedirs(os.path.dirname(manifest_path) or '.', exist_ok=True)
+        with open(manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+    return rendered, skipped
@@ -0,0 +1,87 @@
+"""
+Inhaltsbasierte Hashes für Dateien, Verzeichnisse und Parameter.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+
+
+def file_hash(path, chunk_size=1 << 20):
+    """SHA-256-Hash des Dateiinhalts (hexadezimal)."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def path_hash(path):
+    """
+    SHA-256-Hash einer Datei bzw. eines Verzeichnisses (über die relativen
+    Namen und Inhalte aller enthaltenen Dateien).
+    """
+    if not os.path.isdir(path):
+        return file_hash(path)
+    digest = hashlib.sha256()
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        for name in sorted(files):
+            file_path = os.path.join(root, name)
+            digest.update(os.path.relpath(file_path, path).encode('utf-8'))
+            digest.update(file_hash(file_path).encode('ascii'))
+    return digest.hexdigest()
+
+
+def value_hash(value):
+    """SHA-256-Hash eines JSON-serialisierbaren Wertes (unabhängig von der Schlüsselreihenfolge)."""
+    data = json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+def data_hash(value):
+    """
+    SHA-256-Hash von Daten für Abbildungen: DataFrames, Series, Indizes und
+    NumPy-Arrays über ihren Inhalt, Listen/Tupel/Dictionaries rekursiv,
+    sonstige Objekte über ihren Pickle-Zustand.
+    """
+    digest = hashlib.sha256()
+    _update(digest, value)
+    return digest.hexdigest()
+
+
+def _update(digest, value):
+    # NumPy/pandas erst hier importieren: der Stufen-Cache (pipeline/stages.py)
+    # und `python -m pipeline run` kommen ohne sie aus
+    import numpy as np
+    import pandas as pd
+
+    if isinstance(value, (pd.DataFrame, pd.Series, pd.Index)):
+        digest.update(type(value).__name__.encode('ascii'))
+        if isinstance(value, pd.DataFrame):
+            digest.update(repr(list(value.columns)).encode('utf-8'))
+            digest.update(repr(list(value.dtypes.astype(str))).encode('utf-8'))
+        else:
+            digest.update(repr((value.name, str(value.dtype))).encode('utf-8'))
+        if len(value) > 0:
+            index = not isinstance(value, pd.Index)
+            digest.update(pd.util.hash_pandas_object(value, index=index).to_numpy().tobytes())
+    elif isinstance(value, np.ndarray) and value.dtype != object:
+        digest.update(repr((str(value.dtype), value.shape)).encode('ascii'))
+        digest.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, dict):
+        digest.update(b'{')
+        for key in sorted(value, key=str):
+            _update(digest, key)
+            _update(digest, value[key])
+        digest.update(b'}')
+    elif isinstance(value, (list, tuple)):
+        digest.update(b'[')
+        for item in value:
+            _update(digest, item)
+        digest.update(b']')
+    elif isinstance(value, (str, int, float, bool, type(None), np.generic)):
+        digest.update(repr(value).encode('utf-8'))
+    else:
+        digest.update(pickle.dumps(value, protocol=4))
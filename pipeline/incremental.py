@@ -0,0 +1,211 @@
+"""
+Inkrementelle Bereinigung neuer Clickstream-Partitionen.
+
+Die Clickstream-Daten kommen in täglichen Lieferungen: je eine
+Parquet-Datei in `data/clickstreams/`. `append_partitions` bereinigt nur
+die noch nicht verarbeiteten Dateien mit denselben Schritten wie II
+(Duplikate entfernen, '-unknown-' durch NaN ersetzen, `is_new_session`
+setzen, Zeilen ohne Benutzer, Aktion oder Zeit entfernen) und schreibt
+jede als gleichnamige Datei nach `data/clickstreams_filtered/`. Das
+Verzeichnis lässt sich mit `load_clickstreams` wie eine Datei lesen.
+
+Zustand in `<Ausgabeverzeichnis>/_state/`:
+- `fingerprints/`: Fingerabdrücke aller bisher gesehenen Rohzeilen
+  (persistenter `DuplicateDetector`): pro Hash-Partition sortierte Läufe,
+  je Lieferung ein neuer. Neue Zeilen werden per `searchsorted` gegen die
+  Läufe abgeglichen; die Historie wird dabei nicht erneut gehasht oder
+  geschrieben.
+- `profiles/`: Spaltenprofile der II-Berichte (Rohdaten, Duplikate,
+  Null-Zeiten), jeweils um die Profile der neuen Partition ergänzt.
+- `manifest.json`: verarbeitete Partitionen (Name, SHA-256, Größe und
+  Änderungszeit, Zeilenzahlen).
+
+Duplikate gelten wie bei `duplicated()` über alle Partitionen in
+Verarbeitungsreihenfolge: Das erste Vorkommen bleibt erhalten. Hashen,
+Bereinigen und Schreiben einer Lieferung hängen nur von ihrer Größe ab.
+Dazu kommen der Abgleich mit den Läufen (logarithmisch in der Größe der
+Historie, über Memory-Maps) und das gelegentliche Zusammenführen gleich
+großer Läufe, bei dem jeder Fingerabdruck im Mittel log2(Lieferungen)-mal
+umgeschrieben wird.
+"""
+
+import json
+import os
+import shutil
+
+from pipeline import config
+from pipeline.clickstreams import (RAW_SUMMARY_COLUMNS, REQUIRED_COLUMNS, TIME_COLUMN, UNKNOWN_COLUMNS,
+                                   ZERO_TIME_COLUMNS, ClickstreamWriter, load_clickstreams, replace_with_nan)
+from pipeline.dedup import DuplicateDetector
+from pipeline.hashing import file_hash
+from pipeline.profiling import DataProfile
+from pipeline.reports import render_top_values, render_unique_values_summary
+
+PARTITIONS_DIR = 'data/clickstreams'
+OUTPUT_DIR = 'data/clickstreams_filtered'
+STATE_DIR_NAME = '_state'
+
+# Bei Änderungen an den Bereinigungsschritten oder an den Fingerabdrücken erhöhen (erzwingt einen Neuaufbau)
+STATE_VERSION = 2
+FINGERPRINT_BITS = 64
+PARTITION_BITS = 4
+
+# Profile der II-Berichte: Name -> (Ausgabedatei, Titel im Bericht, Spalten der Zusammenfassung)
+PROFILES = {
+    'raw': ('clickstreams_unique_values_summary.txt', 'df_clickstreams', RAW_SUMMARY_COLUMNS),
+    'duplicates': ('clickstreams_duplicates_unique_values_summary.txt', 'df_duplicates', None),
+    'zero_time': ('clickstreams_zero_time_unique_values_summary.txt', None, None),
+}
+
+
+def clean_partition(df, detector):
+    """
+    Bereinigt eine Partition wie II; Duplikate werden gegen alle bisher
+    im `detector` gesehenen Zeilen erkannt.
+    Rückgabe: (bereinigter DataFrame, Profile der Partition, Anzahl der Duplikate).
+    """
+    duplicate_mask = detector.add(df)
+    profiles = {
+        'raw': DataProfile.from_frame(df),
+        'duplicates': DataProfile.from_frame(df[duplicate_mask]),
+    }
+    df = df[~duplicate_mask].copy(deep=False)
+    for col in UNKNOWN_COLUMNS:
+        df[col] = replace_with_nan(df[col])
+    df['is_new_session'] = df[TIME_COLUMN] > config.SESSION_GAP_SECONDS
+    profiles['zero_time'] = DataProfile.from_frame(df[df[TIME_COLUMN] == 0], columns=ZERO_TIME_COLUMNS)
+    df = df.dropna(subset=REQUIRED_COLUMNS)
+    return df, profiles, int(duplicate_mask.sum())
+
+
+class IncrementalState:
+    """Verarbeitete Partitionen, Duplikatindex und zusammengeführte Profile eines Ausgabeverzeichnisses."""
+
+    def __init__(self, output_dir=OUTPUT_DIR):
+        self.output_dir = output_dir
+        self.state_dir = os.path.join(output_dir, STATE_DIR_NAME)
+        self.manifest_path = os.path.join(self.state_dir, 'manifest.json')
+        self.manifest = {'version': STATE_VERSION, 'fingerprint_bits': FINGERPRINT_BITS,
+                         'partition_bits': PARTITION_BITS, 'partitions': [], 'in_progress': None}
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, encoding='utf-8') as f:
+                self.manifest = json.load(f)
+        if self.manifest['version'] != STATE_VERSION:
+            raise RuntimeError(f"Zustand in {self.state_dir} stammt von einer anderen Version "
+                               f"der Bereinigung; Neuaufbau erforderlich (rebuild=True bzw. --rebuild)")
+        if self.manifest['in_progress'] is not None:
+            raise RuntimeError(f"Verarbeitung von '{self.manifest['in_progress']}' wurde abgebrochen; "
+                               f"der Duplikatindex ist unvollständig, Neuaufbau erforderlich (rebuild=True bzw. --rebuild)")
+        self.profiles = {name: self._load_profile(name) for name in PROFILES}
+
+    @property
+    def partitions(self):
+        return self.manifest['partitions']
+
+    def _profile_path(self, name):
+        return os.path.join(self.state_dir, 'profiles', f'{name}.json')
+
+    def _load_profile(self, name):
+        path = self._profile_path(name)
+        return DataProfile.load(path) if os.path.exists(path) else DataProfile()
+
+    def detector(self):
+        return DuplicateDetector.persistent(os.path.join(self.state_dir, 'fingerprints'),
+                                            bits=self.manifest['fingerprint_bits'],
+                                            partition_bits=self.manifest['partition_bits'])
+
+    def pending(self, input_dir=PARTITIONS_DIR):
+        """Noch nicht verarbeitete Parquet-Dateien in `input_dir` (nach Namen sortiert)."""
+        done = {entry['name']: entry for entry in self.partitions}
+        pending = []
+        for name in sorted(os.listdir(input_dir)):
+            if not name.endswith('.parquet') or name.startswith(('_', '.')):
+                continue
+            path = os.path.join(input_dir, name)
+            if name not in done:
+                pending.append(path)
+            # Hash nur bei geänderter Größe oder Änderungszeit (verarbeitete Dateien werden sonst nicht gelesen)
+            elif _file_stamp(path) != done[name]['stamp'] and file_hash(path) != done[name]['sha256']:
+                raise RuntimeError(f"Bereits verarbeitete Partition wurde verändert: {path}; "
+                                   f"Neuaufbau erforderlich (rebuild=True bzw. --rebuild)")
+        return pending
+
+    def begin(self, name):
+        """Markiert die Partition als in Arbeit, bevor der Duplikatindex verändert wird."""
+        self.manifest['in_progress'] = name
+        self._save_manifest()
+
+    def commit(self, entry, profiles):
+        """Übernimmt die Profile der Partition und trägt sie als verarbeitet ein."""
+        os.makedirs(os.path.dirname(self._profile_path('raw')), exist_ok=True)
+        for name, profile in profiles.items():
+            self.profiles[name] = self.profiles[name].merge(profile)
+            _atomic_write(self._profile_path(name), self.profiles[name].to_dict())
+        self.manifest['partitions'].append(entry)
+        self.manifest['in_progress'] = None
+        self._save_manifest()
+
+    def _save_manifest(self):
+        os.makedirs(self.state_dir, exist_ok=True)
+        _atomic_write(self.manifest_path, self.manifest, indent=2)
+
+    def write_reports(self, out_dir='scripts/outputs'):
+        """Schreibt die II-Zusammenfassungen aus den zusammengeführten Profilen. Rückgabe: Pfade."""
+        os.makedirs(out_dir, exist_ok=True)
+        paths = []
+        for name, (file_name, title, columns) in PROFILES.items():
+            profile = self.profiles[name]
+            if title is None:
+                text = '\n\n'.join(render_top_values(profile, col) for col in profile.columns)
+            else:
+                text = render_unique_values_summary(profile, title, columns=columns, top=15)
+            path = os.path.join(out_dir, file_name)
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(text)
+            paths.append(path)
+        return paths
+
+
+def _file_stamp(path):
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def _atomic_write(path, data, indent=None):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=indent, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def append_partitions(input_dir=PARTITIONS_DIR, output_dir=OUTPUT_DIR, rebuild=False):
+    """
+    Bereinigt alle neuen Partitionen aus `input_dir` und ergänzt Ausgabe,
+    Duplikatindex und Profile. rebuild=True verwirft Ausgabe und Zustand
+    und verarbeitet alle Partitionen neu.
+    Rückgabe: (Zustand, Einträge der in diesem Lauf verarbeiteten Partitionen).
+    """
+    if rebuild and os.path.exists(output_dir):
+        shutil.rmtree(output_dir)
+    os.makedirs(output_dir, exist_ok=True)
+    state = IncrementalState(output_dir)
+    processed = []
+    for path in state.pending(input_dir):
+        name = os.path.basename(path)
+        df = load_clickstreams(path)
+        state.begin(name)
+        detector = state.detector()
+        df_clean, profiles, num_duplicates = clean_partition(df, detector)
+        detector.close()
+
+        # Temporärer Name mit '_', damit eine halb geschriebene Datei nicht mitgelesen wird
+        tmp_path = os.path.join(output_dir, f'_{name}.tmp')
+        with ClickstreamWriter(tmp_path) as writer:
+            writer.write(df_clean)
+        os.replace(tmp_path, os.path.join(output_dir, name))
+
+        entry = {'name': name, 'sha256': file_hash(path), 'stamp': _file_stamp(path), 'rows': len(df),
+                 'duplicates': num_duplicates, 'rows_clean': len(df_clean)}
+        state.commit(entry, profiles)
+        processed.append(entry)
+    return state, processed
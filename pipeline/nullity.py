@@ -0,0 +1,260 @@
+"""
+Fehlende Werte als Bitmaps und daraus abgeleitete Plots.
+
+`NullityProfile` packt die Maske der fehlenden Werte jeder Spalte mit
+`np.packbits` in eine Bitmap (1 Bit pro Zeile, 1/8 des Speichers einer
+booleschen Maske). Alle Kennzahlen entstehen aus Bitzählungen über
+diese Bitmaps:
+
+- fehlende Werte pro Spalte: Anzahl gesetzter Bits,
+- gemeinsam fehlende Werte je Spaltenpaar: Bits von `a & b`,
+- Korrelation der Nullität (Pearson auf den 0/1-Masken, wie
+  `df.isnull().corr()`) exakt aus diesen Anzahlen,
+- Anteil fehlender Werte je Zeilenbereich (Bins aus ganzen Bytes).
+
+Die Plots `matrix`, `bar` und `heatmap` entsprechen denen von missingno,
+werden aber nur aus diesen Aggregaten gezeichnet: Der Aufwand hängt von
+der Anzahl der Spalten und Bins ab, nicht von der Anzahl der Zeilen.
+Die Matrix zeigt je Bin den Anteil vorhandener Werte als Grauwert.
+
+Profile lassen sich stapelweise aufbauen (`add`), z. B. im
+Streaming-Modus.
+"""
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+from matplotlib.colors import LinearSegmentedColormap
+
+# Anzahl gesetzter Bits je Bytewert
+POPCOUNT = np.array([bin(value).count('1') for value in range(256)], dtype=np.uint8)
+
+MATRIX_BINS = 500
+PRESENT_COLOR = (0.25, 0.25, 0.25)
+
+
+def popcount(bitmap):
+    """Anzahl gesetzter Bits in einer gepackten Bitmap (uint8)."""
+    return int(POPCOUNT[bitmap].sum(dtype=np.int64))
+
+
+class NullityProfile:
+    """Bitmaps der fehlenden Werte aller (ausgewählten) Spalten."""
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        self.rows = 0
+        self._chunks = [[] for _ in self.columns]
+        # Bits, die noch kein ganzes Byte füllen (Übertrag zum nächsten Stapel)
+        self._tails = [np.zeros(0, dtype=bool) for _ in self.columns]
+        self._bitmaps = None
+
+    @classmethod
+    def from_frame(cls, df, columns=None):
+        profile = cls(list(df.columns) if columns is None else columns)
+        profile.add(df)
+        return profile
+
+    def add(self, df):
+        """Hängt die Zeilen eines weiteren Stapels an."""
+        for i, col in enumerate(self.columns):
+            mask = np.concatenate([self._tails[i], df[col].isna().to_numpy()])
+            full = len(mask) - len(mask) % 8
+            self._chunks[i].append(np.packbits(mask[:full]))
+            self._tails[i] = mask[full:]
+        self.rows += len(df)
+        self._bitmaps = None
+        return self
+
+    def __getstate__(self):
+        # Einheitlicher Zustand unabhängig von der Stapelung (Pickle, Daten-Hash in pipeline/figures.py)
+        return {'columns': self.columns, 'rows': self.rows, 'bitmaps': self.bitmaps}
+
+    def __setstate__(self, state):
+        self.columns = state['columns']
+        self.rows = state['rows']
+        bitmaps = state['bitmaps']
+        full = self.rows // 8
+        self._chunks = [[bitmap[:full]] for bitmap in bitmaps]
+        self._tails = [np.unpackbits(bitmap[full:])[:self.rows % 8].astype(bool) for bitmap in bitmaps]
+        self._bitmaps = bitmaps
+
+    @property
+    def bitmaps(self):
+        """Gepackte Bitmaps als Matrix (Spalten × Bytes); Füllbits am Ende sind 0."""
+        if self._bitmaps is None:
+            num_bytes = (self.rows + 7) // 8
+            bitmaps = np.zeros((len(self.columns), num_bytes), dtype=np.uint8)
+            for i, (chunks, tail) in enumerate(zip(self._chunks, self._tails)):
+                packed = np.concatenate(chunks + [np.packbits(tail)]) if chunks else np.packbits(tail)
+                bitmaps[i, :len(packed)] = packed
+            self._bitmaps = bitmaps
+        return self._bitmaps
+
+    def missing(self):
+        """Fehlende Werte pro Spalte (wie `df.isnull().sum()`)."""
+        counts = POPCOUNT[self.bitmaps].sum(axis=1, dtype=np.int64)
+        return pd.Series(counts, index=self.columns, dtype='int64')
+
+    def present(self):
+        """Vorhandene Werte pro Spalte (wie `df.count()`)."""
+        return self.rows - self.missing()
+
+    def co_missing(self):
+        """Anzahl der Zeilen, in denen beide Spalten fehlen (Diagonale = `missing`)."""
+        bitmaps = self.bitmaps
+        n = len(self.columns)
+        counts = np.zeros((n, n), dtype=np.int64)
+        for i in range(n):
+            counts[i, i] = popcount(bitmaps[i])
+            for j in range(i + 1, n):
+                counts[i, j] = counts[j, i] = popcount(bitmaps[i] & bitmaps[j])
+        return pd.DataFrame(counts, index=self.columns, columns=self.columns)
+
+    def corr(self):
+        """
+        Korrelation der Nullität wie `df.isnull().corr()` aus den Anzahlen:
+        r = (n·c − a·b) / √(a(n−a) · b(n−b)). Spalten ohne fehlende oder
+        ohne vorhandene Werte ergeben NaN.
+        """
+        both = self.co_missing().to_numpy(dtype='float64')
+        n = float(self.rows)
+        missing = np.diag(both)
+        variance = missing * (n - missing)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            corr = (n * both - np.outer(missing, missing)) / np.sqrt(np.outer(variance, variance))
+        corr[~np.isfinite(corr)] = np.nan
+        return pd.DataFrame(corr, index=self.columns, columns=self.columns)
+
+    def binned(self, bins=MATRIX_BINS):
+        """
+        Anteil fehlender Werte je Spalte für aufeinanderfolgende Zeilenbereiche
+        (höchstens `bins`, je ein Vielfaches von 8 Zeilen). Index: erste Zeile des Bereichs.
+        """
+        bitmaps = self.bitmaps
+        num_bytes = bitmaps.shape[1]
+        if num_bytes == 0:
+            return pd.DataFrame(columns=self.columns, dtype='float64')
+        bytes_per_bin = -(-num_bytes // bins)
+        starts = np.arange(0, num_bytes, bytes_per_bin)
+        missing = np.add.reduceat(POPCOUNT[bitmaps].astype(np.int64), starts, axis=1)
+        first_rows = starts * 8
+        rows = np.diff(np.append(first_rows, self.rows))
+        return pd.DataFrame((missing / rows).T, index=first_rows, columns=self.columns)
+
+
+def _profile(data):
+    return data if isinstance(data, NullityProfile) else NullityProfile.from_frame(data)
+
+
+def _axes(ax, figsize):
+    if ax is None:
+        _, ax = plt.subplots(figsize=figsize)
+    return ax
+
+
+def matrix(data, bins=MATRIX_BINS, figsize=(25, 10), fontsize=16, ax=None):
+    """
+    Matrix der Nullität wie `msno.matrix(..., sparkline=False)`: dunkel =
+    vorhanden, weiß = fehlend; je Bin der Anteil vorhandener Werte als Grauwert.
+    `data`: NullityProfile oder DataFrame.
+    """
+    profile = _profile(data)
+    binned = profile.binned(bins)
+    ax = _axes(ax, figsize)
+    cmap = LinearSegmentedColormap.from_list('nullity', ['white', PRESENT_COLOR])
+    ax.imshow(1 - binned.to_numpy(), aspect='auto', cmap=cmap, vmin=0, vmax=1,
+              interpolation='none', extent=(-0.5, len(profile.columns) - 0.5, len(binned) - 0.5, -0.5))
+
+    ax.set_aspect('auto')
+    ax.grid(False)
+    ax.xaxis.tick_top()
+    ax.xaxis.set_ticks_position('none')
+    ax.yaxis.set_ticks_position('none')
+    for side in ['top', 'right', 'bottom', 'left']:
+        ax.spines[side].set_visible(False)
+    ax.set_xticks(range(len(profile.columns)))
+    ax.set_xticklabels(profile.columns, rotation=45, ha='left', fontsize=fontsize)
+    ax.set_yticks([0, max(len(binned) - 1, 0)])
+    ax.set_yticklabels([1, profile.rows], fontsize=20)
+    # Trennlinien zwischen den Spalten
+    for x in np.arange(0.5, len(profile.columns) - 0.5):
+        ax.axvline(x, linestyle='-', color='white')
+    return ax
+
+
+def bar(data, figsize=(24, 10), fontsize=16, color='dimgray', ax=None):
+    """
+    Vollständigkeit pro Spalte wie `msno.bar`: links Anteil, rechts und oben
+    Anzahl vorhandener Werte. `data`: NullityProfile oder DataFrame.
+    """
+    profile = _profile(data)
+    present = profile.present()
+    fraction = present / profile.rows if profile.rows else present.astype('float64')
+    ax = _axes(ax, figsize)
+    positions = np.arange(len(profile.columns))
+    ax.bar(positions, fraction.to_numpy(), 0.5, color=color)
+
+    ax.set_ylim(0, 1)
+    ax.set_xlim(-0.5, len(positions) - 0.5)
+    ax.set_xticks(positions)
+    ax.set_xticklabels(profile.columns, rotation=45, ha='right', fontsize=fontsize)
+    ax.set_yticks([0, 0.2, 0.4, 0.6, 0.8, 1.0])
+    ax.tick_params(axis='y', labelsize=fontsize)
+    ax.grid(False)
+    for side in ['top', 'right', 'bottom', 'left']:
+        ax.spines[side].set_visible(False)
+
+    # Anzahl vorhandener Werte: rechte Achse (bezogen auf alle Zeilen) und oben je Spalte
+    counts_ax = ax.twinx()
+    counts_ax.set_ylim(ax.get_ylim())
+    counts_ax.set_yticks(ax.get_yticks())
+    counts_ax.set_yticklabels([int(round(tick * profile.rows)) for tick in ax.get_yticks()], fontsize=fontsize)
+    top_ax = ax.twiny()
+    top_ax.set_xlim(ax.get_xlim())
+    top_ax.set_xticks(positions)
+    top_ax.set_xticklabels(present.tolist(), rotation=45, ha='left', fontsize=fontsize)
+    for extra_ax in (counts_ax, top_ax):
+        extra_ax.grid(False)
+        for side in ['top', 'right', 'bottom', 'left']:
+            extra_ax.spines[side].set_visible(False)
+    return ax
+
+
+def heatmap(data, figsize=(20, 12), fontsize=16, cmap='RdBu', ax=None):
+    """
+    Korrelation der Nullität wie `msno.heatmap`: nur Spalten mit fehlenden
+    und vorhandenen Werten, unteres Dreieck. `data`: NullityProfile oder DataFrame.
+    """
+    profile = _profile(data)
+    missing = profile.missing()
+    columns = missing.index[(missing > 0) & (missing < profile.rows)]
+    corr = profile.corr().loc[columns, columns].to_numpy()
+    ax = _axes(ax, figsize)
+
+    values = np.ma.masked_array(corr, mask=np.triu(np.ones_like(corr, dtype=bool)))
+    image = ax.imshow(values, cmap=cmap, vmin=-1, vmax=1, interpolation='none')
+    plt.colorbar(image, ax=ax, shrink=0.8)
+    for i in range(len(columns)):
+        for j in range(i):
+            value = corr[i, j]
+            if np.isnan(value):
+                continue
+            # Wie missingno: nahezu perfekte Korrelation als "<1" bzw. ">-1"
+            if 0.95 <= value < 1:
+                text = '<1'
+            elif -1 < value <= -0.95:
+                text = '>-1'
+            else:
+                text = f'{round(value, 1) + 0.0:.1f}'
+            ax.text(j, i, text, ha='center', va='center', fontsize=fontsize - 2,
+                    color='white' if abs(value) > 0.6 else 'black')
+
+    ax.set_xticks(range(len(columns)))
+    ax.set_xticklabels(columns, rotation=45, ha='right', fontsize=fontsize)
+    ax.set_yticks(range(len(columns)))
+    ax.set_yticklabels(columns, fontsize=fontsize)
+    ax.grid(False)
+    for side in ['top', 'right', 'bottom', 'left']:
+        ax.spines[side].set_visible(False)
+    return ax
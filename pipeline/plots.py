@@ -0,0 +1,203 @@
+"""
+Abbildungen der Notebooks als Funktionen über bereits aggregierten Daten.
+
+Jede Funktion erhält nur die kleinen Tabellen, aus denen die Abbildung
+gezeichnet wird (Zusammenfassungen, Kreuztabellen, Nullitätsprofile),
+und gibt die Figure zurück. Damit lassen sich die Abbildungen über
+pipeline/figures.py interaktiv anzeigen oder ohne Bildschirm in einem
+Prozesspool als Dateien rendern.
+"""
+
+import matplotlib.pyplot as plt
+
+from pipeline import nullity
+
+
+# Fehlende Werte (I, II, scripts/visualize_missing_values.py)
+
+def missing_matrix(profile, title, figsize=(12, 6)):
+    fig, ax = plt.subplots(figsize=figsize)
+    nullity.matrix(profile, ax=ax)
+    ax.set_title(title, fontsize=14, pad=20)
+    fig.tight_layout()
+    return fig
+
+
+def missing_bar(profile, title='Vollständigkeit der Daten pro Spalte', figsize=(12, 6)):
+    fig, ax = plt.subplots(figsize=figsize)
+    nullity.bar(profile, ax=ax)
+    ax.set_title(title, fontsize=14, pad=20)
+    fig.tight_layout()
+    return fig
+
+
+def missing_heatmap(profile, title='Korrelation fehlender Werte', figsize=(12, 8)):
+    fig, ax = plt.subplots(figsize=figsize)
+    nullity.heatmap(profile, ax=ax)
+    ax.set_title(title, fontsize=14, pad=20)
+    fig.tight_layout()
+    return fig
+
+
+# Gesamtentwicklung (III, Abschnitt 1)
+
+def cumulative_lines(dates, lines, title, ylabel):
+    """Kumulative Kurven über die Zeit; `lines`: {Beschriftung: Werte}."""
+    fig, ax = plt.subplots(figsize=(12, 6))
+    for label, values in lines.items():
+        ax.plot(dates, values, label=label)
+    ax.set(
+        title=title,
+        xlabel='Datum',
+        ylabel=ylabel
+    )
+    ax.legend()
+    return fig
+
+
+def monthly_conversion(summary):
+    """Registrierungen, Buchungen und Conversion Rate je Monat auf zwei Achsen."""
+    fig, ax1 = plt.subplots(figsize=(16, 8))
+
+    # X-Achse (Monate) vorbereiten
+    months = summary['month'].astype(str)
+
+    # Linke Achse: Conversion Rate
+    color_cv = 'tab:red'
+    ax1.set_xlabel('Monat')
+    ax1.set_ylabel('Conversion Rate (%)', color=color_cv)
+    ax1.plot(months, summary['conversion_rate'], color=color_cv, marker='o', linewidth=3, label='Conversion Rate')
+    ax1.tick_params(axis='y', labelcolor=color_cv)
+    ax1.set_ylim(0, summary['conversion_rate'].max() * 1.2)
+
+    # Rechte Achse: Anzahl Benutzer
+    ax2 = ax1.twinx()
+    ax2.set_ylabel('Anzahl der Benutzer', color='black')
+    ax2.plot(months, summary['total_users'], color='tab:blue', linestyle='--', marker='s', label='Registrierungen')
+    ax2.plot(months, summary['booked_users'], color='tab:green', linestyle='-.', marker='^', label='Buchungen')
+    ax2.tick_params(axis='y', labelcolor='black')
+
+    # Legende erstellen
+    ax1.legend(loc=(0.005, 0.95))
+    ax2.legend(loc=(0.005, 0.87))
+
+    fig.suptitle('Monatliche Benutzerregistrierungen, Buchungen und Conversion Rate')
+
+    # X-Achse Formatierung verbessern
+    ax1.tick_params(axis='x', rotation=45, labelsize=10)
+
+    # Gitterlinien hinzufügen
+    ax2.grid(axis='y', linestyle='--', alpha=0.3)
+    fig.tight_layout()
+    return fig
+
+
+def destination_shares(summary, labels):
+    """Anteile der Zielorte außerhalb der USA je Monat als Flächendiagramm; `labels`: {Zielort: Name}."""
+    fig, ax = plt.subplots(figsize=(16, 8))
+    ax.stackplot(summary['month'].astype(str),
+                 *[summary[f'booked_{destination}_percent'] for destination in labels],
+                 labels=list(labels.values()),
+                 alpha=0.8)
+
+    ax.set(
+        title='Monatliche Buchungen nach Zielort (außer USA)',
+        xlabel='Monat',
+        ylabel='Anzahl der Buchungen'
+    )
+
+    ax.legend(loc='upper left')
+    ax.tick_params(axis='x', rotation=45, labelsize=10)
+    ax.grid(axis='y', linestyle='--', alpha=0.3)
+    fig.tight_layout()
+    return fig
+
+
+# NDF vs Buchungen (III, Abschnitt 2)
+
+def share_vs_conversion(summary, column_name, size=(16, 8), color_share='lightgrey', color_cv='gold',
+                        sortby=('user_share', False)):
+    """
+    Benutzeranteil und Conversion Rate (mit conversion_low/conversion_high
+    als Fehlerbalken) je Wert einer Spalte.
+    """
+    global_conversion = round(summary['booked_users'].sum() / summary['total_users'].sum() * 100, 2)
+    summary = summary.sort_values(by=sortby[0], ascending=sortby[1])
+
+    # Erstelle das Balkendiagramm
+    fig, ax = plt.subplots(figsize=size)
+
+    # Setze Achsenbeschriftungen
+    ax.set_xlabel(column_name, fontsize=12)
+    ax.set_ylabel('Anteil (%)', fontsize=12)
+    ax.set_ylim(0, 100)
+
+    # Zeichne die Balkendiagramme
+    ax.bar(summary[column_name], summary['user_share'], color=color_share, width=0.8, alpha=0.6,
+           label='Anteil der Benutzer')
+    conversion_error = [summary['conversion_rate'] - summary['conversion_low'],
+                        summary['conversion_high'] - summary['conversion_rate']]
+    bars = ax.bar(summary[column_name], summary['conversion_rate'], yerr=conversion_error, capsize=3,
+                  error_kw={'ecolor': 'dimgray', 'alpha': 0.6},
+                  color=color_cv, width=0.3, alpha=0.6, label='Conversion Rate (95%-Intervall)')
+    ax.axhline(y=global_conversion, color='tomato', linestyle='--', label='Durchschnittliche Conversion Rate')
+
+    # Füge Datenbeschriftungen hinzu
+    ax.bar_label(bars, fmt='%.2f%%', padding=3, fontsize=9, weight='bold', color='dimgray')
+
+    # Füge Legende und Formatierung hinzu
+    ax.grid(axis='y', linestyle='--', alpha=0.3)
+    ax.legend(loc='upper right')
+
+    fig.suptitle(f'Benutzeranteil und Conversion Rate nach {column_name}', fontsize=16)
+    fig.tight_layout()
+    return fig
+
+
+# Korrelationen (III, Abschnitt 3)
+
+def association_heatmaps(ct, normalized, lift, var1, var2, chi2, p):
+    """Absolute Häufigkeiten, Zeilenanteile und Affinitäten zweier Spalten untereinander."""
+    # seaborn nur für die Heatmaps von III laden (I und II kommen ohne aus)
+    import seaborn as sns
+    fig, ax = plt.subplots(3, 1, figsize=(20, 20))
+
+    # Absolute Werte
+    sns.heatmap(ct, fmt='d', annot=True, cmap='Blues', ax=ax[0], cbar_kws={'label': 'Häufigkeit'})
+    ax[0].set(
+        title=f'Absolute Häufigkeiten\n{var1} vs {var2}',
+        xlabel=var2,
+        ylabel=var1
+    )
+
+    # Normalisierte Werte (pro Zeile)
+    sns.heatmap(normalized, annot=True, fmt='.2%', cmap='YlOrRd', ax=ax[1], cbar_kws={'label': 'Prozent (%)'})
+    ax[1].set(
+        title=f'Normalisiert pro Zeile (%)\n{var1} vs {var2}',
+        xlabel=var2,
+        ylabel=var1
+    )
+
+    # Affinitäten (Zellen mit zu wenigen Benutzern sind NaN und bleiben leer)
+    sns.heatmap(lift, annot=True, fmt='.2f', cmap='RdBu_r', center=1.0, vmin=0.5, vmax=2.0, ax=ax[2],
+                cbar_kws={'label': 'Affinität'})
+    ax[2].set(
+        title=f'Affinitäten\n{var1} vs {var2}',
+        xlabel=var2,
+        ylabel=var1
+    )
+
+    fig.suptitle(f'Zusammenhangsanalyse: {var1} und {var2} | χ²={chi2:.1f}, p={p:.3f}',
+                 fontsize=14, y=1.02)
+    fig.tight_layout()
+    return fig
+
+
+def association_matrix(matrix, label="Cramér's V"):
+    """Symmetrische Matrix eines Zusammenhangsmaßes über alle Spalten."""
+    import seaborn as sns
+    fig, ax = plt.subplots(figsize=(14, 12))
+    sns.heatmap(matrix, annot=True, fmt='.2f', cmap='Blues', vmin=0, vmax=1, ax=ax, cbar_kws={'label': label})
+    ax.set(title=f'Zusammenhang aller kategorialen Spalten ({label})')
+    fig.tight_layout()
+    return fig
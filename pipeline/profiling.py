@@ -0,0 +1,218 @@
+"""
+Spaltenprofile in einem Durchlauf.
+
+Pro Spalte wird genau einmal faktorisiert (bei kategorialen Spalten
+werden direkt die Codes verwendet). Aus den Häufigkeiten der Werte
+ergeben sich alle weiteren Kennzahlen: Anzahl, fehlende Werte,
+Platzhalter wie '-unknown-', eindeutige Werte, Top-k sowie für
+numerische Spalten Min/Max/Mittelwert/Standardabweichung und Quantile.
+
+Profile lassen sich zusammenführen (z. B. über Stapel im
+Streaming-Modus) und als JSON speichern, sodass Berichte und die
+`*_unique_values_summary.txt`-Dateien ohne erneuten Datenzugriff
+erstellt werden können.
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+
+from pipeline.codes import category_codes
+
+UNKNOWN_VALUE = '-unknown-'
+
+
+def _factorized_counts(series):
+    """Häufigkeiten der vorhandenen Werte und Anzahl fehlender Werte."""
+    codes, values = category_codes(series)
+    valid = codes >= 0
+    counts = np.bincount(codes[valid], minlength=len(values))
+    present = counts > 0
+    counts = pd.Series(counts[present], index=pd.Index(values)[present], dtype='int64')
+    return counts, int(len(codes) - valid.sum())
+
+
+def _json_value(value):
+    if isinstance(value, (np.integer, np.floating, np.bool_)):
+        return value.item()
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    return str(value)
+
+
+class ColumnProfile:
+    """Kennzahlen einer Spalte, abgeleitet aus den Häufigkeiten ihrer Werte."""
+
+    def __init__(self, name, dtype, numeric, counts, missing):
+        self.name = name
+        self.dtype = dtype
+        self.numeric = numeric
+        self.counts = counts
+        self.missing = missing
+
+    @classmethod
+    def from_series(cls, series):
+        numeric = pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype)
+        counts, missing = _factorized_counts(series)
+        if numeric:
+            counts = counts.sort_index()
+        return cls(series.name, str(series.dtype), numeric, counts, missing)
+
+    def merge(self, other):
+        """Führt das Profil eines weiteren Stapels derselben Spalte hinzu."""
+        # Reihenfolge des ersten Auftretens beibehalten (wie bei einem einzigen Stapel),
+        # damit gleich häufige Werte in `value_counts` gleich sortiert sind
+        new_values = other.counts.index[~other.counts.index.isin(self.counts.index)]
+        index = self.counts.index.append(new_values)
+        counts = (self.counts.reindex(index, fill_value=0)
+                  + other.counts.reindex(index, fill_value=0)).astype('int64')
+        if self.numeric:
+            counts = counts.sort_index()
+        return ColumnProfile(self.name, self.dtype, self.numeric, counts, self.missing + other.missing)
+
+    # Zählungen
+
+    @property
+    def count(self):
+        """Anzahl nicht fehlender Werte."""
+        return int(self.counts.sum())
+
+    @property
+    def rows(self):
+        return self.count + self.missing
+
+    @property
+    def nunique(self):
+        return len(self.counts)
+
+    def sentinel_count(self, value=UNKNOWN_VALUE):
+        return int(self.counts.get(value, 0))
+
+    def value_counts(self, dropna=True):
+        """Häufigkeiten absteigend sortiert, wie `Series.value_counts`."""
+        counts = self.counts
+        if not dropna and self.missing > 0:
+            counts = pd.concat([counts, pd.Series([self.missing], index=[np.nan], dtype='int64')])
+        return counts.sort_values(ascending=False, kind='stable').rename_axis(self.name).rename('count')
+
+    def top(self, k=10, dropna=True):
+        return self.value_counts(dropna=dropna).head(k)
+
+    # Numerische Kennzahlen (aus den Häufigkeiten, exakt)
+
+    def _numeric_values(self):
+        return self.counts.index.to_numpy(dtype='float64'), self.counts.to_numpy(dtype='float64')
+
+    @property
+    def min(self):
+        return self.counts.index.min() if self.count > 0 else np.nan
+
+    @property
+    def max(self):
+        return self.counts.index.max() if self.count > 0 else np.nan
+
+    @property
+    def mean(self):
+        values, weights = self._numeric_values()
+        return float((values * weights).sum() / weights.sum()) if self.count > 0 else np.nan
+
+    @property
+    def std(self):
+        if self.count < 2:
+            return np.nan
+        values, weights = self._numeric_values()
+        m2 = (weights * (values - self.mean) ** 2).sum()
+        return float(np.sqrt(m2 / (weights.sum() - 1)))
+
+    def quantile(self, q):
+        """Quantil mit linearer Interpolation (wie `Series.quantile`)."""
+        if self.count == 0:
+            return np.nan
+        values, weights = self._numeric_values()
+        cumulative = np.cumsum(weights)
+        position = (self.count - 1) * q
+        lower = values[np.searchsorted(cumulative, np.floor(position), side='right')]
+        upper = values[np.searchsorted(cumulative, np.ceil(position), side='right')]
+        return float(lower + (position - np.floor(position)) * (upper - lower))
+
+    @property
+    def median(self):
+        return self.quantile(0.5)
+
+    def describe(self):
+        """Entspricht `Series.describe()` für numerische Spalten."""
+        return pd.Series(
+            [self.count, self.mean, self.std, self.min,
+             self.quantile(0.25), self.quantile(0.5), self.quantile(0.75), self.max],
+            index=['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max'],
+            name=self.name, dtype='float64'
+        )
+
+    # Serialisierung
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'dtype': self.dtype,
+            'numeric': self.numeric,
+            'missing': self.missing,
+            'values': [_json_value(v) for v in self.counts.index],
+            'counts': self.counts.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        counts = pd.Series(data['counts'], index=pd.Index(data['values'], dtype=object if not data['numeric'] else None),
+                           dtype='int64')
+        return cls(data['name'], data['dtype'], data['numeric'], counts, data['missing'])
+
+
+class DataProfile:
+    """Profile aller (ausgewählten) Spalten eines DataFrames."""
+
+    def __init__(self, rows=0, columns=None):
+        self.rows = rows
+        self.columns = columns if columns is not None else {}
+
+    @classmethod
+    def from_frame(cls, df, columns=None):
+        columns = list(df.columns) if columns is None else columns
+        return cls(len(df), {col: ColumnProfile.from_series(df[col]) for col in columns})
+
+    def add(self, df):
+        """Ergänzt das Profil um einen weiteren Stapel."""
+        return self.merge(DataProfile.from_frame(df, list(self.columns) or None))
+
+    def merge(self, other):
+        columns = dict(self.columns)
+        for col, profile in other.columns.items():
+            columns[col] = columns[col].merge(profile) if col in columns else profile
+        return DataProfile(self.rows + other.rows, columns)
+
+    def __getitem__(self, col):
+        return self.columns[col]
+
+    def __contains__(self, col):
+        return col in self.columns
+
+    def missing(self):
+        """Fehlende Werte pro Spalte (wie `df.isnull().sum()`)."""
+        return pd.Series({col: p.missing for col, p in self.columns.items()}, dtype='int64')
+
+    def to_dict(self):
+        return {'rows': self.rows, 'columns': [p.to_dict() for p in self.columns.values()]}
+
+    @classmethod
+    def from_dict(cls, data):
+        columns = {c['name']: ColumnProfile.from_dict(c) for c in data['columns']}
+        return cls(data['rows'], columns)
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
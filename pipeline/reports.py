@@ -0,0 +1,166 @@
+"""
+Textausgaben, die aus einem `DataProfile` oder aus `ReportStats`
+erstellt werden.
+
+Die Funktionen greifen nicht auf die Daten zu, sondern nur auf die
+vorab berechneten Häufigkeiten bzw. Kennzahlen. `ReportStats` hält die
+Kennzahlen eines Berichts serialisierbar fest (`<bericht>.stats.json`
+neben dem Bericht); die Vorlagen in `pipeline/templates.py` erzeugen
+daraus den Bericht, ohne die Daten erneut zu laden.
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+STATS_SUFFIX = '.stats.json'
+
+
+def _format_value(value):
+    return 'NaN' if pd.isna(value) else f"'{value}'"
+
+
+def render_unique_values_summary(profile, title, columns=None, top=None, numeric_columns=None):
+    """
+    Zusammenfassung der eindeutigen Werte pro Spalte
+    (Format der `*_unique_values_summary.txt`-Dateien).
+
+    top: nur die häufigsten Werte auflisten (None = alle).
+    numeric_columns: Spalten, für die Statistiken statt Werte ausgegeben
+        werden (None = alle numerischen Spalten des Profils).
+    """
+    columns = list(profile.columns) if columns is None else columns
+    if numeric_columns is None:
+        numeric_columns = [col for col, p in profile.columns.items() if p.numeric]
+    lines = [f"Zusammenfassung der eindeutigen Werte pro Spalte in {title}"]
+    lines.append("=" * 60)
+    lines.append("")
+
+    for column in columns:
+        if column not in profile:
+            continue
+        col_profile = profile[column]
+        total_count = col_profile.rows
+
+        if column in numeric_columns:
+            lines.append(f"Spalte: {column} (numerisch)")
+            lines.append(f"Anzahl eindeutiger Werte: {col_profile.nunique}")
+            lines.append("Statistiken:")
+            lines.append(str(col_profile.describe()))
+        else:
+            value_counts = col_profile.value_counts()
+            lines.append(f"Spalte: {column}")
+            lines.append(f"Anzahl eindeutiger Werte: {len(value_counts)}")
+            lines.append("Wert - Anzahl - Prozent")
+
+            listed = value_counts if top is None else value_counts.head(top)
+            for value, count in listed.items():
+                percentage = (count / total_count) * 100
+                lines.append(f"{_format_value(value)} - {count} - {percentage:.2f}%")
+
+            # Füge NaN-Zählung hinzu
+            nan_count = col_profile.missing
+            if nan_count > 0:
+                nan_percentage = (nan_count / total_count) * 100
+                lines.append(f"NaN - {nan_count} - {nan_percentage:.2f}%")
+
+        lines.append("")
+        lines.append("-" * 60)
+        lines.append("")
+
+    return '\n'.join(lines)
+
+
+def render_top_values(profile, column, top=10, header=None):
+    """Block mit eindeutigen Werten, fehlenden Werten und den häufigsten Werten einer Spalte."""
+    col_profile = profile[column]
+    total_count = col_profile.rows
+    lines = [header if header is not None else f"=== {column} ==="]
+    lines.append(f"Eindeutige Werte: {col_profile.nunique}")
+    lines.append(f"Fehlende Werte: {col_profile.missing:,}")
+    lines.append("")
+    lines.append(f"Top {top} häufigste Werte:")
+    for value, count in col_profile.top(top).items():
+        pct = count / total_count * 100
+        lines.append(f"{_format_value(value)} - {count:,} - {pct:.2f}%")
+    return '\n'.join(lines)
+
+
+# Kennzahlen für Berichte
+
+def stats_path(report_path):
+    """Pfad der Kennzahlen zu einem Bericht (`bericht.md` → `bericht.stats.json`)."""
+    return os.path.splitext(report_path)[0] + STATS_SUFFIX
+
+
+def report_path(stats_file, extension='.md'):
+    """Pfad des Berichts zu einer Kennzahlendatei (Umkehrung von `stats_path`)."""
+    return stats_file[:-len(STATS_SUFFIX)] + extension
+
+
+def text_value(value):
+    """Wert als Text wie bei `str(row[col])`; fehlende Werte bleiben None."""
+    return None if value is None or (np.ndim(value) == 0 and pd.isna(value)) else str(value)
+
+
+def value_count_list(counts):
+    """Häufigkeiten (Series) als Liste von [Wert, Anzahl]; fehlende Werte als None."""
+    return [[text_value(value), int(count)] for value, count in counts.items()]
+
+
+def records(df, columns=None):
+    """
+    Beispielzeilen als Liste von dicts mit Textwerten (wie `str(row[col])`
+    bei `iterrows`), spaltenweise umgewandelt.
+    """
+    if columns is not None:
+        df = df[columns]
+    values = [[str(value) for value in df[col].tolist()] for col in df.columns]
+    return [dict(zip(df.columns, row)) for row in zip(*values)]
+
+
+def _json_default(value):
+    if isinstance(value, (np.integer, np.floating, np.bool_)):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    return str(value)
+
+
+class ReportStats:
+    """Serialisierbare Kennzahlen eines Berichts; `kind` wählt die Vorlage."""
+
+    def __init__(self, kind, values=None):
+        self.kind = kind
+        self.values = values if values is not None else {}
+
+    def __getitem__(self, key):
+        return self.values[key]
+
+    def __setitem__(self, key, value):
+        self.values[key] = value
+
+    def to_dict(self):
+        return {'kind': self.kind, 'values': self.values}
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), ensure_ascii=False, default=_json_default)
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['kind'], data['values'])
+
+    def normalized(self):
+        """Kopie mit denselben (JSON-)Typen wie nach `save` und `load`."""
+        return ReportStats.from_dict(json.loads(self.to_json()))
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(self.to_json())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
@@ -0,0 +1,228 @@
+"""
+Prüfregeln für user.csv in einem Durchlauf.
+
+Jede Regel liefert eine boolesche Maske über alle Zeilen. `evaluate`
+wertet alle Regeln nacheinander auf denselben NumPy-Arrays aus (jede
+Spalte wird nur einmal aus dem DataFrame gelesen und umgewandelt) und
+hält das Ergebnis als Bitmaske pro Zeile fest (Bit i = Regel i verletzt).
+Dabei werden keine Zeilen entfernt; `RuleResult.apply` erzeugt den
+gefilterten DataFrame einmalig am Ende.
+
+Regeln sind in Schritte gruppiert (Duplikate, Datumsreihenfolge,
+Geschlecht, Alter, Buchung ↔ Ziel). Regeln mit `drop=True` entfernen
+ihre Zeilen, die übrigen dienen der Information. Zählungen und Beispiele
+folgen der Reihenfolge der Schritte: Eine Regel zählt nur Zeilen, die
+kein früherer Schritt entfernt – wie beim schrittweisen Filtern.
+"""
+
+import numpy as np
+import pandas as pd
+
+from pipeline import config, runlog
+from pipeline.dates import to_days
+
+GENDER_VALUES = ['female', 'male', 'other']
+NO_DESTINATION = 'NDF'
+
+
+class Rule:
+    """Eine Prüfung: Name, Schritt, Beschreibung, Prüffunktion und ob betroffene Zeilen entfernt werden."""
+
+    def __init__(self, name, step, description, check, drop=True):
+        self.name = name
+        self.step = step
+        self.description = description
+        self.check = check
+        self.drop = drop
+
+
+class Columns:
+    """Spaltenzugriff für die Prüffunktionen; jede Spalte wird nur einmal umgewandelt."""
+
+    def __init__(self, df):
+        self.frame = df
+        self._cache = {}
+
+    def _get(self, kind, column, convert):
+        key = (kind, column)
+        if key not in self._cache:
+            self._cache[key] = convert(self.frame[column])
+        return self._cache[key]
+
+    def number(self, column):
+        """Zahlen als float64; fehlend = NaN (Vergleiche ergeben False)."""
+        return self._get('number', column, lambda s: s.to_numpy(dtype='float64', na_value=np.nan))
+
+    def date(self, column):
+        """Datum ohne Uhrzeit als datetime64[D]; fehlend = NaT (Vergleiche ergeben False)."""
+        return self._get('date', column, to_days)
+
+    def isna(self, column):
+        return self._get('isna', column, lambda s: s.isna().to_numpy())
+
+    def isin(self, column, values, transform=None):
+        """
+        Zeilen, deren Wert (ggf. nach `transform`, z. B. `lambda v: v.str.lower()`)
+        in `values` liegt; fehlende Werte ergeben False. Bei kategorialen
+        Spalten wird nur über die Kategorien gerechnet.
+        """
+        series = self.frame[column]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            categories = series.cat.categories
+            if transform is not None:
+                categories = pd.Index(transform(categories))
+            matches = np.asarray(categories.isin(values))
+            codes = series.cat.codes.to_numpy()
+            return (codes >= 0) & matches[codes]
+        if transform is not None:
+            series = transform(series)
+        return (series.isin(values) & series.notna()).to_numpy()
+
+
+def normalize_gender(series, invalid_to_nan=False):
+    """
+    user_gender in Kleinschreibung; mit invalid_to_nan werden Werte
+    außerhalb von GENDER_VALUES (z. B. '-unknown-') zu NaN.
+
+    Kategoriale Spalten bleiben kategorial: umbenannt werden nur die
+    Kategorien; fallen dabei mehrere zusammen (z. B. 'MALE' und 'male'),
+    werden ihre Codes auf eine Kategorie zusammengeführt.
+    """
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        series = series.str.lower()
+        if invalid_to_nan:
+            series = series.where(series.isin(GENDER_VALUES))
+        return series
+    lower = pd.Index(series.cat.categories.str.lower())
+    categories = lower.unique()
+    if invalid_to_nan:
+        categories = categories[categories.isin(GENDER_VALUES)]
+    if categories.equals(lower):
+        return series.cat.rename_categories(categories)
+    mapping = categories.get_indexer(lower)
+    codes = series.cat.codes.to_numpy()
+    codes = np.where(codes >= 0, mapping[np.maximum(codes, 0)], -1)
+    return pd.Series(pd.Categorical.from_codes(codes, categories=categories), index=series.index, name=series.name)
+
+
+USER_RULES = [
+    Rule('duplicate', 'duplicates', 'Doppelte Zeile',
+         lambda c: c.frame.duplicated().to_numpy()),
+    Rule('active_after_created', 'date_order', 'first_active_date > account_created_date',
+         lambda c: c.date('first_active_timestamp') > c.date('account_created_date')),
+    Rule('created_after_booking', 'date_order', 'account_created_date > first_booking_date',
+         lambda c: c.date('account_created_date') > c.date('first_booking_date')),
+    Rule('active_after_booking', 'date_order', 'first_active_date > first_booking_date',
+         lambda c: c.date('first_active_timestamp') > c.date('first_booking_date'), drop=False),
+    Rule('gender_invalid', 'gender', f"user_gender nicht in {', '.join(GENDER_VALUES)}",
+         lambda c: ~c.isin('user_gender', GENDER_VALUES, lambda v: v.str.lower()) & ~c.isna('user_gender'),
+         drop=False),
+    Rule('age_too_young', 'age', f'user_age < {config.AGE_MIN}',
+         lambda c: c.number('user_age') < config.AGE_MIN),
+    Rule('age_too_old', 'age', f'user_age > {config.AGE_MAX}',
+         lambda c: c.number('user_age') > config.AGE_MAX),
+    Rule('no_booking_but_destination', 'booking_destination',
+         f"Keine Buchung, aber destination_country != '{NO_DESTINATION}'",
+         lambda c: c.isna('first_booking_date') & ~c.isin('destination_country', [NO_DESTINATION]),
+         drop=False),
+    Rule('booking_but_ndf', 'booking_destination',
+         f"Buchung vorhanden, aber destination_country = '{NO_DESTINATION}'",
+         lambda c: ~c.isna('first_booking_date') & c.isin('destination_country', [NO_DESTINATION]),
+         drop=False),
+]
+
+
+class RuleResult:
+    """Bitmaske der verletzten Regeln pro Zeile mit Auswertungen."""
+
+    def __init__(self, rules, reasons):
+        self.rules = list(rules)
+        self.reasons = reasons
+        self.steps = list(dict.fromkeys(rule.step for rule in self.rules))
+
+    def _positions(self, names):
+        """Indizes der Regeln zu Regel- oder Schrittnamen."""
+        positions = []
+        for name in names:
+            matches = [i for i, rule in enumerate(self.rules) if name in (rule.name, rule.step)]
+            if not matches:
+                raise KeyError(f"Unbekannte Regel oder unbekannter Schritt: {name}")
+            positions.extend(matches)
+        return positions
+
+    def _bits(self, positions):
+        bits = np.uint64(0)
+        for i in positions:
+            bits |= np.uint64(1) << np.uint64(i)
+        return bits
+
+    def keep_mask(self, through=None):
+        """Zeilen, die nach den entfernenden Regeln bis einschließlich Schritt `through` (None = alle) verbleiben."""
+        last = len(self.steps) - 1 if through is None else self.steps.index(through)
+        bits = self._bits(i for i, rule in enumerate(self.rules)
+                          if rule.drop and self.steps.index(rule.step) <= last)
+        return (self.reasons & bits) == 0
+
+    def mask(self, *names, sequential=True):
+        """
+        Zeilen, die mindestens eine der Regeln (bzw. Regeln der Schritte) verletzen.
+        sequential: nur Zeilen, die kein früherer Schritt entfernt.
+        """
+        positions = self._positions(names)
+        mask = (self.reasons & self._bits(positions)) != 0
+        first_step = min(self.steps.index(self.rules[i].step) for i in positions)
+        if sequential and first_step > 0:
+            mask &= self.keep_mask(through=self.steps[first_step - 1])
+        return mask
+
+    def count(self, *names, sequential=True):
+        return int(self.mask(*names, sequential=sequential).sum())
+
+    def examples(self, df, *names, columns=None, n=5, sequential=True):
+        """
+        Die ersten `n` betroffenen Zeilen aus `df`. `df` ist der geprüfte
+        DataFrame oder das Ergebnis von `apply`.
+        """
+        mask = self.mask(*names, sequential=sequential)
+        if len(df) != len(mask):
+            keep = self.keep_mask()
+            if len(df) != keep.sum():
+                raise ValueError('DataFrame passt nicht zum Prüfergebnis')
+            mask = mask[keep]
+        rows = df.iloc[np.flatnonzero(mask)[:n]]
+        return rows if columns is None else rows[columns]
+
+    def apply(self, df):
+        """Entfernt alle Zeilen mit verletzten `drop`-Regeln (eine einzige Kopie)."""
+        if len(df) != len(self.reasons):
+            raise ValueError('DataFrame passt nicht zum Prüfergebnis')
+        with runlog.step('rules.apply', rows_in=len(df)) as step:
+            df = df[self.keep_mask()]
+            step.rows_out = len(df)
+        return df
+
+    def summary(self, sequential=True):
+        """Tabelle aller Regeln mit Schritt, Beschreibung, Aktion und Anzahl."""
+        return pd.DataFrame({
+            'Regel': [rule.name for rule in self.rules],
+            'Schritt': [rule.step for rule in self.rules],
+            'Beschreibung': [rule.description for rule in self.rules],
+            'Aktion': ['entfernen' if rule.drop else 'melden' for rule in self.rules],
+            'Anzahl': [self.count(rule.name, sequential=sequential) for rule in self.rules],
+        })
+
+
+def evaluate(df, rules=None):
+    """Wertet alle Regeln (Standard: USER_RULES) in einem Durchlauf über `df` aus."""
+    rules = USER_RULES if rules is None else list(rules)
+    if len(rules) > 64:
+        raise ValueError('Höchstens 64 Regeln pro Auswertung')
+    columns = Columns(df)
+    reasons = np.zeros(len(df), dtype=np.uint64)
+    for bit, rule in enumerate(rules):
+        # rows_out: Zeilen ohne Verletzung dieser Regel
+        with runlog.step(f'rules.{rule.name}', rows_in=len(df)) as step:
+            mask = np.asarray(rule.check(columns), dtype=bool)
+            reasons |= mask.astype(np.uint64) << np.uint64(bit)
+            step.rows_out = len(df) - int(mask.sum())
+    return RuleResult(rules, reasons)
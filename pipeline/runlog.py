@@ -0,0 +1,300 @@
+"""
+Laufprotokoll: Messwerte jedes Verarbeitungsschritts als JSON-Lines.
+
+Die Module der Pipeline fassen jeden logischen Schritt (Laden,
+Duplikate, Datumsdekodierung, jede Prüfregel, Aggregationen, Export) in
+`with runlog.step(name, rows_in=…) as s:` bzw. den Dekorator `measured`
+ein. Pro Schritt wird eine Zeile an das Laufprotokoll
+`scripts/outputs/run_log.jsonl` angehängt:
+
+- run, stage: Kennung des Prozesses (Startzeit und PID) und ausgeführtes Skript,
+- step, parent: Name des Schritts und des umschließenden Schritts,
+- seconds, cpu_seconds: Laufzeit (Wanduhr) und CPU-Zeit des Prozesses
+  (ohne Arbeitsprozesse eines Prozesspools),
+- rss_mb, peak_rss_mb: belegter Speicher nach dem Schritt und Spitzenwert
+  des Prozesses bis zum Ende des Schritts (wie in pipeline/bench.py),
+- rows_in, rows_out: Zeilen vor und nach dem Schritt (sofern bekannt),
+- bytes_read, bytes_written: vom Prozess während des Schritts gelesene
+  und geschriebene Bytes (`rchar`/`wchar` aus /proc/self/io, nur Linux),
+- details: weitere Angaben des Schritts (z. B. Backend), status: 'ok' oder 'error'.
+
+Jede Zeile wird sofort geschrieben; auch abgebrochene Läufe bleiben im
+Protokoll. Geschrieben wird nur, wenn der Prozess das Protokoll mit
+`enable()` einschaltet: die Stufenskripte I, II, III und der Einstieg
+`python -m pipeline`. Beim Import der Module als Bibliothek (z. B.
+`load_users` oder `ConversionCube.from_frame` in eigenem Code) entsteht
+keine Datei. Die Umgebungsvariable `PIPELINE_RUN_LOG` hat Vorrang: ein
+Pfad schaltet das Protokoll (auch ohne `enable()`) dorthin ein, ein
+leerer Wert schaltet es ab.
+
+`read_runs`, `compare` und `render_markdown` fassen das Protokoll
+zusammen (scripts/summarize_run_log.py): letzter Lauf je Skript mit
+Veränderungen gegenüber dem vorherigen. Der Vergleich einzelner
+Messungen (`regressed_metrics`, Schwellenwerte) wird auch von
+pipeline/bench.py verwendet.
+"""
+
+import functools
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+RUN_LOG_PATH = os.path.join('scripts', 'outputs', 'run_log.jsonl')
+ENV_VARIABLE = 'PIPELINE_RUN_LOG'
+
+# Relative Veränderung, ab der ein Messwert als Verschlechterung gilt
+REGRESSION_THRESHOLD = 0.2
+# Messungen unterhalb dieser Laufzeit werden beim Zeitvergleich ignoriert (Messrauschen)
+MIN_SECONDS = 0.5
+TIME_METRICS = ('seconds', 'cpu_seconds')
+COMPARED_METRICS = ('seconds', 'cpu_seconds', 'peak_rss_mb')
+
+_run_id = None
+_enabled = False
+# Geöffnete Schritte (innerster zuletzt)
+_open_steps = []
+
+
+def memory_mb():
+    """(aktueller RSS, Spitzen-RSS) des eigenen Prozesses in MB, sofern ermittelbar."""
+    current = peak = None
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        peak /= 1024 ** 2 if sys.platform == 'darwin' else 1024
+    try:
+        with open('/proc/self/statm') as f:
+            current = int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024 ** 2
+    except (OSError, ValueError, AttributeError):
+        pass
+    return current, peak
+
+
+def io_bytes():
+    """(gelesene, geschriebene) Bytes des eigenen Prozesses bisher, sofern ermittelbar."""
+    try:
+        with open('/proc/self/io') as f:
+            counters = dict(line.split(':', 1) for line in f if ':' in line)
+        return int(counters['rchar']), int(counters['wchar'])
+    except (OSError, KeyError, ValueError):
+        return None, None
+
+
+def enable():
+    """Schaltet das Protokoll für diesen Prozess ein (Stufenskripte und `python -m pipeline`)."""
+    global _enabled
+    _enabled = True
+
+
+def log_path():
+    """Pfad des Laufprotokolls; None, wenn es abgeschaltet ist."""
+    path = os.environ.get(ENV_VARIABLE)
+    if path is not None:
+        return path or None
+    return RUN_LOG_PATH if _enabled else None
+
+
+def run_id():
+    global _run_id
+    if _run_id is None:
+        _run_id = f'{datetime.now():%Y%m%dT%H%M%S}-{os.getpid()}'
+    return _run_id
+
+
+def stage_name():
+    """Name des ausgeführten Skripts (ohne Endung); 'interaktiv' in Jupyter bzw. ohne Skript."""
+    script = sys.argv[0] if sys.argv else ''
+    if 'ipykernel' in sys.modules or script in ('', '-c'):
+        return 'interaktiv'
+    return os.path.splitext(os.path.basename(script))[0]
+
+
+class Step:
+    """Messung eines Schritts; `rows_out` (bei Bedarf auch `rows_in`) setzt der Aufrufer im Block."""
+
+    def __init__(self, name, rows_in=None, **details):
+        self.name = name
+        self.rows_in = rows_in
+        self.rows_out = None
+        self.details = details
+
+    def __enter__(self):
+        self.parent = _open_steps[-1].name if _open_steps else None
+        _open_steps.append(self)
+        self._started = datetime.now()
+        self._io = io_bytes()
+        self._wall, self._cpu = time.perf_counter(), time.process_time()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        seconds = time.perf_counter() - self._wall
+        cpu_seconds = time.process_time() - self._cpu
+        read, written = io_bytes()
+        rss, peak = memory_mb()
+        _open_steps.remove(self)
+        _append({
+            'run': run_id(),
+            'stage': stage_name(),
+            'step': self.name,
+            'parent': self.parent,
+            'started': self._started.isoformat(timespec='milliseconds'),
+            'seconds': round(seconds, 6),
+            'cpu_seconds': round(cpu_seconds, 6),
+            'rss_mb': None if rss is None else round(rss, 1),
+            'peak_rss_mb': None if peak is None else round(peak, 1),
+            'rows_in': _int(self.rows_in),
+            'rows_out': _int(self.rows_out),
+            'bytes_read': None if read is None else read - self._io[0],
+            'bytes_written': None if written is None else written - self._io[1],
+            'details': self.details or None,
+            'status': 'ok' if exc_type is None else 'error',
+        })
+        return False
+
+
+def step(name, rows_in=None, **details):
+    """Misst den Block als Schritt `name`: `with step('dedup', rows_in=len(df)) as s: …; s.rows_out = …`."""
+    return Step(name, rows_in, **details)
+
+
+def measured(name, rows_in=None, rows_out=None):
+    """
+    Dekorator: misst jeden Aufruf als Schritt `name`. `rows_in(*args, **kwargs)`
+    und `rows_out(ergebnis)` liefern die Zeilenzahlen (optional).
+    """
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with step(name, rows_in=rows_in(*args, **kwargs) if rows_in else None) as s:
+                result = func(*args, **kwargs)
+                if rows_out is not None:
+                    s.rows_out = rows_out(result)
+            return result
+        return wrapper
+    return decorate
+
+
+def _int(value):
+    return None if value is None else int(value)
+
+
+def _append(record):
+    path = log_path()
+    if path is None:
+        return
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+
+# Auswertung
+
+def read_runs(path=None):
+    """Läufe des Protokolls in zeitlicher Reihenfolge: Liste von dicts (run, stage, started, steps)."""
+    path = path or log_path() or RUN_LOG_PATH
+    runs = {}
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            run = runs.setdefault((record['run'], record['stage']), {
+                'run': record['run'], 'stage': record['stage'], 'started': record['started'], 'steps': []})
+            run['started'] = min(run['started'], record['started'])
+            run['steps'].append(record)
+    return sorted(runs.values(), key=lambda run: run['started'])
+
+
+def latest_runs(runs, stage=None):
+    """Je Skript (oder nur `stage`) der letzte Lauf und der Lauf davor (oder None): {stage: (letzter, vorheriger)}."""
+    by_stage = {}
+    for run in runs:
+        if stage is None or run['stage'] == stage:
+            by_stage.setdefault(run['stage'], []).append(run)
+    return {name: (history[-1], history[-2] if len(history) > 1 else None) for name, history in by_stage.items()}
+
+
+def _keyed(steps):
+    """Schritte nach (Name, Vorkommen), damit wiederholte Schritte paarweise verglichen werden."""
+    seen = {}
+    keyed = {}
+    for record in steps:
+        occurrence = seen[record['step']] = seen.get(record['step'], 0) + 1
+        keyed[(record['step'], occurrence)] = record
+    return keyed
+
+
+def regressed_metrics(old, new, metrics=COMPARED_METRICS, threshold=REGRESSION_THRESHOLD, min_seconds=MIN_SECONDS):
+    """
+    Vergleicht zwei Messungen (dicts, auch aus pipeline/bench.py). Rückgabe:
+    Liste (Messgröße, alt, neu) der Messgrößen, die um mehr als `threshold` gestiegen sind.
+    """
+    regressions = []
+    for metric in metrics:
+        if old.get(metric) is None or new.get(metric) is None:
+            continue
+        if metric in TIME_METRICS and max(old[metric], new[metric]) < min_seconds:
+            continue
+        if new[metric] > old[metric] * (1 + threshold):
+            regressions.append((metric, old[metric], new[metric]))
+    return regressions
+
+
+def format_change(old, new):
+    """Relative Veränderung als Text ('+35%'); 'neu', wenn der alte Wert 0 ist."""
+    return 'neu' if old == 0 else f'{new / old - 1:+.0%}'
+
+
+def compare(current, previous, threshold=REGRESSION_THRESHOLD, min_seconds=MIN_SECONDS):
+    """
+    Vergleicht zwei Läufe desselben Skripts Schritt für Schritt. Rückgabe:
+    Liste der Verschlechterungen (Schritt, Messgröße, alt, neu, Zeilen alt, Zeilen neu).
+    """
+    regressions = []
+    old_steps = _keyed(previous['steps'])
+    for key, new in _keyed(current['steps']).items():
+        old = old_steps.get(key)
+        if old is None:
+            continue
+        for metric, old_value, new_value in regressed_metrics(old, new, threshold=threshold, min_seconds=min_seconds):
+            regressions.append((new['step'], metric, old_value, new_value, old.get('rows_in'), new.get('rows_in')))
+    return regressions
+
+
+def render_markdown(run, previous=None):
+    """Markdown-Tabelle eines Laufs; mit `previous` zusätzlich die Laufzeit des vorherigen Laufs."""
+    old_steps = _keyed(previous['steps']) if previous is not None else {}
+    lines = [f"## {run['stage']} (Lauf {run['run']})", '',
+             '| Schritt | Zeit (s) | vorher (s) | CPU (s) | Spitze (MB) | Zeilen ein | Zeilen aus '
+             '| gelesen (MB) | geschrieben (MB) |',
+             '|---|---:|---:|---:|---:|---:|---:|---:|---:|']
+    for key, record in _keyed(run['steps']).items():
+        old = old_steps.get(key)
+        name = record['step'] if record['parent'] is None else f"↳ {record['step']}"
+        if record['status'] != 'ok':
+            name += ' (Fehler)'
+        lines.append(f"| {name} | {record['seconds']:.2f} | "
+                     f"{_format(old['seconds'] if old else None, '.2f')} | {record['cpu_seconds']:.2f} | "
+                     f"{_format(record['peak_rss_mb'], ',.0f')} | {_format(record['rows_in'], ',')} | "
+                     f"{_format(record['rows_out'], ',')} | {_format_mb(record['bytes_read'])} | "
+                     f"{_format_mb(record['bytes_written'])} |")
+    top_level = [record for record in run['steps'] if record['parent'] is None]
+    lines.append(f"| **gesamt** | {sum(r['seconds'] for r in top_level):.2f} | | "
+                 f"{sum(r['cpu_seconds'] for r in top_level):.2f} | | | | | |")
+    return '\n'.join(lines)
+
+
+def _format(value, spec):
+    return '–' if value is None else format(value, spec)
+
+
+def _format_mb(value):
+    return '–' if value is None else f'{value / 1024 ** 2:,.1f}'
@@ -0,0 +1,109 @@
+"""
+Aufteilung der Clickstreams in Sitzungen.
+
+`time_passed_in_seconds` ist die Zeit seit der vorherigen Aktion
+desselben Benutzers. Eine neue Sitzung beginnt mit der ersten Aktion
+eines Benutzers und mit jeder Aktion, vor der mehr als
+`SESSION_GAP_SECONDS` vergangen sind.
+
+Die Zuordnung erfolgt ohne Schleife über die Benutzer: Die Zeilen werden
+stabil nach Benutzer sortiert (bzw. bleiben unverändert, wenn sie bereits
+gruppiert vorliegen), die Sitzungsgrenzen als boolesches Array markiert
+und per kumulativer Summe durchnummeriert. Alle Kennzahlen der
+Sitzungstabelle ergeben sich anschließend über die Grenzindizes
+(`np.add.reduceat`, Indexzugriff auf erste/letzte Zeile).
+"""
+
+import numpy as np
+import pandas as pd
+
+from pipeline import runlog
+from pipeline.clickstreams import USER_ID_COLUMN, TIME_COLUMN
+from pipeline.codes import category_codes
+from pipeline.config import SESSION_GAP_SECONDS
+
+ACTION_COLUMN = 'session_action'
+DEVICE_COLUMN = 'session_device_type'
+
+SESSIONS_PATH = 'data/clickstreams_sessions.parquet'
+
+
+def _event_order(user_codes):
+    """Zeilenreihenfolge gruppiert nach Benutzer (Reihenfolge innerhalb eines Benutzers bleibt erhalten)."""
+    if len(user_codes) == 0 or np.all(user_codes[1:] >= user_codes[:-1]):
+        return np.arange(len(user_codes))
+    return np.argsort(user_codes, kind='stable')
+
+
+def session_boundaries(user_codes, times, gap_seconds=SESSION_GAP_SECONDS):
+    """
+    Markiert den Beginn jeder Sitzung in bereits nach Benutzer gruppierten Arrays.
+
+    Fehlende Zeiten (NaN) beginnen keine neue Sitzung.
+    """
+    user_start = np.ones(len(user_codes), dtype=bool)
+    user_start[1:] = user_codes[1:] != user_codes[:-1]
+    return user_start | (times > gap_seconds), user_start
+
+
+def assign_sessions(df, gap_seconds=SESSION_GAP_SECONDS):
+    """
+    Fortlaufende Sitzungsnummer pro Zeile von `df` (int64, ausgerichtet
+    auf die Zeilen von `df`). Zeilen ohne Benutzer erhalten -1.
+    """
+    user_codes, _ = category_codes(df[USER_ID_COLUMN])
+    valid = np.flatnonzero(user_codes >= 0)
+    order = valid[_event_order(user_codes[valid])]
+    times = df[TIME_COLUMN].to_numpy(dtype='float64', na_value=np.nan)[order]
+
+    boundary, _ = session_boundaries(user_codes[order], times, gap_seconds)
+    session_ids = np.full(len(df), -1, dtype=np.int64)
+    session_ids[order] = np.cumsum(boundary) - 1
+    return session_ids
+
+
+@runlog.measured('sessions.build', rows_in=lambda df, *args, **kwargs: len(df), rows_out=len)
+def build_sessions(df, gap_seconds=SESSION_GAP_SECONDS):
+    """
+    Sitzungstabelle mit einer Zeile pro Sitzung:
+
+    session_user_id, session_index (0, 1, … pro Benutzer), event_count,
+    duration_seconds (Summe der Pausen innerhalb der Sitzung),
+    first_action, last_action und device (Gerät der ersten Aktion).
+    Zeilen ohne Benutzer werden ignoriert.
+    """
+    user_codes, users = category_codes(df[USER_ID_COLUMN])
+    valid = np.flatnonzero(user_codes >= 0)
+    order = valid[_event_order(user_codes[valid])]
+    user_codes = user_codes[order]
+    times = df[TIME_COLUMN].to_numpy(dtype='float64', na_value=np.nan)[order]
+
+    boundary, user_start = session_boundaries(user_codes, times, gap_seconds)
+    starts = np.flatnonzero(boundary)
+    ends = np.empty_like(starts)
+    ends[:-1] = starts[1:] - 1
+    if len(ends) > 0:
+        ends[-1] = len(order) - 1
+
+    # Laufende Nummer innerhalb des Benutzers: Abstand zur ersten Sitzung des Benutzers
+    session_numbers = np.arange(len(starts))
+    first_of_user = np.maximum.accumulate(np.where(user_start[starts], session_numbers, 0))
+    session_index = session_numbers - first_of_user
+
+    # Die Pause vor der ersten Aktion gehört nicht zur Sitzung
+    gaps = np.where(boundary, 0.0, np.nan_to_num(times, nan=0.0))
+    duration = np.add.reduceat(gaps, starts) if len(starts) > 0 else np.empty(0)
+
+    sessions = pd.DataFrame({
+        USER_ID_COLUMN: pd.Categorical.from_codes(user_codes[starts], categories=users).remove_unused_categories(),
+        'session_index': session_index.astype(np.int32),
+        'event_count': (ends - starts + 1).astype(np.int32),
+        'duration_seconds': duration,
+    })
+    for name, column, positions in [('first_action', ACTION_COLUMN, starts),
+                                    ('last_action', ACTION_COLUMN, ends),
+                                    ('device', DEVICE_COLUMN, starts)]:
+        if column in df.columns:
+            codes, categories = category_codes(df[column])
+            sessions[name] = pd.Categorical.from_codes(codes[order][positions], categories=categories)
+    return sessions
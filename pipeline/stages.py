@@ -0,0 +1,254 @@
+"""
+Stufen-Cache für die Pipeline I → II → III.
+
+Jede Stufe (Notebook-Skript) erhält einen Schlüssel aus
+- den Hashes ihrer Eingabedateien,
+- den Hashes ihres Codes (Skript und alle importierten Module aus
+  `pipeline/`, rekursiv ermittelt),
+- den Werten ihrer Parameter aus `pipeline.config`.
+
+Nach einem Lauf werden Schlüssel und Hashes der Ausgabedateien in
+`data/.cache/stages/<stufe>.json` festgehalten. Stimmen beim nächsten
+Aufruf Schlüssel und Ausgaben überein, wird die Stufe übersprungen.
+Da Ausgaben einer Stufe Eingaben der nächsten sind, ändert sich der
+Schlüssel nachgelagerter Stufen automatisch, sobald sich eine Ausgabe
+inhaltlich ändert; bleibt sie gleich, bleiben auch die nachgelagerten
+Stufen gültig.
+
+`pipeline/config.py` zählt nicht zum Code einer Stufe; geänderte
+Parameter machen nur die Stufen ungültig, die den Parameter verwenden.
+Ebenso ausgenommen sind Module für Darstellung und Messung (Abbildungen,
+Berichtsvorlagen, Laufprotokoll), die keine Ausgabe einer Stufe
+bestimmen: Eine geänderte Abbildung erzwingt keine neue Bereinigung.
+Die Abbildungen haben eigene Schlüssel (pipeline/figures.py).
+"""
+
+import ast
+import json
+import os
+import subprocess
+import sys
+import time
+
+from pipeline import config
+from pipeline.hashing import file_hash, path_hash, value_hash
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MANIFEST_DIR = os.path.join('data', '.cache', 'stages')
+
+# Module, die nicht zum Code-Hash einer Stufe gehören: Parameter sowie
+# Darstellung und Messung (ändern keine Ausgabedatei einer Stufe)
+_EXCLUDED_MODULES = {'pipeline.config', 'pipeline.plots', 'pipeline.figures', 'pipeline.nullity',
+                     'pipeline.runlog', 'pipeline.templates'}
+
+
+class Stage:
+    """Eine Stufe der Pipeline: Skript, Eingaben, Ausgaben und Parameter."""
+
+    def __init__(self, name, script, inputs=(), outputs=(), params=()):
+        self.name = name
+        self.script = script
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.params = list(params)
+
+    def code_files(self):
+        """Skript und alle (rekursiv) importierten Module aus `pipeline/`."""
+        files = [self.script]
+        seen = set()
+        pending = [self.script]
+        while pending:
+            for module in _pipeline_imports(_path(pending.pop())):
+                if module in seen or module in _EXCLUDED_MODULES:
+                    continue
+                seen.add(module)
+                module_file = _module_file(module)
+                if module_file is not None:
+                    files.append(module_file)
+                    pending.append(module_file)
+        return files
+
+    def param_values(self):
+        return {name: getattr(config, name) for name in self.params}
+
+    def key(self):
+        """Schlüssel aus Eingaben, Code und Parametern."""
+        for path in self.inputs:
+            if not os.path.exists(_path(path)):
+                raise FileNotFoundError(f"Eingabe der Stufe '{self.name}' fehlt: {path}")
+        return value_hash({
+            'stage': self.name,
+            'inputs': {path: path_hash(_path(path)) for path in self.inputs},
+            'code': {path: file_hash(_path(path)) for path in self.code_files()},
+            'params': self.param_values(),
+        })
+
+
+STAGES = [
+    Stage(
+        'users', 'I-filter_user_data.py',
+        inputs=['data/user.csv'],
+        outputs=['data/user_filtered.parquet',
+                 'scripts/outputs/df_user_filtered_unique_values_summary.txt'],
+        params=['AGE_MIN', 'AGE_MAX', 'RARE_BROWSER_THRESHOLD', 'RARE_PROVIDER_THRESHOLD'],
+    ),
+    Stage(
+        'clickstreams', 'II-filter_clickstreams_data.py',
+        inputs=['data/clickstreams.parquet'],
+        outputs=['data/clickstreams_filtered.parquet',
+                 'data/clickstreams_sessions.parquet',
+                 'scripts/outputs/clickstreams_unique_values_summary.txt',
+                 'scripts/outputs/clickstreams_duplicates_unique_values_summary.txt',
+                 'scripts/outputs/clickstreams_zero_time_unique_values_summary.txt'],
+        params=['SESSION_GAP_SECONDS'],
+    ),
+    Stage(
+        'features', 'scripts/build_user_features.py',
+        inputs=['data/user_filtered.parquet', 'data/clickstreams_filtered.parquet'],
+        outputs=['data/user_features.npz'],
+    ),
+    Stage(
+        'events', 'scripts/build_event_index.py',
+        inputs=['data/clickstreams_filtered.parquet'],
+        outputs=['data/clickstreams_events'],
+    ),
+    Stage(
+        'eda', 'III-user_EDA.py',
+        inputs=['data/user_filtered.parquet'],
+    ),
+]
+
+
+def get_stage(name):
+    for stage in STAGES:
+        if stage.name == name:
+            return stage
+    raise KeyError(f"Unbekannte Stufe: {name}")
+
+
+def upstream(stage):
+    """Stufen, deren Ausgaben Eingaben dieser Stufe sind (rekursiv, in Pipeline-Reihenfolge)."""
+    needed = {stage.name}
+    for candidate in reversed(STAGES):
+        if candidate.name in needed:
+            continue
+        if any(set(candidate.outputs) & set(s.inputs) for s in STAGES if s.name in needed):
+            needed.add(candidate.name)
+    return [s for s in STAGES if s.name in needed and s.name != stage.name]
+
+
+def status(stage):
+    """Liefert (aktuell, Grund)."""
+    manifest = _load_manifest(stage)
+    if manifest is None:
+        return False, 'noch nicht ausgeführt'
+    missing = [path for path in stage.inputs if not os.path.exists(_path(path))]
+    if missing:
+        return False, f"Eingabe fehlt: {', '.join(missing)}"
+    if manifest['key'] != stage.key():
+        return False, 'Eingaben, Code oder Parameter geändert'
+    for path, digest in manifest['outputs'].items():
+        if not os.path.exists(_path(path)):
+            return False, f'Ausgabe fehlt: {path}'
+        if path_hash(_path(path)) != digest:
+            return False, f'Ausgabe verändert: {path}'
+    return True, 'aktuell'
+
+
+def run(names=None, force=False, dry_run=False):
+    """
+    Führt die angegebenen Stufen (None = alle) aus, sofern sie nicht
+    aktuell sind. Vorgelagerte Stufen werden bei Bedarf mit ausgeführt.
+
+    force: Stufen unabhängig vom Cache ausführen.
+    dry_run: nur den Status ausgeben.
+    Rückgabe: Namen der ausgeführten Stufen.
+    """
+    selected = STAGES if names is None else [get_stage(name) for name in names]
+    required = set()
+    for stage in selected:
+        required.add(stage.name)
+        required.update(s.name for s in upstream(stage))
+
+    executed = []
+    for stage in STAGES:
+        if stage.name not in required:
+            continue
+        if force and stage in selected:
+            up_to_date, reason = False, 'erzwungen'
+        else:
+            up_to_date, reason = status(stage)
+        print(f"[{stage.name}] {reason}")
+        if up_to_date or dry_run:
+            continue
+        _execute(stage)
+        executed.append(stage.name)
+    return executed
+
+
+def _execute(stage):
+    key = stage.key()
+    env = dict(os.environ)
+    env.setdefault('MPLBACKEND', 'Agg')
+    print(f"[{stage.name}] führe {stage.script} aus ...")
+    start = time.perf_counter()
+    subprocess.run([sys.executable, stage.script], cwd=PROJECT_ROOT, env=env, check=True)
+    elapsed = time.perf_counter() - start
+
+    missing = [path for path in stage.outputs if not os.path.exists(_path(path))]
+    if missing:
+        raise RuntimeError(f"Stufe '{stage.name}' hat folgende Ausgaben nicht erzeugt: {', '.join(missing)}")
+    _save_manifest(stage, {
+        'key': key,
+        'outputs': {path: path_hash(_path(path)) for path in stage.outputs},
+        'params': stage.param_values(),
+        'seconds': round(elapsed, 2),
+    })
+    print(f"[{stage.name}] fertig nach {elapsed:.1f} s")
+
+
+def _path(path):
+    return os.path.join(PROJECT_ROOT, path)
+
+
+def _manifest_path(stage):
+    return _path(os.path.join(MANIFEST_DIR, f'{stage.name}.json'))
+
+
+def _load_manifest(stage):
+    path = _manifest_path(stage)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _save_manifest(stage, manifest):
+    path = _manifest_path(stage)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+
+
+def _pipeline_imports(path):
+    """Namen der importierten Module aus `pipeline` (z. B. 'pipeline.users')."""
+    with open(path, encoding='utf-8') as f:
+        tree = ast.parse(f.read(), filename=path)
+    modules = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            modules.extend(alias.name for alias in node.names if alias.name.startswith('pipeline.'))
+        elif isinstance(node, ast.ImportFrom) and node.module and node.level == 0:
+            if node.module == 'pipeline':
+                modules.extend(f'pipeline.{alias.name}' for alias in node.names)
+            elif node.module.startswith('pipeline.'):
+                modules.append(node.module)
+    return modules
+
+
+def _module_file(module):
+    relative = module.replace('.', os.sep)
+    for candidate in (relative + '.py', os.path.join(relative, '__init__.py')):
+        if os.path.exists(_path(candidate)):
+            return candidate
+    return None
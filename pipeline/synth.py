@@ -0,0 +1,284 @@
+"""
+Synthetische Daten mit dem Schema von user.csv und clickstreams.parquet.
+
+Verteilungen, Kardinalitäten, Anteile fehlender Werte und '-unknown-',
+Duplikat- und Null-Zeit-Anteile entsprechen den Kennzahlen der echten
+Daten (Berichte in `scripts/outputs/`). Skalierungsfaktor 1 entspricht
+213.451 Benutzern und 10.567.737 Clickstream-Ereignissen.
+
+Die häufigsten Werte jeder Spalte werden mit ihren echten Anteilen
+erzeugt; die übrigen Werte bis zur echten Kardinalität erhalten den
+Restanteil nach einer Zipf-Verteilung (Namen wie `session_action_17`).
+
+Die Clickstreams werden blockweise (je Gruppe von Benutzern) erzeugt und
+geschrieben, sodass auch große Skalierungsfaktoren mit begrenztem
+Arbeitsspeicher auskommen.
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+REFERENCE_USERS = 213_451
+REFERENCE_EVENTS = 10_567_737
+
+UNKNOWN_VALUE = '-unknown-'
+
+# Kenndaten eines erzeugten Datensatzes (Maßstab, Startwert, Größen)
+INFO_FILE = 'synth.json'
+
+# Anteil fehlender Werte bzw. Sonderwerte (Referenzdaten)
+USER_AGE_MISSING = 0.412
+AFFILIATE_MISSING = 0.0284
+DATE_ORDER_ERRORS = 29 / REFERENCE_USERS
+
+CLICKSTREAM_USER_SHARE = 135_483 / REFERENCE_USERS
+EVENTS_PER_USER_SIGMA = 1.2
+USER_ID_MISSING = 0.0033
+ACTION_MISSING = 0.0075
+TYPE_MISSING = 0.1066
+TYPE_UNKNOWN = 0.0976
+DETAIL_ONLY_TYPE_UNKNOWN = 29 / 1_031_170
+DEVICE_UNKNOWN = 0.02
+DEVICE_SWITCH = 0.1
+TIME_MISSING = 0.0129
+TIME_ZERO = 0.0056
+TIME_MEDIAN = 1147.0
+TIME_SIGMA = 2.4
+TIME_MAX = 1_799_977.0
+DUPLICATE_RATE = 0.0239
+
+# (häufigste Werte mit Anteilen, Kardinalität)
+USER_COLUMNS = {
+    'user_gender': ({UNKNOWN_VALUE: .4483, 'MALE': .2953, 'FEMALE': .2550, 'OTHER': .0013}, 4),
+    'signup_platform': ({'web': .7164, 'affiliate': .2810, 'search_engine': .0026}, 3),
+    'signup_process': ({0: .7712, 25: .0692, 12: .0439, 3: .0414, 2: .0320, 24: .0203, 23: .0134,
+                        1: .0049, 6: .0014, 8: .0011, 5: .0004, 11: .0003, 13: .0002, 14: .0002,
+                        20: .0001, 10: .00001, 4: .000005}, 17),
+    'user_language': ({'en': .9666, 'zh': .0077, 'fr': .0054, 'es': .0043, 'ko': .0035, 'de': .0035,
+                       'it': .0024, 'ru': .0018, 'pt': .0011, 'ja': .0011}, 25),
+    'marketing_channel': ({'direct': .6456, 'sem-brand': .1219, 'sem-non-brand': .0882, 'other': .0418,
+                           'seo': .0405, 'api': .0384, 'content': .0185, 'remarketing': .0051}, 8),
+    'marketing_provider': ({'direct': .6442, 'google': .2418, 'other': .0588, 'craigslist': .0162,
+                            'bing': .0109, 'facebook': .0107, 'vast': .0039, 'padmapper': .0036,
+                            'facebook-open-graph': .0026, 'yahoo': .0023}, 18),
+    'first_tracked_affiliate': ({'untracked': .5121, 'linked': .2166, 'omg': .2061, 'tracked-other': .0287,
+                                 'product': .0073, 'marketing': .0007, 'local ops': .0002}, 7),
+    'signup_application': ({'Web': .8552, 'iOS': .0897, 'Moweb': .0294, 'Android': .0257}, 4),
+    'first_device': ({'Mac Desktop': .4193, 'Windows Desktop': .3404, 'iPhone': .0978, 'iPad': .0672,
+                      'Other/Unknown': .0501, 'Android Phone': .0132, 'Android Tablet': .0060,
+                      'Desktop (Other)': .0056, 'SmartPhone (Other)': .0004}, 9),
+    'first_web_browser': ({'Chrome': .2992, 'Safari': .2112, 'Firefox': .1575, UNKNOWN_VALUE: .1284,
+                           'IE': .0985, 'Mobile Safari': .0904, 'Chrome Mobile': .0059,
+                           'Android Browser': .0040, 'AOL Explorer': .0011, 'Opera': .0009}, 52),
+    'destination_country': ({'NDF': .5848, 'US': .2913, 'other': .0471, 'FR': .0235, 'IT': .0132,
+                             'GB': .0108, 'ES': .0105, 'CA': .0067, 'DE': .0049, 'NL': .0036,
+                             'AU': .0025, 'PT': .0010}, 12),
+}
+
+# Anteile bezogen auf alle Ereignisse; NaN/'-unknown-' werden separat erzeugt
+ACTIONS = ({'show': .2620, 'index': .0798, 'search_results': .0686, 'personalize': .0669, 'search': .0507,
+            'ajax_refresh_subtotal': .0462, 'update': .0346, 'similar_listings': .0345,
+            'social_connections': .0321, 'reviews': .0303, 'active': .0178, 'similar_listings_v2': .0160,
+            'lookup': .0153, 'create': .0148, 'dashboard': .0145}, 359)
+ACTION_TYPES = ({'view': .3370, 'data': .1991, 'click': .1889, 'submit': .0590, 'message_post': .0082,
+                 'partner_callback': .0018, 'booking_request': .0018, 'modify': .0001,
+                 'booking_response': .0000004}, 9)
+ACTION_DETAILS = ({'view_search_results': .1681, 'p3': .1303, 'wishlist_content_update': .0669,
+                   'user_profile': .0622, 'change_trip_characteristics': .0462, 'similar_listings': .0345,
+                   'user_social_connections': .0319, 'update_listing': .0255, 'listing_reviews': .0255,
+                   'dashboard': .0145, 'user_wishlists': .0144, 'header_userpic': .0134,
+                   'message_thread': .0125}, 154)
+DEVICES = ({'Mac Desktop': .3401, 'Windows Desktop': .2516, 'iPhone': .1992, 'Android Phone': .0795,
+            'iPad Tablet': .0647, 'Android App Unknown Phone/Tablet': .0259, 'Tablet': .0132,
+            'Linux Desktop': .0027, 'Chromebook': .0021, 'iPodtouch': .0008, 'Windows Phone': .0002,
+            'Blackberry': .0001, 'Opera Phone': .00001}, 13)
+
+CLICKSTREAM_SCHEMA = pa.schema([
+    ('session_user_id', pa.string()),
+    ('session_action', pa.string()),
+    ('session_action_type', pa.string()),
+    ('session_action_detail', pa.string()),
+    ('session_device_type', pa.string()),
+    ('time_passed_in_seconds', pa.float64()),
+])
+
+
+def value_distribution(top, cardinality, name):
+    """Werte und Wahrscheinlichkeiten: häufigste Werte plus Zipf-verteilter Rest bis zur Kardinalität."""
+    values = list(top)
+    weights = np.array(list(top.values()), dtype=np.float64)
+    tail = cardinality - len(values)
+    if tail > 0:
+        rest = max(1.0 - weights.sum(), 1e-4)
+        zipf = 1.0 / np.arange(len(values) + 1, cardinality + 1)
+        values += [f'{name}_{i}' for i in range(len(top), cardinality)]
+        weights = np.concatenate([weights, rest * zipf / zipf.sum()])
+    return np.array(values, dtype=object), weights / weights.sum()
+
+
+def _choice(rng, distribution, size):
+    values, p = distribution
+    return values[rng.choice(len(values), size=size, p=p)]
+
+
+def _user_ids(rng, n):
+    """Eindeutige IDs aus 10 Zeichen [0-9a-z]."""
+    alphabet = np.array(list('0123456789abcdefghijklmnopqrstuvwxyz'))
+    numbers = np.unique(rng.integers(0, 36 ** 10, size=int(n * 1.05) + 10))
+    numbers = rng.permutation(numbers)[:n]
+    digits = np.empty((n, 10), dtype='<U1')
+    for i in range(9, -1, -1):
+        numbers, remainder = np.divmod(numbers, 36)
+        digits[:, i] = alphabet[remainder]
+    return digits.view('<U10').ravel()
+
+
+def generate_users(num_users, seed=0):
+    """Benutzer im Rohformat von user.csv (Datumsangaben als Zeichenketten)."""
+    rng = np.random.default_rng(seed)
+    n = num_users
+
+    # Kontoerstellung 2010-01-01 bis 2014-06-30, wachsende Registrierungszahlen
+    total_days = (pd.Timestamp('2014-06-30') - pd.Timestamp('2010-01-01')).days
+    created = pd.Timestamp('2010-01-01') + pd.to_timedelta(
+        np.floor(total_days * np.sqrt(rng.random(n))).astype(np.int64), unit='D')
+    lag_days = np.where(rng.random(n) < 0.9, 0, rng.geometric(0.05, n))
+    first_active = (created - pd.to_timedelta(lag_days, unit='D')
+                    + pd.to_timedelta(rng.integers(0, 86400, n), unit='s'))
+
+    columns = {col: _choice(rng, value_distribution(top, card, col), n)
+               for col, (top, card) in USER_COLUMNS.items()}
+    columns['first_tracked_affiliate'][rng.random(n) < AFFILIATE_MISSING] = None
+
+    booked = columns['destination_country'] != 'NDF'
+    booking_lag = np.minimum(rng.exponential(40, n), 365).astype(np.int64)
+    order_errors = rng.random(n) < DATE_ORDER_ERRORS
+    booking_lag[order_errors] = -rng.integers(1, 30, int(order_errors.sum()))
+    booking = (created + pd.to_timedelta(booking_lag, unit='D')).strftime('%Y-%m-%d').to_numpy(dtype=object)
+    booking[~booked] = None
+
+    # Alter: Großteil 18-90, einige < 18, > 90 und Jahreszahlen
+    age = 18 + np.minimum(rng.gamma(2.5, 7.0, n), 72)
+    special = rng.random(n)
+    age = np.where(special < 0.0013, rng.integers(1, 18, n), age)
+    age = np.where((special >= 0.0013) & (special < 0.0113), rng.integers(91, 110, n), age)
+    age = np.where((special >= 0.0113) & (special < 0.0213), rng.integers(1920, 2015, n), age)
+    age = np.round(age)
+    age[rng.random(n) < USER_AGE_MISSING] = np.nan
+
+    return pd.DataFrame({
+        'user_id': _user_ids(rng, n),
+        'account_created_date': created.strftime('%Y-%m-%d'),
+        'first_active_timestamp': first_active.strftime('%Y%m%d%H%M%S').astype(np.int64),
+        'first_booking_date': booking,
+        'user_gender': columns['user_gender'],
+        'user_age': age,
+        'signup_platform': columns['signup_platform'],
+        'signup_process': columns['signup_process'].astype(np.int64),
+        'user_language': columns['user_language'],
+        'marketing_channel': columns['marketing_channel'],
+        'marketing_provider': columns['marketing_provider'],
+        'first_tracked_affiliate': columns['first_tracked_affiliate'],
+        'signup_application': columns['signup_application'],
+        'first_device': columns['first_device'],
+        'first_web_browser': columns['first_web_browser'],
+        'destination_country': columns['destination_country'],
+    })
+
+
+def _clickstream_block(rng, user_ids, counts, distributions):
+    """Ereignisse für eine Gruppe von Benutzern (nach Benutzer gruppiert)."""
+    n = int(counts.sum())
+    users = np.repeat(user_ids, counts).astype(object)
+    users[rng.random(n) < USER_ID_MISSING] = None
+
+    action = _choice(rng, distributions['action'], n)
+    action[rng.random(n) < ACTION_MISSING] = None
+
+    # Typ und Detail: NaN und '-unknown-' treten gemeinsam auf
+    kind = rng.random(n)
+    missing = kind < TYPE_MISSING
+    unknown = (kind >= TYPE_MISSING) & (kind < TYPE_MISSING + TYPE_UNKNOWN)
+    action_type = _choice(rng, distributions['type'], n)
+    action_detail = _choice(rng, distributions['detail'], n)
+    action_type[missing] = None
+    action_detail[missing] = None
+    action_type[unknown] = UNKNOWN_VALUE
+    action_detail[unknown & (rng.random(n) >= DETAIL_ONLY_TYPE_UNKNOWN)] = UNKNOWN_VALUE
+
+    # Gerät: meist ein Gerät pro Benutzer
+    user_device = _choice(rng, distributions['device'], len(user_ids))
+    device = np.repeat(user_device, counts)
+    switch = rng.random(n) < DEVICE_SWITCH
+    device[switch] = _choice(rng, distributions['device'], int(switch.sum()))
+    device[rng.random(n) < DEVICE_UNKNOWN] = UNKNOWN_VALUE
+
+    time = np.minimum(np.round(TIME_MEDIAN * np.exp(TIME_SIGMA * rng.standard_normal(n))), TIME_MAX)
+    time[rng.random(n) < TIME_ZERO] = 0.0
+    time[rng.random(n) < TIME_MISSING] = np.nan
+
+    # Duplikate: Zeile direkt danach wiederholen
+    repeats = np.where(rng.random(n) < DUPLICATE_RATE / (1 - DUPLICATE_RATE), 2, 1)
+    columns = [users, action, action_type, action_detail, device, time]
+    columns = [np.repeat(column, repeats) for column in columns]
+    return pa.Table.from_arrays([pa.array(c, type=f.type, from_pandas=True)
+                                 for c, f in zip(columns, CLICKSTREAM_SCHEMA)], schema=CLICKSTREAM_SCHEMA)
+
+
+def write_clickstreams(path, user_ids, num_events, seed=0, users_per_block=20_000, row_group_size=1_000_000):
+    """Schreibt synthetische Clickstreams blockweise nach `path`. Rückgabe: Anzahl Zeilen."""
+    rng = np.random.default_rng(seed + 1)
+    active = rng.permutation(user_ids)[:int(round(len(user_ids) * CLICKSTREAM_USER_SHARE))]
+    weights = np.exp(EVENTS_PER_USER_SIGMA * rng.standard_normal(len(active)))
+    base_events = int(round(num_events * (1 - DUPLICATE_RATE)))
+    counts = rng.multinomial(base_events, weights / weights.sum())
+
+    distributions = {
+        'action': value_distribution(*ACTIONS, 'session_action'),
+        'type': value_distribution(*ACTION_TYPES, 'session_action_type'),
+        'detail': value_distribution(*ACTION_DETAILS, 'session_action_detail'),
+        'device': value_distribution(*DEVICES, 'session_device_type'),
+    }
+    rows = 0
+    with pq.ParquetWriter(path, CLICKSTREAM_SCHEMA) as writer:
+        for start in range(0, len(active), users_per_block):
+            block = slice(start, start + users_per_block)
+            table = _clickstream_block(rng, active[block], counts[block], distributions)
+            writer.write_table(table, row_group_size=row_group_size)
+            rows += table.num_rows
+    return rows
+
+
+def write_dataset(out_dir, scale=1.0, seed=0):
+    """
+    Erzeugt `<out_dir>/data/user.csv` und `<out_dir>/data/clickstreams.parquet`
+    im Maßstab `scale` (1.0 = Größe der echten Daten) sowie
+    `<out_dir>/data/synth.json` mit den Kenndaten.
+    Rückgabe: (Anzahl Benutzer, Anzahl Clickstream-Zeilen)
+    """
+    data_dir = os.path.join(out_dir, 'data')
+    os.makedirs(data_dir, exist_ok=True)
+    num_users = max(int(round(REFERENCE_USERS * scale)), 1)
+    num_events = max(int(round(REFERENCE_EVENTS * scale)), 1)
+
+    users = generate_users(num_users, seed=seed)
+    users.to_csv(os.path.join(data_dir, 'user.csv'), index=False)
+    rows = write_clickstreams(os.path.join(data_dir, 'clickstreams.parquet'),
+                              users['user_id'].to_numpy(), num_events, seed=seed)
+    with open(os.path.join(data_dir, INFO_FILE), 'w', encoding='utf-8') as f:
+        json.dump({'scale': scale, 'seed': seed, 'users': num_users, 'events': rows}, f, indent=2)
+    return num_users, rows
+
+
+def dataset_info(out_dir):
+    """Kenndaten eines mit `write_dataset` erzeugten Datensatzes (None, falls nicht vorhanden)."""
+    path = os.path.join(out_dir, 'data', INFO_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
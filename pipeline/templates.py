@@ -0,0 +1,463 @@
+"""
+Berichtsvorlagen.
+
+Jede Vorlage erzeugt einen Markdown-Bericht ausschließlich aus den
+Kennzahlen eines `ReportStats`-Objekts (`pipeline/reports.py`). Die
+Skripte berechnen die Kennzahlen und rufen `write_report` auf; dabei
+werden Kennzahlen (`<bericht>.stats.json`) und Bericht gespeichert.
+Nach einer Änderung an Wortlaut oder Layout erzeugt `render_saved`
+(bzw. `scripts/render_reports.py`) die Berichte neu, ohne die Daten zu
+laden.
+
+Vorlagen:
+- 'user_cleaning': scripts/outputs/datenbereinigung_bericht.md
+- 'clickstream_cleaning': scripts/outputs/clickstreams_bereinigung_bericht.md
+- 'user_errors': scripts/outputs/user_csv_fehler_bericht.md
+"""
+
+from pipeline.reports import ReportStats, report_path, stats_path
+
+TEMPLATES = {}
+
+
+def template(kind):
+    """Registriert eine Vorlage für Kennzahlen der Art `kind`."""
+    def register(function):
+        TEMPLATES[kind] = function
+        return function
+    return register
+
+
+def render(stats):
+    """Bericht (Text) zu den Kennzahlen."""
+    if stats.kind not in TEMPLATES:
+        raise KeyError(f"Keine Vorlage für Berichte der Art '{stats.kind}'")
+    return TEMPLATES[stats.kind](stats.values)
+
+
+def write_report(stats, path):
+    """Speichert Kennzahlen (`<path ohne Endung>.stats.json`) und Bericht (`path`)."""
+    stats.save(stats_path(path))
+    text = render(stats.normalized())
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    return text
+
+
+def render_saved(stats_file):
+    """Erzeugt den Bericht zu einer gespeicherten Kennzahlendatei neu. Rückgabe: Pfad des Berichts."""
+    path = report_path(stats_file)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(render(ReportStats.load(stats_file)))
+    return path
+
+
+def _nan(value, text='nan'):
+    return text if value is None else value
+
+
+@template('user_cleaning')
+def render_user_cleaning(v):
+    out = []
+    w = out.append
+    w("# Datenbereinigung: user.csv\n\n")
+    w("=" * 80 + "\n\n")
+
+    # 1. Daten laden und Inspektion
+    w("## 1. Daten laden und allgemeine Inspektion\n\n")
+    w(f"- **Anzahl Zeilen**: {v['rows_initial']}\n")
+    w(f"- **Anzahl Spalten**: {len(v['columns'])}\n")
+    w(f"- **Spalten**: {', '.join(v['columns'])}\n\n")
+
+    w("### Datentypen:\n\n")
+    for col, dtype in v['dtypes']:
+        w(f"- `{col}`: {dtype}\n")
+    w("\n")
+
+    # 2. Duplikatsprüfung
+    w("## 2. Duplikatsprüfung\n\n")
+    w(f"- **Anzahl Duplikate**: {v['num_duplicates']}\n")
+    if v['num_duplicates'] > 0:
+        w(f"- **Aktion**: Duplikate werden entfernt\n")
+        w(f"- **Neue Zeilenanzahl**: {v['rows_after_duplicates']}\n")
+    else:
+        w(f"- ✓ Keine Duplikate gefunden\n")
+    w("\n")
+
+    # 3. Datumskonvertierung
+    w("## 3. Datumskonvertierung\n\n")
+    w("- `first_active_timestamp` → datetime + neues Feld `first_active_date` (normalisiert)\n")
+    w("- `account_created_date` → datetime\n")
+    w("- `first_booking_date` → datetime\n\n")
+
+    w("### Datumsbereiche:\n\n")
+    for col, minimum, maximum in v['date_ranges']:
+        w(f"- **{col}**: {minimum} bis {maximum}\n")
+    w("\n")
+
+    # 4. Datumsreihenfolge
+    w("## 4. Datumsreihenfolge-Validierung\n\n")
+    w("Korrekte Reihenfolge: first_active_date ≤ account_created_date ≤ first_booking_date\n\n")
+    w(f"- **Fehler gefunden**: {v['num_date_errors']}\n")
+    w(f"  - first_active_date > account_created_date: {v['active_after_created']}\n")
+    w(f"  - account_created_date > first_booking_date: {v['created_after_booking']}\n")
+    if v['num_date_errors'] > 0:
+        w(f"- **Aktion**: Fehlerhafte Zeilen werden entfernt\n")
+        w(f"- **Neue Zeilenanzahl**: {v['rows_after_date_check']}\n")
+    else:
+        w(f"- ✓ Keine Fehler gefunden\n")
+    w("\n")
+
+    # 5. user_gender
+    w("## 5. user_gender Bereinigung\n\n")
+    w("### Ursprüngliche Werte:\n\n")
+    for value, count in v['gender_before']:
+        w(f"- `{_nan(value)}`: {count}\n")
+    w("\n")
+
+    w(f"### Zulässige Werte: {', '.join(repr(value) for value in v['gender_values'])}, NaN\n\n")
+    w(f"- **Ungültige Werte gefunden**: {v['num_invalid_gender']}\n")
+    if v['num_invalid_gender'] > 0:
+        w(f"- **Aktion**: Ungültige Werte werden auf NaN gesetzt\n")
+
+    w("\n### Bereinigte Werte:\n\n")
+    for value, count in v['gender_after']:
+        w(f"- `{_nan(value)}`: {count}\n")
+    w("\n")
+
+    # 6. Altersfilterung
+    w("## 6. Altersfilterung\n\n")
+    w(f"Gültige Werte: {v['age_min']} ≤ user_age ≤ {v['age_max']}\n\n")
+
+    w("### Altersstatistik vor Filterung:\n\n")
+    _age_statistics(w, v['age_before'])
+
+    w(f"- **Ungültige Altersangaben**: {v['num_invalid_age']}\n")
+    w(f"  - Alter < {v['age_min']}: {v['age_too_young']}\n")
+    w(f"  - Alter > {v['age_max']}: {v['age_too_old']}\n")
+    if v['num_invalid_age'] > 0:
+        w(f"- **Aktion**: Zeilen mit ungültigem Alter werden entfernt\n")
+        w(f"- **Neue Zeilenanzahl**: {v['rows_after_age']}\n")
+    else:
+        w(f"- ✓ Keine ungültigen Altersangaben gefunden\n")
+    w("\n")
+
+    w("### Altersstatistik nach Filterung:\n\n")
+    _age_statistics(w, v['age_after'])
+
+    # 7. Eindeutige Werte
+    w("## 7. Analyse eindeutiger Werte in Textspalten\n\n")
+    w(f"Prüfung auf seltene Werte (< {v['rare_threshold']} Vorkommen) als mögliche Tippfehler\n\n")
+    for column in v['text_columns']:
+        w(f"### {column['column']}\n\n")
+        w(f"- **Anzahl eindeutiger Werte**: {column['nunique']}\n")
+        w(f"- **Seltene Werte (< {v['rare_threshold']})**: {column['rare_count']}\n\n")
+        if column['rare_count'] > 0:
+            w("**Seltene Werte:**\n\n")
+            for value, count in column['rare']:
+                w(f"- `{_nan(value)}`: {count}\n")
+            w("\n")
+        w("**Top 10 häufigste Werte:**\n\n")
+        for value, count in column['top']:
+            percentage = (count / v['rows_final']) * 100
+            w(f"- `{_nan(value)}`: {count} ({percentage:.2f}%)\n")
+        w("\n")
+
+    # 8. Abhängigkeitsprüfung
+    w("## 8. Abhängigkeitsprüfung: first_booking_date ↔ destination_country\n\n")
+    w("Erwartete Konsistenz:\n")
+    w("- first_booking_date = NaN → destination_country = 'NDF'\n")
+    w("- destination_country = 'NDF' → first_booking_date = NaN\n\n")
+
+    w(f"### Inkonsistenzen:\n\n")
+    w(f"- **Keine Buchung, aber destination != 'NDF'**: {v['num_case1']}\n")
+    w(f"- **Buchung vorhanden, aber destination = 'NDF'**: {v['num_case2']}\n\n")
+    total_inconsistencies = v['num_case1'] + v['num_case2']
+    if total_inconsistencies == 0:
+        w("✓ **Keine Inkonsistenzen gefunden - Daten sind konsistent**\n\n")
+    else:
+        w(f"❌ **Insgesamt {total_inconsistencies} inkonsistente Zeilen gefunden**\n\n")
+
+    w("### Statistik:\n\n")
+    w(f"- **Zeilen ohne Buchungsdatum**: {v['no_booking_total']}\n")
+    w(f"- **Zeilen mit destination_country = 'NDF'**: {v['ndf_total']}\n\n")
+
+    # 9. Fehlende Werte
+    w("## 9. Analyse fehlender Werte\n\n")
+    w("### Fehlende Werte pro Spalte:\n\n")
+    w("| Spalte | Anzahl fehlend | Prozent |\n")
+    w("|--------|----------------|----------|\n")
+    for col, count, percent in v['missing']:
+        if count > 0:
+            w(f"| {col} | {count} | {percent:.2f}% |\n")
+    if sum(count for _, count, _ in v['missing']) == 0:
+        w("\n✓ **Keine fehlenden Werte**\n")
+    w("\n")
+
+    # Zusammenfassung
+    rows_initial, rows_final = v['rows_initial'], v['rows_final']
+    w("## Zusammenfassung\n\n")
+    w("=" * 80 + "\n\n")
+
+    w("### Datenstatistik:\n\n")
+    w(f"- **Ursprüngliche Zeilen**: {rows_initial}\n")
+    w(f"- **Nach Duplikatsentfernung**: {v['rows_after_duplicates']}\n")
+    w(f"- **Nach Datumsvalidierung**: {v['rows_after_date_check']}\n")
+    w(f"- **Nach Altersfilterung**: {v['rows_after_age']}\n")
+    w(f"- **Finale Zeilenanzahl**: {rows_final}\n")
+    w(f"- **Entfernte Zeilen gesamt**: {rows_initial - rows_final} ({((rows_initial - rows_final) / rows_initial * 100):.2f}%)\n\n")
+
+    w("### Durchgeführte Bereinigungen:\n\n")
+    w(f"1. Duplikate entfernt: {v['num_duplicates']}\n")
+    w(f"2. Datumsreihenfolgefehler entfernt: {v['num_date_errors']}\n")
+    w(f"3. user_gender normalisiert: {v['num_invalid_gender']} Werte korrigiert\n")
+    w(f"4. Ungültige Altersangaben entfernt: {v['num_invalid_age']}\n")
+    w(f"5. Abhängigkeitsprüfung: {total_inconsistencies} Inkonsistenzen gefunden\n\n")
+
+    w("=" * 80 + "\n")
+    return ''.join(out)
+
+
+def _age_statistics(w, stats):
+    w(f"- **Minimum**: {stats['min']:.2f}\n")
+    w(f"- **Maximum**: {stats['max']:.2f}\n")
+    w(f"- **Durchschnitt**: {stats['mean']:.2f}\n")
+    w(f"- **Median**: {stats['median']:.2f}\n\n")
+
+
+@template('clickstream_cleaning')
+def render_clickstream_cleaning(v):
+    out = []
+    w = out.append
+    rows = v['rows']
+    w("# Datenbereinigung und Fehleranalyse: clickstreams.parquet\n\n")
+
+    # 1. Daten laden und allgemeine Inspektion
+    w("## 1. Daten laden und allgemeine Inspektion\n\n")
+    w(f"- **Anzahl der Zeilen**: {rows:,}\n")
+    w(f"- **Anzahl der Spalten**: {len(v['columns'])}\n")
+    w(f"- **Spalten**: {v['columns']}\n\n")
+    w(f"- **Speicherverbrauch**: {v['memory_mb']:.2f} MB\n\n")
+
+    w("### Datentypen\n\n")
+    w("| Spalte | Datentyp |\n")
+    w("|--------|----------|\n")
+    for col, dtype in v['dtypes']:
+        w(f"| {col} | {dtype} |\n")
+    w("\n")
+
+    # 2. Prüfung auf Duplikate
+    w("## 2. Prüfung auf Duplikate\n\n")
+    w(f"- **Anzahl der Duplikate**: {v['num_duplicates']:,}\n")
+    if v['num_duplicates'] > 0:
+        w(f"- **Prozentsatz**: {v['num_duplicates'] / rows * 100:.2f}%\n\n")
+        w("⚠️ **Hinweis**: Duplikate werden beibehalten, da sie legitime wiederholte Aktionen sein könnten.\n")
+        w("Falls gewünscht, können Duplikate in einer späteren Analyse entfernt werden.\n\n")
+    else:
+        w("✅ Keine Duplikate gefunden.\n\n")
+
+    # 3. Analyse fehlender Werte
+    w("## 3. Analyse fehlender Werte (vor Bereinigung)\n\n")
+    _missing_table(w, v['missing_before'])
+
+    w("ℹ️ **Hinweis zu NaN-Werten in session_action_type und session_action_detail:**\n")
+    w("Diese leeren Werte (None/NaN) sind **legitim** und repräsentieren technische Anfragen an die Website.\n")
+    w("Sie werden nicht als Fehler betrachtet und bleiben unverändert.\n\n")
+
+    # 4. Analyse von '-unknown-' Werten
+    w("## 4. Analyse von '-unknown-' Werten\n\n")
+    w("'-unknown-' ist ein Platzhalter für unbekannte Werte und sollte durch NaN ersetzt werden.\n\n")
+    w("| Spalte | '-unknown-' Anzahl | Prozent |\n")
+    w("|--------|-------------------|--------|\n")
+    for col, count in v['unknown_counts']:
+        w(f"| {col} | {count:,} | {count / rows * 100:.2f}% |\n")
+    w("\n")
+
+    unknown = dict(v['unknown_counts'])
+    w("### Korrelation von '-unknown-' Werten\n\n")
+    w(f"- session_action_type UND session_action_detail sind '-unknown-': {v['unk_type_and_detail']:,}\n")
+    w(f"- NUR session_action_type ist '-unknown-': {v['unk_type_only']:,}\n")
+    w(f"- NUR session_action_detail ist '-unknown-': {v['unk_detail_only']:,}\n")
+    w(f"- session_device_type ist '-unknown-': {unknown['session_device_type']:,}\n\n")
+
+    # 5. Bereinigung
+    w("## 5. Bereinigung durchführen\n\n")
+    w("### 5.1 '-unknown-' durch NaN ersetzen\n\n")
+    for col, count in v['unknown_counts']:
+        w(f"- **{col}**: {count:,} Werte ersetzt\n")
+    w("\n")
+
+    # 6. Analyse der Spalten nach Bereinigung
+    w("## 6. Analyse der Spalten nach Bereinigung\n\n")
+    columns = v['clean_columns']
+    # Aktion und Detail: nur die häufigsten Werte; Typ und Gerät: alle Werte einschließlich NaN
+    for col, label in [('session_action', 'Aktion'), ('session_action_type', 'Typ'),
+                       ('session_action_detail', 'Detail'), ('session_device_type', 'Gerät')]:
+        column = columns[col]
+        w(f"### {col}\n\n")
+        w(f"- **Eindeutige Werte**: {column['nunique']}\n")
+        w(f"- **Fehlende Werte**: {column['missing']:,}\n\n")
+        if column['top'] is not None:
+            w(f"**Top {column['top']} häufigste Werte:**\n\n")
+        w(f"| {label} | Anzahl | Prozent |\n")
+        w("|" + "-" * (len(label) + 2) + "|--------|--------|\n")
+        for value, count in column['values']:
+            w(f"| {_nan(value, 'NaN')} | {count:,} | {count / rows * 100:.2f}% |\n")
+        w("\n")
+
+    time = columns['time_passed_in_seconds']
+    w("### time_passed_in_seconds\n\n")
+    w(f"- **Fehlende Werte**: {time['missing']:,}\n")
+    w(f"- **Min**: {time['min']}\n")
+    w(f"- **Max**: {time['max']}\n")
+    w(f"- **Mittelwert**: {time['mean']:.2f}\n")
+    w(f"- **Median**: {time['median']:.2f}\n")
+    w(f"- **Standardabweichung**: {time['std']:.2f}\n\n")
+    w(f"⚠️ **Extreme Werte (> 1.000.000 Sekunden / 11+ Tage)**: {time['extreme']:,}\n\n")
+
+    users = columns['session_user_id']
+    w("### session_user_id\n\n")
+    w(f"- **Eindeutige Benutzer**: {users['nunique']:,}\n")
+    w(f"- **Fehlende Werte**: {users['missing']:,}\n\n")
+
+    # 7. Fehlende Werte nach Bereinigung
+    w("## 7. Fehlende Werte nach Bereinigung\n\n")
+    _missing_table(w, v['missing_after'])
+
+    # 8. Zusammenfassung
+    w("## 8. Zusammenfassung\n\n")
+    w(f"- **Ursprüngliche Anzahl der Zeilen**: {rows:,}\n")
+    w(f"- **Finale Anzahl der Zeilen**: {rows:,}\n")
+    w(f"- **Anzahl der Spalten**: {len(v['columns'])}\n\n")
+
+    w("### Durchgeführte Bereinigungen:\n\n")
+    w("1. ✅ '-unknown-' in session_action_type durch NaN ersetzt\n")
+    w("2. ✅ '-unknown-' in session_action_detail durch NaN ersetzt\n")
+    w("3. ✅ '-unknown-' in session_device_type durch NaN ersetzt\n\n")
+
+    w("### Legitime NaN-Werte (keine Bereinigung notwendig):\n\n")
+    w("- NaN in session_action_type und session_action_detail: Technische Anfragen\n")
+    w("- Diese Werte wurden **nicht** als Fehler behandelt\n\n")
+
+    w("### Hinweise für weitere Analyse:\n\n")
+    w("- Duplikate wurden beibehalten (könnten legitime wiederholte Aktionen sein)\n")
+    w("- Extreme Zeitwerte wurden beibehalten (zur weiteren Untersuchung)\n")
+    w("- Fehlende session_user_id könnten auf anonyme Sitzungen hinweisen\n")
+    w("- Fehlende session_action könnten auf unvollständige Protokollierung hinweisen\n\n")
+    return ''.join(out)
+
+
+def _missing_table(w, missing):
+    w("| Spalte | Fehlend | Prozent |\n")
+    w("|--------|---------|--------|\n")
+    for col, count, percent in missing:
+        w(f"| {col} | {count:,} | {percent}% |\n")
+    w("\n")
+
+
+@template('user_errors')
+def render_user_errors(v):
+    out = []
+    w = out.append
+    w("# Fehleranalyse-Bericht für user.csv\n\n")
+    w("=" * 80 + "\n\n")
+
+    # 1. Altersanalyse
+    age = v['age']
+    w("## 1. Altersanalyse (user_age)\n\n")
+    w("### Altersstatistik:\n\n")
+    w(f"- **Minimalalter:** {age['min']}\n")
+    w(f"- **Maximalalter:** {age['max']}\n")
+    w(f"- **Durchschnittsalter:** {age['mean']:.2f}\n")
+    w(f"- **Medianalter:** {age['median']}\n\n")
+
+    for check in v['age_checks']:
+        w(f"### Benutzer mit {check['title']}: **{check['count']}**\n\n")
+        if check['count'] > 0:
+            w(f"Beispiele:\n\n")
+            for row in check['examples']:
+                w(f"- user_id: `{row['user_id']}`, Alter: {row['user_age']}\n")
+        w("\n")
+
+    # 2. Datumsanalyse
+    w("## 2. Datumsanalyse\n\n")
+    w(f"### Datumsbereiche:\n\n")
+    for col, minimum, maximum in v['date_ranges']:
+        w(f"- **{col}:** {minimum} bis {maximum}\n")
+    w("\n")
+
+    for group in v['date_checks']:
+        w(f"### {group['title']}:\n\n")
+        for description, count in group['counts']:
+            w(f"- **{description}:** {count}\n")
+        w("\n")
+
+    # 3. Datumsreihenfolge
+    w("## 3. Fehler in der Datumsreihenfolge\n\n")
+    w("**Hinweis:** Datumsvergleiche werden nur auf Basis des Datums ohne Zeitstempel durchgeführt.\n\n")
+    for check in v['date_order']:
+        w(f"### Zeilen mit {check['description']}: **{check['count']}**\n\n")
+        if check['count'] > 0:
+            w(f"Beispiele (erste 10):\n\n")
+            (left, left_label), (right, right_label) = check['fields']
+            for row in check['examples']:
+                w(f"- user_id: `{row['user_id']}`, {left_label}: {row[left]}, {right_label}: {row[right]}\n")
+        w("\n")
+
+    # 4. first_booking_date vs destination_country
+    w("## 4. Konsistenz von first_booking_date und destination_country\n\n")
+    w(f"### Benutzer ohne Buchungsdatum: **{v['no_booking_total']}**\n\n")
+    for check in v['consistency']:
+        w(f"### {check['title']}: **{check['count']}**\n\n")
+        if check['count'] > 0:
+            w(f"Beispiele (erste 10):\n\n")
+            for row in check['examples']:
+                w(f"- user_id: `{row['user_id']}`, booking_date: {row['first_booking_date']}, destination: {row['destination_country']}\n")
+        else:
+            w("✓ Keine Fehler gefunden\n")
+        w("\n")
+
+    # 5. Textspalten
+    w("## 5. Analyse der Textspalten (Suche nach Tippfehlern)\n\n")
+    for column in v['text_columns']:
+        w(f"### {column['column']}: {column['nunique']} eindeutige Werte\n\n")
+        w(f"Top 15 Werte:\n\n")
+        for value, count in column['top']:
+            w(f"- `{value}`: {count}\n")
+        if column['rare_count'] > 0:
+            w(f"\n**Seltene Werte (Anzahl ≤ {v['rare_threshold']}):** {column['rare_count']}\n\n")
+            for value, count in column['rare']:
+                w(f"- `{value}`: {count}\n")
+        w("\n")
+
+    # 6. Fehlende Werte
+    w("## 6. Analyse fehlender Werte\n\n")
+    w(f"Fehlende Werte nach Spalte:\n\n")
+    for col, count, percent in v['missing']:
+        if count > 0:
+            w(f"- **{col}:** {count} ({percent:.2f}%)\n")
+    w("\n")
+
+    # 7. Leere Zeichenketten
+    w("## 7. Analyse leerer Zeichenketten\n\n")
+    empty = [(col, count) for col, count in v['empty_strings'] if count > 0]
+    for col, count in empty:
+        w(f"- **{col}:** {count} leere Zeichenketten\n")
+    if not empty:
+        w("✓ Keine leeren Zeichenketten gefunden\n")
+    w("\n")
+
+    # 8. Zusammenfassung
+    w("## 8. Zusammenfassung aller gefundenen Fehler\n\n")
+    w("=" * 80 + "\n\n")
+    w("| Fehlertyp | Anzahl |\n")
+    w("|-----------|--------|\n")
+    total_errors = 0
+    for label, count, is_error in v['summary']:
+        if count > 0:
+            w(f"| {label} | {count} |\n")
+            if is_error:
+                total_errors += count
+    w(f"\n**Gesamtzahl der Fehler (mit möglichen Überschneidungen):** {total_errors}\n\n")
+    w("=" * 80 + "\n")
+    return ''.join(out)
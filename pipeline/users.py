@@ -0,0 +1,167 @@
+"""
+Laden der Benutzerdaten (data/user.csv) mit festem Schema.
+
+Die CSV-Datei wird mit dem mehrfädigen CSV-Leser von pyarrow
+eingelesen. Textspalten werden direkt als Kategorien, `user_age` als
+kleine Ganzzahl (`Int16`) und die drei Datumsspalten bereits beim Parsen
+als datetime dekodiert: Werte im festen Layout (`%Y%m%d%H%M%S` bzw.
+`%Y-%m-%d` mit führenden Nullen) werden in pipeline/dates.py mit
+Ganzzahlarithmetik direkt aus dem Datenpuffer gelesen, die übrigen
+(z. B. '2014-1-01') mit `pd.to_datetime`. Das Ergebnis entspricht
+`pd.to_datetime(..., format=..., errors='coerce')`; ungültige Werte
+(z. B. Zeitstempel mit Jahr 0) werden zu NaT.
+
+Das Ergebnis wird als Parquet-Datei in `data/.cache/` abgelegt. Der
+Dateiname enthält den SHA-256-Hash der CSV-Datei und die Schema-Version;
+solange sich beides nicht ändert, wird die CSV-Datei nicht erneut
+geparst.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pv
+
+from pipeline import runlog
+from pipeline.dates import decode_dates, decode_timestamps
+from pipeline.hashing import file_hash
+
+USER_PATH = 'data/user.csv'
+
+# Bei Änderungen am Schema erhöhen, damit alte Cache-Dateien ignoriert werden
+SCHEMA_VERSION = 4
+
+USER_ID_COLUMN = 'user_id'
+AGE_COLUMN = 'user_age'
+TIMESTAMP_COLUMN = 'first_active_timestamp'
+DATE_COLUMNS = ['account_created_date', 'first_booking_date']
+
+CATEGORICAL_COLUMNS = ['user_gender', 'signup_platform', 'user_language',
+                       'marketing_channel', 'marketing_provider', 'first_tracked_affiliate',
+                       'signup_application', 'first_device', 'first_web_browser',
+                       'destination_country']
+
+_COLUMN_TYPES = {
+    USER_ID_COLUMN: pa.string(),
+    TIMESTAMP_COLUMN: pa.string(),
+    AGE_COLUMN: pa.float64(),
+    'signup_process': pa.int16(),
+    **{col: pa.string() for col in DATE_COLUMNS},
+    **{col: pa.dictionary(pa.int32(), pa.string()) for col in CATEGORICAL_COLUMNS},
+}
+
+
+def cache_path(path, cache_dir=None):
+    """Pfad der Cache-Datei für die angegebene CSV-Datei."""
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(path), '.cache')
+    name = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(cache_dir, f'{name}-v{SCHEMA_VERSION}-{file_hash(path)[:16]}.parquet')
+
+
+@runlog.measured('users.load', rows_out=len)
+def load_users(path=USER_PATH, cache=True, cache_dir=None):
+    """
+    Lädt user.csv mit festem Schema.
+
+    cache=True: Ergebnis aus `data/.cache/` lesen bzw. dort ablegen.
+    cache=False: CSV-Datei immer parsen, keinen Cache schreiben.
+    """
+    if not cache:
+        return read_users_csv(path)
+
+    cached = cache_path(path, cache_dir)
+    if os.path.exists(cached):
+        return pd.read_parquet(cached)
+
+    df = read_users_csv(path)
+    os.makedirs(os.path.dirname(cached), exist_ok=True)
+    # Erst vollständig schreiben, dann umbenennen (kein halber Cache bei Abbruch)
+    tmp_path = cached + '.tmp'
+    with runlog.step('users.write_cache', rows_in=len(df)):
+        df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, cached)
+    return df
+
+
+def read_users_csv(path=USER_PATH):
+    """Parst user.csv mit festem Schema (ohne Cache)."""
+    with runlog.step('users.read_csv') as step:
+        table = pv.read_csv(
+            path,
+            read_options=pv.ReadOptions(use_threads=True),
+            convert_options=pv.ConvertOptions(column_types=_COLUMN_TYPES, strings_can_be_null=True),
+        )
+        step.rows_out = table.num_rows
+
+    # Datumsangaben beim Einlesen dekodieren (ungültig -> null)
+    with runlog.step('users.decode_dates', rows_in=table.num_rows):
+        if TIMESTAMP_COLUMN in table.column_names:
+            table = _set_column(table, TIMESTAMP_COLUMN, decode_timestamps(table[TIMESTAMP_COLUMN]))
+        for col in DATE_COLUMNS:
+            if col in table.column_names:
+                table = _set_column(table, col, decode_dates(table[col]).astype('datetime64[s]'))
+
+    df = table.to_pandas()
+    # Kategorien in der Reihenfolge des ersten Auftretens (wie die Werte einer Textspalte),
+    # damit gleich häufige Werte in `value_counts` gleich sortiert sind
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns:
+            df[col] = _categories_in_order_of_appearance(df[col])
+    # Mikrosekunden wie `pd.to_datetime` (Nanosekunden reichen nur für die Jahre 1677–2262)
+    for col in [TIMESTAMP_COLUMN] + DATE_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype('datetime64[us]')
+    if AGE_COLUMN in df.columns:
+        df[AGE_COLUMN] = _small_integer(df[AGE_COLUMN])
+    return df
+
+
+def _set_column(table, name, values):
+    # NaT -> null
+    return table.set_column(table.column_names.index(name), name, pa.array(values, from_pandas=True))
+
+
+def sort_categories(df):
+    """
+    Sortiert die Kategorien aller kategorialen Spalten, damit `groupby`
+    die Gruppen wie bei Textspalten alphabetisch ausgibt.
+    """
+    df = df.copy(deep=False)
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].cat.reorder_categories(sorted(df[col].cat.categories))
+    return df
+
+
+def _categories_in_order_of_appearance(series):
+    codes = series.cat.codes.to_numpy()
+    order = pd.unique(codes[codes >= 0])
+    # Nicht vorkommende Kategorien ans Ende
+    order = np.concatenate([order, np.setdiff1d(np.arange(len(series.cat.categories)), order)])
+    return series.cat.reorder_categories(series.cat.categories[order])
+
+
+def _small_integer(series):
+    """Wandelt ganzzahlige Fließkommawerte in `Int16` um (sonst unverändert)."""
+    values = series.to_numpy(dtype='float64', na_value=np.nan)
+    valid = values[~np.isnan(values)]
+    if len(valid) > 0 and (np.any(valid != np.round(valid)) or np.abs(valid).max() > np.iinfo(np.int16).max):
+        return series
+    return series.astype('Int16')
+
+
+def merge_categories(series, values, target):
+    """
+    Fasst die angegebenen Werte zu `target` zusammen
+    (wie `series.replace(values, target)`, auch für kategoriale Spalten).
+    """
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        return series.replace(values, target)
+    if target not in series.cat.categories:
+        series = series.cat.add_categories([target])
+    series = series.where(~series.isin(values), target)
+    unused = [v for v in values if v != target and v in series.cat.categories]
+    return series.cat.remove_categories(unused)
@@ -0,0 +1,60 @@
+"""
+Skript zur inkrementellen Bereinigung neuer Clickstream-Lieferungen.
+
+Bereinigt nur die noch nicht verarbeiteten Parquet-Dateien in
+data/clickstreams/ mit denselben Schritten wie II und legt sie als
+gleichnamige Dateien in data/clickstreams_filtered/ ab. Duplikate werden
+gegen den gespeicherten Index der bereits verarbeiteten Zeilen erkannt,
+die Profile der Berichte um die neuen Partitionen ergänzt
+(pipeline/incremental.py).
+
+Ausgaben:
+- data/clickstreams_filtered/<partition>.parquet (bereinigte Partitionen)
+- data/clickstreams_filtered/_state/ (Duplikatindex, Profile, Manifest)
+- scripts/outputs/clickstreams_unique_values_summary.txt,
+  clickstreams_duplicates_unique_values_summary.txt,
+  clickstreams_zero_time_unique_values_summary.txt (über alle Partitionen)
+
+Beispiele:
+    python scripts/append_clickstreams.py
+    python scripts/append_clickstreams.py --input-dir data/clickstreams --rebuild
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Projektstammverzeichnis für den Import des pipeline-Pakets
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pipeline.incremental import OUTPUT_DIR, PARTITIONS_DIR, append_partitions
+
+parser = argparse.ArgumentParser(description='Neue Clickstream-Partitionen inkrementell bereinigen.')
+parser.add_argument('--input-dir', default=PARTITIONS_DIR,
+                    help=f'Verzeichnis der Lieferungen (Standard: {PARTITIONS_DIR})')
+parser.add_argument('--output-dir', default=OUTPUT_DIR,
+                    help=f'Verzeichnis der bereinigten Partitionen (Standard: {OUTPUT_DIR})')
+parser.add_argument('--rebuild', action='store_true',
+                    help='Ausgabe und Zustand verwerfen und alle Partitionen neu verarbeiten')
+parser.add_argument('--reports-dir', default='scripts/outputs', help='Verzeichnis der Zusammenfassungen')
+args = parser.parse_args()
+
+if not os.path.isdir(args.input_dir):
+    parser.error(f"Verzeichnis der Lieferungen nicht gefunden: {args.input_dir}")
+
+start = time.perf_counter()
+state, processed = append_partitions(args.input_dir, args.output_dir, rebuild=args.rebuild)
+
+if not processed:
+    print("Keine neuen Partitionen.")
+for entry in processed:
+    print(f"{entry['name']}: {entry['rows']:,} Zeilen, {entry['duplicates']:,} Duplikate, "
+          f"{entry['rows_clean']:,} nach der Bereinigung")
+
+rows = sum(entry['rows'] for entry in state.partitions)
+rows_clean = sum(entry['rows_clean'] for entry in state.partitions)
+print(f"\nGesamt: {len(state.partitions)} Partitionen, {rows:,} Zeilen, {rows_clean:,} nach der Bereinigung")
+
+for path in state.write_reports(args.reports_dir):
+    print(f"Zusammenfassung gespeichert: {path}")
+print(f"Laufzeit: {time.perf_counter() - start:.1f} s")
@@ -0,0 +1,96 @@
+"""
+Benchmark der Pipeline-Stufen auf synthetischen Daten.
+
+Erzeugt (falls noch nicht vorhanden) je Maßstab einen synthetischen
+Datensatz unter <root>/scale-<maßstab>/ (pipeline/synth.py) und misst dort
+Laufzeit und Speicher jeder Stufe (I, II, Merkmale, III) und jedes
+Abschnitts der Notebooks (pipeline/bench.py). Die echten Daten in data/
+werden weder gelesen noch verändert.
+
+Beispiele:
+    python scripts/benchmark_stages.py --scales 0.1 1 --root /tmp/bench
+    python scripts/benchmark_stages.py --scales 0.1 --root /tmp/bench --compare alt.json
+
+Ausgabe: JSON (--out) und gleichnamige Markdown-Tabelle (.md).
+Mit --compare wird gegen ein früheres Ergebnis verglichen; bei
+Verschlechterungen endet das Skript mit Exitcode 1.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+# Projektstammverzeichnis für den Import des pipeline-Pakets
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pipeline import bench, runlog
+from pipeline.stages import PROJECT_ROOT, STAGES
+from pipeline.synth import dataset_info, write_dataset
+
+stage_names = [stage.name for stage in STAGES]
+
+parser = argparse.ArgumentParser(description='Laufzeit und Speicher der Pipeline-Stufen auf synthetischen Daten messen.')
+parser.add_argument('--scales', type=float, nargs='+', default=[0.1],
+                    help='Maßstäbe relativ zu den echten Daten (Standard: 0.1)')
+parser.add_argument('--root', required=True,
+                    help='Verzeichnis für die synthetischen Datensätze und Zwischenergebnisse')
+parser.add_argument('--stages', nargs='+', metavar='STUFE',
+                    help=f"Nur diese Stufen messen ({', '.join(stage_names)}; Standard: alle)")
+parser.add_argument('--repeat', type=int, default=1, help='Wiederholungen je Stufe (schnellster Lauf zählt)')
+parser.add_argument('--seed', type=int, default=0, help='Startwert für die Datenerzeugung')
+parser.add_argument('--keep-cache', action='store_true',
+                    help='Lade-Cache (data/.cache/) zwischen den Läufen behalten')
+parser.add_argument('--out', default='scripts/outputs/benchmark.json', help='Ergebnisdatei (JSON)')
+parser.add_argument('--compare', metavar='JSON', help='Früheres Ergebnis, gegen das verglichen wird')
+parser.add_argument('--threshold', type=float, default=bench.REGRESSION_THRESHOLD,
+                    help='Relative Verschlechterung, ab der gewarnt wird (Standard: 0.2)')
+args = parser.parse_args()
+
+unknown = [name for name in args.stages or [] if name not in stage_names]
+if unknown:
+    parser.error(f"Unbekannte Stufe(n): {', '.join(unknown)} (verfügbar: {', '.join(stage_names)})")
+if os.path.abspath(args.root) == PROJECT_ROOT:
+    parser.error('--root darf nicht das Projektverzeichnis sein (echte Daten würden überschrieben)')
+
+report = {
+    'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+    'python': platform.python_version(),
+    'machine': platform.machine(),
+    'cpus': os.cpu_count(),
+    'runs': [],
+}
+for scale in args.scales:
+    workdir = os.path.join(args.root, f'scale-{scale:g}')
+    info = dataset_info(workdir)
+    if info is None or info['scale'] != scale or info['seed'] != args.seed:
+        print(f"Erzeuge synthetische Daten (Maßstab {scale:g}) in {workdir} ...")
+        write_dataset(workdir, scale=scale, seed=args.seed)
+        info = dataset_info(workdir)
+    print(f"Maßstab {scale:g}: {info['users']:,} Benutzer, {info['events']:,} Ereignisse")
+    log = os.path.join(workdir, 'benchmark.log')
+    stages = bench.benchmark(workdir, names=args.stages, repeat=args.repeat,
+                             keep_cache=args.keep_cache, log=log)
+    report['runs'].append({'scale': scale, 'users': info['users'], 'events': info['events'], 'stages': stages})
+
+os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+with open(args.out, 'w', encoding='utf-8') as f:
+    json.dump(report, f, indent=2, ensure_ascii=False)
+markdown_path = os.path.splitext(args.out)[0] + '.md'
+with open(markdown_path, 'w', encoding='utf-8') as f:
+    f.write(bench.render_markdown(report))
+print(f"Ergebnisse gespeichert in '{args.out}' und '{markdown_path}'")
+
+if args.compare:
+    with open(args.compare, encoding='utf-8') as f:
+        baseline = json.load(f)
+    regressions = bench.compare(report, baseline, threshold=args.threshold)
+    if not regressions:
+        print(f"Keine Verschlechterung gegenüber '{args.compare}'")
+    else:
+        print(f"Verschlechterungen gegenüber '{args.compare}' (> {args.threshold:.0%}):")
+        for scale, stage, section, metric, old, new in regressions:
+            print(f"  Maßstab {scale:g} | {stage} | {section or 'gesamt'} | {metric}: "
+                  f"{old:,.2f} → {new:,.2f} ({runlog.format_change(old, new)})")
+        sys.exit(1)
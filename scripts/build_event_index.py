@@ -0,0 +1,36 @@
+"""
+Skript zum Aufbau des Ereignisindex pro Benutzer.
+
+Legt data/clickstreams_filtered.parquet (Ausgabe von II) nach Benutzer
+sortiert als speicherabbildbare Spalten-Arrays mit Offset-Index in
+data/clickstreams_events/ ab. Danach kostet das Nachschlagen der
+Ereignisse eines Benutzers einen Slice pro Spalte.
+Details: pipeline/events.py
+
+Eingabe: data/clickstreams_filtered.parquet
+Ausgabe: data/clickstreams_events/
+"""
+
+import os
+import sys
+import time
+
+# Projektstammverzeichnis für den Import des pipeline-Pakets
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pipeline.events import EVENTS_PATH, EventIndex, build_event_index
+
+start = time.perf_counter()
+num_users, num_events = build_event_index('data/clickstreams_filtered.parquet', EVENTS_PATH)
+print(f"Benutzer: {num_users:,}, Ereignisse: {num_events:,}")
+print(f"Gespeichert in '{EVENTS_PATH}' nach {time.perf_counter() - start:.1f} s")
+
+# Beispiel: Ereignisse des Benutzers mit den meisten Aktionen
+index = EventIndex(EVENTS_PATH)
+if len(index) > 0:
+    lengths = index.lengths()
+    user_id = index.user_ids()[lengths.argmax()]
+    lookup = time.perf_counter()
+    events = index.events(user_id)
+    print(f"\nBenutzer mit den meisten Ereignissen: {user_id} ({len(events):,} Ereignisse, "
+          f"nachgeschlagen in {(time.perf_counter() - lookup) * 1000:.1f} ms)")
+    print(events.head(10))
@@ -0,0 +1,40 @@
+"""
+Skript zur Berechnung der Clickstream-Merkmale pro Benutzer.
+
+Aggregiert data/clickstreams_filtered.parquet (Ausgabe von II) je
+Benutzer aus data/user_filtered.parquet (Ausgabe von I) und speichert
+die dünn besetzte Merkmalsmatrix in data/user_features.npz.
+Details: pipeline/features.py
+
+Eingabe: data/user_filtered.parquet, data/clickstreams_filtered.parquet
+Ausgabe: data/user_features.npz
+"""
+
+import os
+import sys
+import time
+
+import pandas as pd
+
+# Projektstammverzeichnis für den Import des pipeline-Pakets
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pipeline.clickstreams import load_clickstreams, TIME_COLUMN, USER_ID_COLUMN, CATEGORICAL_COLUMNS
+from pipeline.features import FEATURES_PATH, build_user_features, save_user_features
+
+start = time.perf_counter()
+
+user_ids = pd.read_parquet('data/user_filtered.parquet', columns=['user_id'])['user_id']
+df_clickstreams = load_clickstreams(
+    'data/clickstreams_filtered.parquet',
+    columns=[USER_ID_COLUMN, TIME_COLUMN] + CATEGORICAL_COLUMNS
+)
+print(f"Benutzer: {len(user_ids):,}, Ereignisse: {len(df_clickstreams):,}")
+
+matrix, feature_names = build_user_features(df_clickstreams, user_ids)
+save_user_features(FEATURES_PATH, matrix, feature_names, user_ids)
+
+users_with_events = int((matrix[:, feature_names.index('event_count')].toarray() > 0).sum())
+density = matrix.nnz / max(matrix.shape[0] * matrix.shape[1], 1)
+print(f"Merkmale: {len(feature_names):,} ({density:.2%} besetzt)")
+print(f"Benutzer mit Clickstream-Ereignissen: {users_with_events:,} von {len(user_ids):,}")
+print(f"Gespeichert in '{FEATURES_PATH}' nach {time.perf_counter() - start:.1f} s")
@@ -1,247 +1,237 @@
 # Skript zur Datenbereinigung und Fehleranalyse von clickstreams.parquet
 # Dieses Skript führt eine systematische Analyse und Bereinigung der Clickstream-Daten durch.
 #
-# Eingabedaten: data/clickstreams.parquet
+# Eingabedaten: data/clickstreams.parquet (--input)
 # Ausgaben:
-# - scripts/outputs/clickstreams_bereinigung_bericht.md (Analysebericht)
-# - data/clickstreams-filtered.parquet (bereinigte Daten)
+# - scripts/outputs/clickstreams_bereinigung_bericht.md (Analysebericht; Verzeichnis: --output-dir)
+# - scripts/outputs/clickstreams_bereinigung_bericht.stats.json (Kennzahlen des Berichts)
+# - data/clickstreams-filtered.parquet (bereinigte Daten; --output)
+#
+# Aufruf:
+#   python scripts/clean_clickstream_data.py                 (gesamte Datei im Speicher)
+#   python scripts/clean_clickstream_data.py --streaming     (stapelweise, begrenzter Speicher)
+#
+# Im Streaming-Modus wird die Datei stapelweise gelesen, bereinigt und
+# geschrieben. Die Kennzahlen des Berichts werden aus den Teilergebnissen
+# der einzelnen Stapel zusammengeführt, sodass der Speicherbedarf nicht
+# mit der Größe der Datei wächst.
 
 import numpy as np
 import pandas as pd
-import missingno as msno
 import matplotlib.pyplot as plt
+import argparse
 import os
+import sys
+
+# Projektstammverzeichnis für den Import des pipeline-Pakets
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pipeline.clickstreams import (CLICKSTREAMS_PATH, load_clickstreams, iter_clickstreams, replace_with_nan,
+                                   ClickstreamWriter, count_rows)
+from pipeline.dedup import DuplicateDetector
+from pipeline.nullity import NullityProfile, bar as plot_bar, matrix as plot_matrix
+from pipeline.profiling import DataProfile
+from pipeline.reports import ReportStats, value_count_list
+from pipeline.templates import write_report
+
+parser = argparse.ArgumentParser(description='Bereinigung von clickstreams.parquet')
+parser.add_argument('--input', default=CLICKSTREAMS_PATH,
+                    help=f'Parquet-Datei oder -Verzeichnis (Standard: {CLICKSTREAMS_PATH})')
+parser.add_argument('--output', default='data/clickstreams-filtered.parquet',
+                    help='bereinigte Daten (Standard: data/clickstreams-filtered.parquet)')
+parser.add_argument('--output-dir', default=os.path.join('scripts', 'outputs'),
+                    help='Verzeichnis für Bericht und Plots (Standard: scripts/outputs)')
+parser.add_argument('--streaming', action='store_true',
+                    help='Datei stapelweise verarbeiten (begrenzter Speicherbedarf)')
+parser.add_argument('--batch-size', type=int, default=1_000_000,
+                    help='Zeilen pro Stapel im Streaming-Modus (Standard: 1.000.000)')
+args = parser.parse_args()
+
+input_file = args.input
+output_data_file = args.output
+output_dir = args.output_dir
+
+text_cols = ['session_action_type', 'session_action_detail', 'session_device_type']
+
+
+class ClickstreamStats:
+    """Teilergebnisse pro Stapel, die zu den Kennzahlen des Berichts zusammengeführt werden."""
+
+    def __init__(self, expected_rows=None):
+        self.dtypes = None
+        # Fingerabdrücke werden bei Bedarf auf die Festplatte ausgelagert
+        # (Partitionen nach erwarteter Zeilenzahl, damit jede im Speicherlimit bleibt)
+        self.duplicates = DuplicateDetector(bits=64, expected_rows=expected_rows)
+        # Spaltenprofile vor und nach der Bereinigung (ein Durchlauf pro Spalte und Stapel)
+        self.raw = DataProfile()
+        self.clean = DataProfile()
+        # Bitmaps der fehlenden Werte nach der Bereinigung (für die Plots)
+        self.nullity = None
+        self.unk_type_and_detail = 0
+        self.unk_type_only = 0
+        self.unk_detail_only = 0
+
+    def add_raw(self, df):
+        """Kennzahlen vor der Bereinigung."""
+        if self.dtypes is None:
+            self.dtypes = df.dtypes
+        self.duplicates.add(df)
+        self.raw = self.raw.add(df)
+
+        unk_type = (df['session_action_type'] == '-unknown-')
+        unk_detail = (df['session_action_detail'] == '-unknown-')
+        self.unk_type_and_detail += int((unk_type & unk_detail).sum())
+        self.unk_type_only += int((unk_type & ~unk_detail).sum())
+        self.unk_detail_only += int((~unk_type & unk_detail).sum())
+
+    def add_clean(self, df):
+        """Kennzahlen nach der Bereinigung."""
+        self.clean = self.clean.add(df)
+        if self.nullity is None:
+            self.nullity = NullityProfile(df.columns)
+        self.nullity.add(df)
+
+    @property
+    def rows(self):
+        return self.raw.rows
+
+    @property
+    def columns(self):
+        return list(self.raw.columns)
+
+    @property
+    def memory_bytes(self):
+        """
+        Speicherbedarf der gesamten Datei als ein kompakter DataFrame, wie
+        `memory_usage(deep=True).sum()` im Speicher-Modus: die Kategorien
+        jeder Spalte zählen einmal (nicht einmal pro Stapel).
+        """
+        total = pd.RangeIndex(self.rows).memory_usage(deep=True)
+        for col, dtype in self.dtypes.items():
+            if isinstance(dtype, pd.CategoricalDtype):
+                categories = self.raw[col].counts.index.astype(dtype.categories.dtype)
+                codes = pd.Categorical.from_codes([], categories=categories).codes
+                total += self.rows * codes.itemsize + categories.memory_usage(deep=True)
+            else:
+                total += self.rows * dtype.itemsize
+        return int(total)
+
+    @property
+    def num_duplicates(self):
+        return self.duplicates.count
+
+    @property
+    def missing_before(self):
+        return self.raw.missing()
+
+    @property
+    def missing_after(self):
+        return self.clean.missing()
+
+    @property
+    def unknown_counts(self):
+        return {col: self.raw[col].sentinel_count('-unknown-') for col in text_cols}
+
 
 # Sicherstellen, dass der Output-Ordner existiert
-os.makedirs('scripts/outputs', exist_ok=True)
+os.makedirs(output_dir, exist_ok=True)
 
 # Ausgabedatei
-output_file = 'scripts/outputs/clickstreams_bereinigung_bericht.md'
-
-with open(output_file, 'w', encoding='utf-8') as f:
-    f.write("# Datenbereinigung und Fehleranalyse: clickstreams.parquet\n\n")
-    
-    # 1. Daten laden und allgemeine Inspektion
-    f.write("## 1. Daten laden und allgemeine Inspektion\n\n")
-    df_clickstreams = pd.read_parquet('data/clickstreams.parquet')
-    rows_initial = len(df_clickstreams)
-    
-    f.write(f"- **Anzahl der Zeilen**: {rows_initial:,}\n")
-    f.write(f"- **Anzahl der Spalten**: {len(df_clickstreams.columns)}\n")
-    f.write(f"- **Spalten**: {list(df_clickstreams.columns)}\n\n")
-    
-    # Speicherverbrauch
-    memory_usage = df_clickstreams.memory_usage(deep=True).sum() / 1024**2
-    f.write(f"- **Speicherverbrauch**: {memory_usage:.2f} MB\n\n")
-    
-    # Datentypen
-    f.write("### Datentypen\n\n")
-    f.write("| Spalte | Datentyp |\n")
-    f.write("|--------|----------|\n")
-    for col, dtype in df_clickstreams.dtypes.items():
-        f.write(f"| {col} | {dtype} |\n")
-    f.write("\n")
-    
-    # 2. Prüfung auf Duplikate
-    f.write("## 2. Prüfung auf Duplikate\n\n")
-    num_duplicates = df_clickstreams.duplicated().sum()
-    f.write(f"- **Anzahl der Duplikate**: {num_duplicates:,}\n")
-    
-    if num_duplicates > 0:
-        f.write(f"- **Prozentsatz**: {num_duplicates / rows_initial * 100:.2f}%\n\n")
-        f.write("⚠️ **Hinweis**: Duplikate werden beibehalten, da sie legitime wiederholte Aktionen sein könnten.\n")
-        f.write("Falls gewünscht, können Duplikate in einer späteren Analyse entfernt werden.\n\n")
-    else:
-        f.write("✅ Keine Duplikate gefunden.\n\n")
-    
-    # 3. Analyse fehlender Werte
-    f.write("## 3. Analyse fehlender Werte (vor Bereinigung)\n\n")
-    missing_before = df_clickstreams.isnull().sum()
-    missing_pct = (missing_before / rows_initial * 100).round(2)
-    
-    f.write("| Spalte | Fehlend | Prozent |\n")
-    f.write("|--------|---------|--------|\n")
-    for col in df_clickstreams.columns:
-        f.write(f"| {col} | {missing_before[col]:,} | {missing_pct[col]}% |\n")
-    f.write("\n")
-    
-    f.write("ℹ️ **Hinweis zu NaN-Werten in session_action_type und session_action_detail:**\n")
-    f.write("Diese leeren Werte (None/NaN) sind **legitim** und repräsentieren technische Anfragen an die Website.\n")
-    f.write("Sie werden nicht als Fehler betrachtet und bleiben unverändert.\n\n")
-    
-    # 4. Analyse von '-unknown-' Werten
-    f.write("## 4. Analyse von '-unknown-' Werten\n\n")
-    f.write("'-unknown-' ist ein Platzhalter für unbekannte Werte und sollte durch NaN ersetzt werden.\n\n")
-    
-    text_cols = ['session_action_type', 'session_action_detail', 'session_device_type']
-    unknown_counts = {}
-    
-    f.write("| Spalte | '-unknown-' Anzahl | Prozent |\n")
-    f.write("|--------|-------------------|--------|\n")
-    for col in text_cols:
-        count = (df_clickstreams[col] == '-unknown-').sum()
-        pct = count / rows_initial * 100
-        unknown_counts[col] = count
-        f.write(f"| {col} | {count:,} | {pct:.2f}% |\n")
-    f.write("\n")
-    
-    # Korrelation von -unknown- Werten
-    f.write("### Korrelation von '-unknown-' Werten\n\n")
-    unk_type = (df_clickstreams['session_action_type'] == '-unknown-')
-    unk_detail = (df_clickstreams['session_action_detail'] == '-unknown-')
-    unk_device = (df_clickstreams['session_device_type'] == '-unknown-')
-    
-    f.write(f"- session_action_type UND session_action_detail sind '-unknown-': {(unk_type & unk_detail).sum():,}\n")
-    f.write(f"- NUR session_action_type ist '-unknown-': {(unk_type & ~unk_detail).sum():,}\n")
-    f.write(f"- NUR session_action_detail ist '-unknown-': {(~unk_type & unk_detail).sum():,}\n")
-    f.write(f"- session_device_type ist '-unknown-': {unk_device.sum():,}\n\n")
-    
-    # 5. Bereinigung: '-unknown-' durch NaN ersetzen
-    f.write("## 5. Bereinigung durchführen\n\n")
-    f.write("### 5.1 '-unknown-' durch NaN ersetzen\n\n")
-    
-    for col in text_cols:
-        count_before = (df_clickstreams[col] == '-unknown-').sum()
-        df_clickstreams[col] = df_clickstreams[col].replace('-unknown-', np.nan)
-        count_after = (df_clickstreams[col] == '-unknown-').sum()
-        f.write(f"- **{col}**: {count_before:,} Werte ersetzt\n")
-    f.write("\n")
-    
-    # 6. Analyse der Spalten nach Bereinigung
-    f.write("## 6. Analyse der Spalten nach Bereinigung\n\n")
-    
-    # session_action
-    f.write("### session_action\n\n")
-    f.write(f"- **Eindeutige Werte**: {df_clickstreams['session_action'].nunique()}\n")
-    f.write(f"- **Fehlende Werte**: {df_clickstreams['session_action'].isna().sum():,}\n\n")
-    
-    f.write("**Top 10 häufigste Werte:**\n\n")
-    action_counts = df_clickstreams['session_action'].value_counts().head(10)
-    f.write("| Aktion | Anzahl | Prozent |\n")
-    f.write("|--------|--------|--------|\n")
-    for val, count in action_counts.items():
-        pct = count / rows_initial * 100
-        f.write(f"| {val} | {count:,} | {pct:.2f}% |\n")
-    f.write("\n")
-    
-    # session_action_type
-    f.write("### session_action_type\n\n")
-    f.write(f"- **Eindeutige Werte**: {df_clickstreams['session_action_type'].nunique()}\n")
-    f.write(f"- **Fehlende Werte**: {df_clickstreams['session_action_type'].isna().sum():,}\n\n")
-    
-    type_counts = df_clickstreams['session_action_type'].value_counts(dropna=False)
-    f.write("| Typ | Anzahl | Prozent |\n")
-    f.write("|-----|--------|--------|\n")
-    for val, count in type_counts.items():
-        pct = count / rows_initial * 100
-        val_str = str(val) if pd.notna(val) else "NaN"
-        f.write(f"| {val_str} | {count:,} | {pct:.2f}% |\n")
-    f.write("\n")
-    
-    # session_action_detail
-    f.write("### session_action_detail\n\n")
-    f.write(f"- **Eindeutige Werte**: {df_clickstreams['session_action_detail'].nunique()}\n")
-    f.write(f"- **Fehlende Werte**: {df_clickstreams['session_action_detail'].isna().sum():,}\n\n")
-    
-    detail_counts = df_clickstreams['session_action_detail'].value_counts().head(10)
-    f.write("**Top 10 häufigste Werte:**\n\n")
-    f.write("| Detail | Anzahl | Prozent |\n")
-    f.write("|--------|--------|--------|\n")
-    for val, count in detail_counts.items():
-        pct = count / rows_initial * 100
-        f.write(f"| {val} | {count:,} | {pct:.2f}% |\n")
-    f.write("\n")
-    
-    # session_device_type
-    f.write("### session_device_type\n\n")
-    f.write(f"- **Eindeutige Werte**: {df_clickstreams['session_device_type'].nunique()}\n")
-    f.write(f"- **Fehlende Werte**: {df_clickstreams['session_device_type'].isna().sum():,}\n\n")
-    
-    device_counts = df_clickstreams['session_device_type'].value_counts(dropna=False)
-    f.write("| Gerät | Anzahl | Prozent |\n")
-    f.write("|-------|--------|--------|\n")
-    for val, count in device_counts.items():
-        pct = count / rows_initial * 100
-        val_str = str(val) if pd.notna(val) else "NaN"
-        f.write(f"| {val_str} | {count:,} | {pct:.2f}% |\n")
-    f.write("\n")
-    
-    # time_passed_in_seconds
-    f.write("### time_passed_in_seconds\n\n")
-    time_col = df_clickstreams['time_passed_in_seconds']
-    f.write(f"- **Fehlende Werte**: {time_col.isna().sum():,}\n")
-    f.write(f"- **Min**: {time_col.min()}\n")
-    f.write(f"- **Max**: {time_col.max()}\n")
-    f.write(f"- **Mittelwert**: {time_col.mean():.2f}\n")
-    f.write(f"- **Median**: {time_col.median():.2f}\n")
-    f.write(f"- **Standardabweichung**: {time_col.std():.2f}\n\n")
-    
-    # Extreme Werte
-    extreme_time = time_col > 1000000  # > 11 Tage
-    f.write(f"⚠️ **Extreme Werte (> 1.000.000 Sekunden / 11+ Tage)**: {extreme_time.sum():,}\n\n")
-    
-    # session_user_id
-    f.write("### session_user_id\n\n")
-    f.write(f"- **Eindeutige Benutzer**: {df_clickstreams['session_user_id'].nunique():,}\n")
-    f.write(f"- **Fehlende Werte**: {df_clickstreams['session_user_id'].isna().sum():,}\n\n")
-    
-    # 7. Fehlende Werte nach Bereinigung
-    f.write("## 7. Fehlende Werte nach Bereinigung\n\n")
-    missing_after = df_clickstreams.isnull().sum()
-    missing_pct_after = (missing_after / rows_initial * 100).round(2)
-    
-    f.write("| Spalte | Fehlend | Prozent |\n")
-    f.write("|--------|---------|--------|\n")
-    for col in df_clickstreams.columns:
-        f.write(f"| {col} | {missing_after[col]:,} | {missing_pct_after[col]}% |\n")
-    f.write("\n")
-    
-    # 8. Zusammenfassung
-    f.write("## 8. Zusammenfassung\n\n")
-    f.write(f"- **Ursprüngliche Anzahl der Zeilen**: {rows_initial:,}\n")
-    f.write(f"- **Finale Anzahl der Zeilen**: {len(df_clickstreams):,}\n")
-    f.write(f"- **Anzahl der Spalten**: {len(df_clickstreams.columns)}\n\n")
-    
-    f.write("### Durchgeführte Bereinigungen:\n\n")
-    f.write("1. ✅ '-unknown-' in session_action_type durch NaN ersetzt\n")
-    f.write("2. ✅ '-unknown-' in session_action_detail durch NaN ersetzt\n")
-    f.write("3. ✅ '-unknown-' in session_device_type durch NaN ersetzt\n\n")
-    
-    f.write("### Legitime NaN-Werte (keine Bereinigung notwendig):\n\n")
-    f.write("- NaN in session_action_type und session_action_detail: Technische Anfragen\n")
-    f.write("- Diese Werte wurden **nicht** als Fehler behandelt\n\n")
-    
-    f.write("### Hinweise für weitere Analyse:\n\n")
-    f.write("- Duplikate wurden beibehalten (könnten legitime wiederholte Aktionen sein)\n")
-    f.write("- Extreme Zeitwerte wurden beibehalten (zur weiteren Untersuchung)\n")
-    f.write("- Fehlende session_user_id könnten auf anonyme Sitzungen hinweisen\n")
-    f.write("- Fehlende session_action könnten auf unvollständige Protokollierung hinweisen\n\n")
-
-print("Bericht erstellt: scripts/outputs/clickstreams_bereinigung_bericht.md")
-
-# 9. Visualisierung fehlender Werte mit missingno
+output_file = os.path.join(output_dir, 'clickstreams_bereinigung_bericht.md')
+
+# Daten laden, bereinigen und schreiben (ein Stapel im Speicher-Modus)
+stats = ClickstreamStats(expected_rows=count_rows(input_file))
+if args.streaming:
+    # Kompakte Darstellung, aber nur ein Stapel gleichzeitig im Speicher
+    batches = iter_clickstreams(input_file, batch_size=args.batch_size)
+else:
+    # Kompakte Darstellung: Kategorien statt Objektspalten, float32 für die Zeitspalte (sofern exakt)
+    batches = [load_clickstreams(input_file)]
+
+with ClickstreamWriter(output_data_file) as writer:
+    for df_clickstreams in batches:
+        stats.add_raw(df_clickstreams)
+
+        # Bereinigung: '-unknown-' durch NaN ersetzen
+        for col in text_cols:
+            df_clickstreams[col] = replace_with_nan(df_clickstreams[col], '-unknown-')
+
+        stats.add_clean(df_clickstreams)
+        writer.write(df_clickstreams)
+
+stats.duplicates.close()
+rows_initial = stats.rows
+
+# Kennzahlen des Berichts; Text und Layout stehen in der Vorlage 'clickstream_cleaning' (pipeline/templates.py)
+report = ReportStats('clickstream_cleaning')
+report['rows'] = rows_initial
+report['columns'] = stats.columns
+report['memory_mb'] = stats.memory_bytes / 1024**2
+report['dtypes'] = [[col, str(dtype)] for col, dtype in stats.dtypes.items()]
+report['num_duplicates'] = stats.num_duplicates
+
+# Fehlende Werte vor und nach der Bereinigung: [Spalte, Anzahl, Prozent]
+for key, missing in [('missing_before', stats.missing_before), ('missing_after', stats.missing_after)]:
+    missing_pct = (missing / rows_initial * 100).round(2)
+    report[key] = [[col, int(missing[col]), float(missing_pct[col])] for col in stats.columns]
+
+report['unknown_counts'] = [[col, count] for col, count in stats.unknown_counts.items()]
+report['unk_type_and_detail'] = stats.unk_type_and_detail
+report['unk_type_only'] = stats.unk_type_only
+report['unk_detail_only'] = stats.unk_detail_only
+
+# Spalten nach der Bereinigung: Aktion und Detail mit den 10 häufigsten Werten, Typ und Gerät vollständig
+clean_columns = {}
+for col, top in [('session_action', 10), ('session_action_type', None),
+                 ('session_action_detail', 10), ('session_device_type', None)]:
+    profile = stats.clean[col]
+    counts = profile.top(top) if top is not None else profile.value_counts(dropna=False)
+    clean_columns[col] = {'nunique': profile.nunique, 'missing': profile.missing, 'top': top,
+                          'values': value_count_list(counts)}
+
+# Statistiken exakt aus den Häufigkeiten der Zeitwerte
+time_profile = stats.clean['time_passed_in_seconds']
+clean_columns['time_passed_in_seconds'] = {
+    'missing': time_profile.missing,
+    'min': time_profile.min,
+    'max': time_profile.max,
+    'mean': time_profile.mean,
+    'median': time_profile.median,
+    'std': time_profile.std,
+    # Extreme Werte: > 11 Tage
+    'extreme': time_profile.counts[time_profile.counts.index > 1000000].sum(),
+}
+clean_columns['session_user_id'] = {'nunique': stats.clean['session_user_id'].nunique,
+                                    'missing': stats.clean['session_user_id'].missing}
+report['clean_columns'] = clean_columns
+
+write_report(report, output_file)
+
+print(f"Bericht erstellt: {output_file}")
+
+# 9. Visualisierung fehlender Werte aus den Bitmaps aller Zeilen (auch im Streaming-Modus)
 print("Erstelle Visualisierungen...")
 
 # Matrix-Plot
 fig, ax = plt.subplots(figsize=(12, 6))
-msno.matrix(df_clickstreams, ax=ax, sparkline=False)
+plot_matrix(stats.nullity, ax=ax)
 ax.set_title('Matrix fehlender Werte in clickstreams.parquet', fontsize=14, pad=20)
 plt.tight_layout()
-plt.savefig('scripts/outputs/clickstreams_missing_matrix.png', dpi=150)
+matrix_file = os.path.join(output_dir, 'clickstreams_missing_matrix.png')
+plt.savefig(matrix_file, dpi=150)
 plt.close()
-print("Matrix-Plot erstellt: scripts/outputs/clickstreams_missing_matrix.png")
+print(f"Matrix-Plot erstellt: {matrix_file}")
 
 # Bar-Plot
 fig, ax = plt.subplots(figsize=(12, 6))
-msno.bar(df_clickstreams, ax=ax)
+plot_bar(stats.nullity, ax=ax)
 ax.set_title('Vollständigkeit der Daten pro Spalte', fontsize=14, pad=20)
 plt.tight_layout()
-plt.savefig('scripts/outputs/clickstreams_missing_bar.png', dpi=150)
+bar_file = os.path.join(output_dir, 'clickstreams_missing_bar.png')
+plt.savefig(bar_file, dpi=150)
 plt.close()
-print("Bar-Plot erstellt: scripts/outputs/clickstreams_missing_bar.png")
+print(f"Bar-Plot erstellt: {bar_file}")
 
-# 10. Bereinigte Daten speichern
-df_clickstreams.to_parquet('data/clickstreams-filtered.parquet', index=False)
-print(f"Bereinigte Daten gespeichert: data/clickstreams-filtered.parquet")
+# 10. Bereinigte Daten wurden bereits stapelweise geschrieben
+print(f"Bereinigte Daten gespeichert: {output_data_file}")
 
 print("\nDatenbereinigung abgeschlossen!")
@@ -0,0 +1,38 @@
+"""
+Skript zur Erzeugung synthetischer Daten für Benchmarks und Tests.
+
+Erzeugt user.csv und clickstreams.parquet mit dem Schema und den
+Verteilungen der echten Daten in einem wählbaren Maßstab
+(1.0 = 213.451 Benutzer / 10.567.737 Ereignisse). Details: pipeline/synth.py
+
+Beispiel:
+    python scripts/generate_synthetic_data.py --scale 0.1 --out /tmp/synth_0.1
+
+Ausgabe: <out>/data/user.csv, <out>/data/clickstreams.parquet
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Projektstammverzeichnis für den Import des pipeline-Pakets
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pipeline.synth import write_dataset
+
+parser = argparse.ArgumentParser(description='Synthetische user.csv und clickstreams.parquet erzeugen.')
+parser.add_argument('--scale', type=float, default=0.1,
+                    help='Maßstab relativ zu den echten Daten (Standard: 0.1)')
+parser.add_argument('--out', required=True,
+                    help='Zielverzeichnis (die Dateien werden in <out>/data/ abgelegt)')
+parser.add_argument('--seed', type=int, default=0, help='Startwert des Zufallsgenerators')
+args = parser.parse_args()
+
+if os.path.abspath(args.out) == os.path.dirname(os.path.dirname(os.path.abspath(__file__))):
+    parser.error('--out darf nicht das Projektverzeichnis sein (echte Daten würden überschrieben)')
+
+start = time.perf_counter()
+num_users, num_events = write_dataset(args.out, scale=args.scale, seed=args.seed)
+print(f"Benutzer: {num_users:,}")
+print(f"Clickstream-Zeilen: {num_events:,}")
+print(f"Gespeichert in '{os.path.join(args.out, 'data')}' nach {time.perf_counter() - start:.1f} s")
@@ -0,0 +1,56 @@
+"""
+Skript zum Rendern aller Abbildungen der Notebooks ohne Bildschirm.
+
+Führt die angegebenen Notebook-Skripte (Standard: III-user_EDA.py) aus,
+sammelt dabei alle Abbildungen als Aufträge (pipeline/figures.py),
+statt sie einzeln zu zeichnen, und rendert sie anschließend im
+Prozesspool mit dem Agg-Backend nach scripts/outputs/. Abbildungen,
+deren Daten und Code sich seit dem letzten Lauf nicht geändert haben,
+werden übersprungen.
+
+Beispiel:
+    python scripts/render_figures.py
+    python scripts/render_figures.py I-filter_user_data.py III-user_EDA.py --formats png,svg
+    python scripts/render_figures.py --workers 4 --force
+"""
+
+import argparse
+import os
+import runpy
+import sys
+import time
+
+import matplotlib
+matplotlib.use('Agg')  # ohne Bildschirm zeichnen
+
+# Projektstammverzeichnis für den Import des pipeline-Pakets
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pipeline import figures
+
+parser = argparse.ArgumentParser(description='Abbildungen der Notebooks im Stapel rendern.')
+parser.add_argument('scripts', nargs='*', default=['III-user_EDA.py'],
+                    help='Notebook-Skripte (Standard: III-user_EDA.py)')
+parser.add_argument('--formats', default=','.join(figures.FORMATS),
+                    help='Dateiformate, kommagetrennt (z. B. png,svg)')
+parser.add_argument('--dpi', type=int, default=figures.DPI, help='Auflösung der Rastergrafiken')
+parser.add_argument('--workers', type=int, default=None, help='Anzahl der Prozesse (Standard: Anzahl der CPUs)')
+parser.add_argument('--output-dir', default=figures.OUTPUT_DIR, help='Ausgabeverzeichnis')
+parser.add_argument('--force', action='store_true', help='Alle Abbildungen neu rendern')
+args = parser.parse_args()
+
+jobs = []
+for script in args.scripts:
+    print(f"Führe {script} aus...")
+    start = time.perf_counter()
+    with figures.collect() as batch:
+        runpy.run_path(script, run_name='__main__')
+    jobs.extend(batch)
+    print(f"  {len(batch)} Abbildungen gesammelt ({time.perf_counter() - start:.1f} s)")
+
+start = time.perf_counter()
+rendered, skipped = figures.render(jobs, output_dir=args.output_dir, formats=args.formats.split(','),
+                                   dpi=args.dpi, workers=args.workers, force=args.force)
+print(f"\n{len(rendered)} Abbildungen gerendert, {len(skipped)} unverändert "
+      f"({time.perf_counter() - start:.1f} s) → {args.output_dir}")
+for name in rendered:
+    print(f"  ✓ {name}")
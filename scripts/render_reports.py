@@ -0,0 +1,50 @@
+"""
+Skript zur Neuerzeugung der Berichte aus gespeicherten Kennzahlen.
+
+Liest alle `*.stats.json` in scripts/outputs/ (bzw. die angegebenen
+Dateien) und schreibt den zugehörigen Bericht (`*.md`) mit der Vorlage
+aus pipeline/templates.py neu. Die Daten werden dabei nicht geladen;
+nach einer Änderung an Wortlaut oder Layout einer Vorlage genügt dieser
+Aufruf. Die Kennzahlen entstehen beim ersten Lauf der Bereinigungsskripte
+(siehe REPORT_SOURCES); fehlen sie (z. B. in einem frischen Checkout),
+nennt das Skript die auszuführenden Befehle und endet mit Exitcode 1.
+
+Beispiel:
+    python scripts/render_reports.py
+    python scripts/render_reports.py scripts/outputs/datenbereinigung_bericht.stats.json
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+
+# Projektstammverzeichnis für den Import des pipeline-Pakets
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pipeline.reports import STATS_SUFFIX
+from pipeline.templates import render_saved
+
+# Bericht: Befehl, der seine Kennzahlen erzeugt
+REPORT_SOURCES = {
+    'datenbereinigung_bericht.md': 'python -m pipeline clean-users',
+    'clickstreams_bereinigung_bericht.md': 'python -m pipeline clean-clickstreams',
+    'user_csv_fehler_bericht.md': 'python -m pipeline errors',
+}
+
+parser = argparse.ArgumentParser(description='Berichte aus gespeicherten Kennzahlen neu erzeugen.')
+parser.add_argument('files', nargs='*', help=f'Kennzahlendateien (Standard: scripts/outputs/*{STATS_SUFFIX})')
+args = parser.parse_args()
+
+files = args.files or sorted(glob.glob(os.path.join('scripts', 'outputs', f'*{STATS_SUFFIX}')))
+if not files:
+    print(f"Keine Kennzahlendateien (*{STATS_SUFFIX}) in scripts/outputs/ gefunden.")
+    print("Die Kennzahlen entstehen beim ersten Lauf der Bereinigungsskripte; zuerst ausführen:")
+    for report, command in REPORT_SOURCES.items():
+        print(f"  {command:<40} ({report})")
+    sys.exit(1)
+
+for stats_file in files:
+    start = time.perf_counter()
+    path = render_saved(stats_file)
+    print(f"{path} ({(time.perf_counter() - start) * 1000:.1f} ms)")
@@ -0,0 +1,24 @@
+"""
+Führt die Pipeline I → II → III mit Stufen-Cache aus.
+
+Eine Stufe wird nur ausgeführt, wenn sich ihre Eingaben, ihr Code oder
+ihre Parameter (pipeline/config.py) seit dem letzten Lauf geändert haben
+oder ihre Ausgaben fehlen. Details: pipeline/stages.py
+
+Beispiele:
+    python scripts/run_pipeline.py              # alle Stufen
+    python scripts/run_pipeline.py eda          # III (und ggf. I)
+    python scripts/run_pipeline.py --dry-run    # nur Status anzeigen
+    python scripts/run_pipeline.py users --force
+    python -m pipeline run --dry-run            # dasselbe über den gemeinsamen Einstiegspunkt
+"""
+
+import os
+import sys
+
+# Projektstammverzeichnis für den Import des pipeline-Pakets
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pipeline.cli import main
+
+# Gleichbedeutend mit `python -m pipeline run ...` (pipeline/cli.py)
+sys.exit(main(['run'] + sys.argv[1:]))
@@ -0,0 +1,60 @@
+"""
+Skript zur Zusammenfassung des Laufprotokolls (pipeline/runlog.py).
+
+Zeigt je Skript den letzten Lauf aus scripts/outputs/run_log.jsonl als
+Tabelle (Laufzeit, CPU-Zeit, Spitzenspeicher, Zeilen, gelesene und
+geschriebene Bytes je Schritt) und vergleicht ihn Schritt für Schritt
+mit dem vorherigen Lauf desselben Skripts. Schritte, die langsamer
+geworden sind oder mehr Speicher brauchen, werden mit den Zeilenzahlen
+beider Läufe aufgelistet (z. B. nach einer Datenaktualisierung); dann
+endet das Skript mit Exitcode 1.
+
+Beispiel:
+    python scripts/summarize_run_log.py
+    python scripts/summarize_run_log.py --stage II-filter_clickstreams_data --threshold 0.5
+"""
+
+import argparse
+import os
+import sys
+
+# Projektstammverzeichnis für den Import des pipeline-Pakets
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pipeline import runlog
+
+parser = argparse.ArgumentParser(description='Laufprotokoll der Pipeline-Schritte zusammenfassen.')
+parser.add_argument('--log', default=runlog.log_path() or runlog.RUN_LOG_PATH,
+                    help=f'Laufprotokoll (Standard: {runlog.RUN_LOG_PATH})')
+parser.add_argument('--stage', default=None, help='nur dieses Skript (Name ohne .py)')
+parser.add_argument('--threshold', type=float, default=runlog.REGRESSION_THRESHOLD,
+                    help='relative Veränderung, ab der ein Schritt als verschlechtert gilt')
+parser.add_argument('--min-seconds', type=float, default=runlog.MIN_SECONDS,
+                    help='kürzere Schritte beim Zeitvergleich ignorieren')
+args = parser.parse_args()
+
+if not os.path.exists(args.log):
+    sys.exit(f"Kein Laufprotokoll gefunden: {args.log}")
+
+latest = runlog.latest_runs(runlog.read_runs(args.log), stage=args.stage)
+if not latest:
+    sys.exit(f"Keine Läufe{f' von {args.stage}' if args.stage else ''} in {args.log}")
+
+found_regressions = False
+for stage, (run, previous) in latest.items():
+    print(runlog.render_markdown(run, previous))
+    print()
+    if previous is None:
+        print("Kein vorheriger Lauf zum Vergleich.\n")
+        continue
+    regressions = runlog.compare(run, previous, threshold=args.threshold, min_seconds=args.min_seconds)
+    if not regressions:
+        print(f"Keine Verschlechterung gegenüber Lauf {previous['run']}.\n")
+        continue
+    found_regressions = True
+    print(f"Verschlechterungen gegenüber Lauf {previous['run']} (> {args.threshold:.0%}):")
+    for step, metric, old, new, old_rows, new_rows in regressions:
+        rows = '' if old_rows is None or new_rows is None else f" | Zeilen ein {old_rows:,} → {new_rows:,}"
+        print(f"  {step} | {metric}: {old:,.2f} → {new:,.2f} ({runlog.format_change(old, new)}){rows}")
+    print()
+
+sys.exit(1 if found_regressions else 0)
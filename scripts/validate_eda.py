@@ -3,13 +3,28 @@ Validierungsskript für EDA.py
 
 Dieses Skript führt eine schnelle Validierung der Hauptschritte aus EDA.py durch,
 um sicherzustellen, dass der Code korrekt funktioniert.
+
+Eingabe: data/user.csv (--input)
 """
 
+import argparse
 import numpy as np
 import pandas as pd
 import sys
 import os
 
+# Projektstammverzeichnis für den Import des pipeline-Pakets
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pipeline import config
+from pipeline.rules import evaluate as evaluate_rules, normalize_gender
+from pipeline.users import USER_PATH, load_users
+
+parser = argparse.ArgumentParser(description='Schnelle Validierung der Hauptschritte der EDA')
+parser.add_argument('--input', default=USER_PATH, help=f'user.csv (Standard: {USER_PATH})')
+args = parser.parse_args()
+# Relativ zum Aufrufverzeichnis, vor dem Wechsel ins Projektstammverzeichnis
+input_file = os.path.abspath(args.input) if args.input != USER_PATH else USER_PATH
+
 # Zum Projektstammverzeichnis wechseln (falls notwendig)
 script_dir = os.path.dirname(os.path.abspath(__file__))
 project_root = os.path.dirname(script_dir)
@@ -24,73 +39,48 @@ print("=" * 80)
 try:
     # 1. Daten laden
     print("\n1. Daten laden...")
-    df_user = pd.read_csv('data/user.csv')
+    df_user = load_users(input_file)
     print(f"   ✓ {len(df_user)} Zeilen, {len(df_user.columns)} Spalten geladen")
 
+    # Alle Prüfregeln in einem Durchlauf; Zeilen werden erst nach Schritt 6 entfernt
+    pruefung = evaluate_rules(df_user)
+
     # 2. Duplikate prüfen
     print("\n2. Duplikatsprüfung...")
-    anzahl_duplikate = df_user.duplicated().sum()
+    anzahl_duplikate = pruefung.count('duplicates')
     print(f"   ✓ {anzahl_duplikate} Duplikate gefunden")
     if anzahl_duplikate > 0:
-        df_user = df_user.drop_duplicates()
-        print(f"   ✓ Duplikate entfernt. Neue Zeilenanzahl: {len(df_user)}")
+        print(f"   ✓ Duplikate markiert. Neue Zeilenanzahl: {pruefung.keep_mask(through='duplicates').sum()}")
 
-    # 3. Datumskonvertierung
+    # 3. Datumsfelder (bereits beim Laden dekodiert)
     print("\n3. Datumskonvertierung...")
-    df_user['first_active_timestamp'] = pd.to_datetime(
-        df_user['first_active_timestamp'], 
-        format='%Y%m%d%H%M%S', 
-        errors='coerce'
-    )
     df_user['first_active_date'] = df_user['first_active_timestamp'].dt.normalize()
-    df_user['account_created_date'] = pd.to_datetime(
-        df_user['account_created_date'], 
-        format='%Y-%m-%d', 
-        errors='coerce'
-    )
-    df_user['first_booking_date'] = pd.to_datetime(
-        df_user['first_booking_date'], 
-        format='%Y-%m-%d', 
-        errors='coerce'
-    )
     print("   ✓ Datumsfelder konvertiert")
 
     # 4. Datumsreihenfolge prüfen
     print("\n4. Datumsreihenfolge prüfen...")
-    zeilen_vorher = len(df_user)
-    fehler1 = (df_user['first_active_date'].notna()) & \
-              (df_user['account_created_date'].notna()) & \
-              (df_user['first_active_date'] > df_user['account_created_date'])
-    fehler2 = (df_user['account_created_date'].notna()) & \
-              (df_user['first_booking_date'].notna()) & \
-              (df_user['account_created_date'] > df_user['first_booking_date'])
-    datum_fehler = fehler1 | fehler2
-    anzahl_datum_fehler = datum_fehler.sum()
+    anzahl_datum_fehler = pruefung.count('date_order')
     print(f"   ✓ {anzahl_datum_fehler} Datumsreihenfolgefehler gefunden")
     if anzahl_datum_fehler > 0:
-        df_user = df_user[~datum_fehler]
-        print(f"   ✓ Fehlerhafte Zeilen entfernt: {zeilen_vorher} → {len(df_user)}")
+        print(f"   ✓ Fehlerhafte Zeilen markiert: {pruefung.keep_mask(through='duplicates').sum()} → "
+              f"{pruefung.keep_mask(through='date_order').sum()}")
 
     # 5. user_gender bereinigen
     print("\n5. user_gender bereinigen...")
-    df_user['user_gender'] = df_user['user_gender'].str.lower()
-    ungueltige_gender = ~df_user['user_gender'].isin(['female', 'male', 'other']) & df_user['user_gender'].notna()
-    anzahl_ungueltige = ungueltige_gender.sum()
+    anzahl_ungueltige = pruefung.count('gender_invalid')
     print(f"   ✓ {anzahl_ungueltige} ungültige Werte gefunden")
-    df_user.loc[~df_user['user_gender'].isin(['female', 'male', 'other']), 'user_gender'] = np.nan
+    df_user['user_gender'] = normalize_gender(df_user['user_gender'], invalid_to_nan=True)
     print("   ✓ user_gender bereinigt")
 
     # 6. Altersfilterung
     print("\n6. Altersfilterung...")
     zeilen_vorher = len(df_user)
-    alter_zu_jung = df_user['user_age'] < 18
-    alter_zu_alt = df_user['user_age'] > 90
-    unrealistisches_alter = alter_zu_jung | alter_zu_alt
-    anzahl_unrealistisch = unrealistisches_alter.sum()
-    print(f"   ✓ {anzahl_unrealistisch} unrealistische Altersangaben gefunden")
-    if anzahl_unrealistisch > 0:
-        df_user = df_user[~unrealistisches_alter]
-        print(f"   ✓ Zeilen entfernt: {zeilen_vorher} → {len(df_user)}")
+    anzahl_unrealistisch = pruefung.count('age')
+    print(f"   ✓ {anzahl_unrealistisch} unrealistische Altersangaben "
+          f"(< {config.AGE_MIN} oder > {config.AGE_MAX}) gefunden")
+    # Alle markierten Zeilen (Duplikate, Datumsreihenfolge, Alter) auf einmal entfernen
+    df_user = pruefung.apply(df_user)
+    print(f"   ✓ Markierte Zeilen entfernt: {zeilen_vorher} → {len(df_user)}")
 
     # 7. Eindeutige Werte prüfen (kurze Version)
     print("\n7. Eindeutige Werte prüfen...")
@@ -102,12 +92,8 @@ try:
 
     # 8. Abhängigkeit first_booking_date ↔ destination_country
     print("\n8. Abhängigkeit first_booking_date ↔ destination_country...")
-    keine_buchung_aber_destination = (df_user['first_booking_date'].isna()) & \
-                                      (df_user['destination_country'] != 'NDF')
-    buchung_aber_ndf = (df_user['first_booking_date'].notna()) & \
-                       (df_user['destination_country'] == 'NDF')
-    anzahl_fall1 = keine_buchung_aber_destination.sum()
-    anzahl_fall2 = buchung_aber_ndf.sum()
+    anzahl_fall1 = pruefung.count('no_booking_but_destination')
+    anzahl_fall2 = pruefung.count('booking_but_ndf')
     print(f"   ✓ Fall 1 (keine Buchung, aber destination != NDF): {anzahl_fall1}")
     print(f"   ✓ Fall 2 (Buchung, aber destination = NDF): {anzahl_fall2}")
 
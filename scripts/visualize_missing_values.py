@@ -1,51 +1,49 @@
 """
 Skript zur Visualisierung fehlender Werte in user.csv
 
-Dieses Skript erstellt Visualisierungen der fehlenden Werte mit missingno:
+Dieses Skript erstellt Visualisierungen der fehlenden Werte (pipeline/nullity.py):
 - Matrix-Plot
 - Bar-Plot
 - Heatmap (Korrelation fehlender Werte)
 
-Eingabe: Bereinigte user.csv Daten (nach clean_user_data.py)
-Ausgabe: PNG-Dateien in scripts/outputs/
+Eingabe: Bereinigte user.csv Daten (nach clean_user_data.py; --input)
+Ausgabe: PNG-Dateien in scripts/outputs/ (--output-dir; unveränderte Abbildungen werden
+nicht neu gezeichnet, siehe pipeline/figures.py)
 """
 
+import argparse
 import pandas as pd
 import numpy as np
 import matplotlib
 matplotlib.use('Agg')  # Non-interactive backend
 import matplotlib.pyplot as plt
-import missingno as msno
 import os
+import sys
+
+# Projektstammverzeichnis für den Import des pipeline-Pakets
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pipeline import figures, nullity, plots
+from pipeline.users import USER_PATH, load_users
+
+parser = argparse.ArgumentParser(description='Visualisierung fehlender Werte in user.csv')
+parser.add_argument('--input', default=USER_PATH, help=f'user.csv (Standard: {USER_PATH})')
+parser.add_argument('--output-dir', default=figures.OUTPUT_DIR,
+                    help=f'Verzeichnis für die Abbildungen (Standard: {figures.OUTPUT_DIR})')
+args = parser.parse_args()
 
 # Ausgabeverzeichnis erstellen
-os.makedirs('scripts/outputs', exist_ok=True)
+os.makedirs(args.output_dir, exist_ok=True)
 
 print("Lade und bereinigte Daten...")
 
 # Daten laden
-df_user = pd.read_csv('data/user.csv')
+df_user = load_users(args.input)
 
 # Duplikate entfernen
 df_user = df_user.drop_duplicates()
 
-# Datumskonvertierung
-df_user['first_active_timestamp'] = pd.to_datetime(
-    df_user['first_active_timestamp'], 
-    format='%Y%m%d%H%M%S', 
-    errors='coerce'
-)
+# Datumsfelder sind bereits beim Laden dekodiert
 df_user['first_active_date'] = df_user['first_active_timestamp'].dt.normalize()
-df_user['account_created_date'] = pd.to_datetime(
-    df_user['account_created_date'], 
-    format='%Y-%m-%d', 
-    errors='coerce'
-)
-df_user['first_booking_date'] = pd.to_datetime(
-    df_user['first_booking_date'], 
-    format='%Y-%m-%d', 
-    errors='coerce'
-)
 
 # Datumsreihenfolge-Validierung
 error1 = (df_user['first_active_date'].notna()) & \
@@ -61,47 +59,32 @@ df_user['user_gender'] = df_user['user_gender'].str.lower()
 df_user.loc[~df_user['user_gender'].isin(['female', 'male', 'other']), 'user_gender'] = np.nan
 
 # Altersfilterung
-df_user = df_user[~((df_user['user_age'] < 18) | (df_user['user_age'] > 90))]
+df_user = df_user[~((df_user['user_age'] < 18) | (df_user['user_age'] > 90)).fillna(False)]
 
 print(f"Bereinigte Daten: {len(df_user)} Zeilen")
 
-# Fehlende Werte analysieren
-missing_count = df_user.isnull().sum().sum()
+# Fehlende Werte analysieren (Bitmaps pro Spalte)
+nulls = nullity.NullityProfile.from_frame(df_user)
+missing_count = nulls.missing().sum()
 print(f"Fehlende Werte gesamt: {missing_count}")
 
 if missing_count > 0:
     print("\nErstelle Visualisierungen...")
-    
-    # 1. Matrix-Plot
-    print("  - Matrix-Plot...")
-    fig = plt.figure(figsize=(12, 6))
-    msno.matrix(df_user, sparkline=False, figsize=(12, 6))
-    plt.title('Matrix fehlender Werte in user.csv', fontsize=14, pad=20)
-    plt.tight_layout()
-    plt.savefig('scripts/outputs/missing_values_matrix.png', dpi=150, bbox_inches='tight')
-    plt.close()
-    print("    ✓ Gespeichert: scripts/outputs/missing_values_matrix.png")
-    
-    # 2. Bar-Plot
-    print("  - Bar-Plot...")
-    fig = plt.figure(figsize=(12, 6))
-    msno.bar(df_user, figsize=(12, 6))
-    plt.title('Vollständigkeit der Daten pro Spalte', fontsize=14, pad=20)
-    plt.tight_layout()
-    plt.savefig('scripts/outputs/missing_values_bar.png', dpi=150, bbox_inches='tight')
-    plt.close()
-    print("    ✓ Gespeichert: scripts/outputs/missing_values_bar.png")
-    
-    # 3. Heatmap (nur wenn sinnvoll)
+
+    # Matrix-, Bar-Plot und Heatmap (nur wenn sinnvoll) als Aufträge; unveränderte werden übersprungen
+    jobs = [
+        figures.FigureJob('missing_values_matrix', plots.missing_matrix,
+                          {'profile': nulls, 'title': 'Matrix fehlender Werte in user.csv'}),
+        figures.FigureJob('missing_values_bar', plots.missing_bar, {'profile': nulls}),
+    ]
     if len(df_user.columns) <= 30:
-        print("  - Heatmap...")
-        fig = plt.figure(figsize=(12, 8))
-        msno.heatmap(df_user, figsize=(12, 8))
-        plt.title('Korrelation fehlender Werte', fontsize=14, pad=20)
-        plt.tight_layout()
-        plt.savefig('scripts/outputs/missing_values_heatmap.png', dpi=150, bbox_inches='tight')
-        plt.close()
-        print("    ✓ Gespeichert: scripts/outputs/missing_values_heatmap.png")
+        jobs.append(figures.FigureJob('missing_values_heatmap', plots.missing_heatmap, {'profile': nulls}))
+
+    rendered, skipped = figures.render(jobs, output_dir=args.output_dir)
+    for name in rendered:
+        print(f"    ✓ Gespeichert: {os.path.join(args.output_dir, name)}.png")
+    for name in skipped:
+        print(f"    = Unverändert: {os.path.join(args.output_dir, name)}.png")
     
     print("\n✓ Alle Visualisierungen erfolgreich erstellt")
 else:
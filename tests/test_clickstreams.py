@@ -0,0 +1,74 @@
+"""Kompakte und stapelweise Darstellung der Clickstream-Daten (pipeline/clickstreams.py)."""
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from pipeline.clickstreams import (ClickstreamWriter, TIME_COLUMN, compact_time_dtype, iter_clickstreams,
+                                   load_clickstreams)
+from pipeline.dedup import DuplicateDetector
+
+
+@pytest.fixture
+def clickstreams_path(tmp_path):
+    """Zwei Stapel à 4 Zeilen: der erste exakt als float32 darstellbar, der zweite nicht."""
+    df = pd.DataFrame({
+        'session_user_id': ['a', 'b', 'a', 'c', 'b', 'a', 'd', 'c'],
+        'session_action': ['show', 'search', 'show', 'index', 'show', 'show', 'index', 'search'],
+        'session_action_type': ['view', 'click', 'view', '-unknown-', 'view', 'view', 'data', 'click'],
+        'session_action_detail': ['p3', 'p1', 'p3', '-unknown-', 'p3', 'p3', 'p5', 'p1'],
+        'session_device_type': ['Mac', 'iPhone', 'Mac', 'Mac', 'Mac', 'Mac', 'iPad', 'iPhone'],
+        TIME_COLUMN: [0.5, 12.0, 0.5, np.nan, 3.0, 0.5, 16777217.5, 7.25],
+    })
+    path = tmp_path / 'clickstreams.parquet'
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), path)
+    return str(path)
+
+
+def test_compact_time_dtype_is_exact():
+    assert compact_time_dtype(np.array([0.5, 3.0, np.nan])) == np.float32
+    # pd.to_numeric(downcast='float') würde hier mit Rundung reduzieren
+    assert compact_time_dtype(np.array([0.1])) == np.float64
+    assert compact_time_dtype(np.array([16777217.5])) == np.float64
+
+
+def test_batches_share_time_dtype_of_whole_file(clickstreams_path):
+    batches = list(iter_clickstreams(clickstreams_path, batch_size=4))
+    assert len(batches) == 2
+    assert all(batch[TIME_COLUMN].dtype == np.float64 for batch in batches)
+    expected = load_clickstreams(clickstreams_path)
+    streamed = pd.concat(batches, ignore_index=True)
+    assert streamed[TIME_COLUMN].dtype == expected[TIME_COLUMN].dtype
+    np.testing.assert_array_equal(streamed[TIME_COLUMN], expected[TIME_COLUMN])
+
+
+def test_streamed_output_matches_in_memory(clickstreams_path, tmp_path):
+    in_memory = tmp_path / 'in_memory.parquet'
+    streamed = tmp_path / 'streamed.parquet'
+    with ClickstreamWriter(str(in_memory)) as writer:
+        writer.write(load_clickstreams(clickstreams_path))
+    with ClickstreamWriter(str(streamed)) as writer:
+        for batch in iter_clickstreams(clickstreams_path, batch_size=4):
+            writer.write(batch)
+    pd.testing.assert_frame_equal(pd.read_parquet(streamed), pd.read_parquet(in_memory))
+    assert pd.read_parquet(streamed)[TIME_COLUMN].iloc[6] == 16777217.5
+
+
+def test_duplicates_across_batches(clickstreams_path):
+    with DuplicateDetector() as streamed:
+        for batch in iter_clickstreams(clickstreams_path, batch_size=4):
+            streamed.add(batch)
+    with DuplicateDetector() as in_memory:
+        in_memory.add(load_clickstreams(clickstreams_path))
+    # Zeile 0 wiederholt sich in Zeile 2 (erster Stapel) und in Zeile 5 (zweiter Stapel)
+    assert streamed.count == in_memory.count == 2
+
+
+def test_writer_rejects_lossy_cast(tmp_path):
+    path = str(tmp_path / 'out.parquet')
+    with ClickstreamWriter(path) as writer:
+        writer.write(pd.DataFrame({TIME_COLUMN: np.array([0.5, 3.0], dtype=np.float32)}))
+        with pytest.raises(ValueError, match=TIME_COLUMN):
+            writer.write(pd.DataFrame({TIME_COLUMN: [16777217.5]}))
@@ -0,0 +1,40 @@
+"""Dekodierung der Datumsformate aus user.csv (pipeline/dates.py)."""
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from pipeline.dates import DATE_FORMAT, TIMESTAMP_FORMAT, decode_dates, decode_timestamps, to_days
+
+DATES = ['2014-01-01', '2014-1-01', '2014-01-1', '2012-02-29', '2013-02-29', '2014-13-01',
+         '0000-01-01', '0001-01-01', '2014/01/01', '2014-01-01 ', '', None]
+TIMESTAMPS = ['20140101123456', '00000101000000', '20141301000000', '20140101240000',
+              '2014010112345', '201401011234567', '2014-01-01', '', None]
+
+
+def _expected(values, format, unit):
+    return pd.to_datetime(pd.Series(values, dtype=object), format=format, errors='coerce').to_numpy().astype(unit)
+
+
+@pytest.mark.parametrize('convert', [list, pa.array, lambda v: pd.Series(v, dtype='str')])
+def test_decode_dates_matches_to_datetime(convert):
+    np.testing.assert_array_equal(decode_dates(convert(DATES)), _expected(DATES, DATE_FORMAT, 'datetime64[D]'))
+
+
+@pytest.mark.parametrize('convert', [list, pa.array])
+def test_decode_timestamps_matches_to_datetime(convert):
+    np.testing.assert_array_equal(decode_timestamps(convert(TIMESTAMPS)),
+                                  _expected(TIMESTAMPS, TIMESTAMP_FORMAT, 'datetime64[s]'))
+
+
+def test_year_zero_timestamp_is_invalid():
+    # pd.to_datetime: '%Y%m%d%H%M%S' erst ab Jahr 1, '%Y-%m-%d' auch mit Jahr 0
+    assert np.isnat(decode_timestamps(['00000101000000'])).all()
+    assert decode_dates(['0000-01-01'])[0] == np.datetime64('0000-01-01')
+
+
+def test_to_days_reads_both_formats():
+    days = to_days(['2014-1-01', '20140102123456', '2014-01-03', 'x', None])
+    np.testing.assert_array_equal(days, np.array(['2014-01-01', '2014-01-02', '2014-01-03', 'NaT', 'NaT'],
+                                                 dtype='datetime64[D]'))
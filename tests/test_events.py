@@ -0,0 +1,31 @@
+"""Ereignisindex pro Benutzer (pipeline/events.py)."""
+
+import numpy as np
+import pandas as pd
+
+from pipeline.buckets import user_buckets, write_bucketed
+from pipeline.clickstreams import TIME_COLUMN, USER_ID_COLUMN
+from pipeline.events import EventIndex, build_event_index
+
+
+def _user_in_bucket(bucket, num_buckets):
+    return next(f'u{i}' for i in range(100) if user_buckets(pd.Series([f'u{i}']), num_buckets)[0] == bucket)
+
+
+def test_time_values_survive_buckets_with_different_downcasts(tmp_path):
+    # Bucket 0 ist nur als float64 exakt, Bucket 1 (zuletzt gelesen) auch als float32
+    exact, compact = _user_in_bucket(0, 2), _user_in_bucket(1, 2)
+    df = pd.DataFrame({
+        USER_ID_COLUMN: pd.Categorical([exact, exact, compact, None]),
+        'session_action': pd.Categorical(['show', 'search', 'show', 'show']),
+        TIME_COLUMN: np.array([16777217.5, 0.25, 0.5, 1.0]),
+    })
+    source = str(tmp_path / 'clickstreams_filtered.parquet')
+    write_bucketed(df, source, num_buckets=2)
+
+    path = str(tmp_path / 'events')
+    assert build_event_index(source, path) == (2, 3)
+    index = EventIndex(path)
+    assert index.events(exact)[TIME_COLUMN].tolist() == [16777217.5, 0.25]
+    assert index.events(compact)[TIME_COLUMN].tolist() == [0.5]
+    assert index.events(exact)['session_action'].tolist() == ['show', 'search']
@@ -0,0 +1,50 @@
+"""Inkrementelle Bereinigung über mehrere Lieferungen (pipeline/incremental.py)."""
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from pipeline.clickstreams import TIME_COLUMN, load_clickstreams
+from pipeline.dedup import row_fingerprints
+from pipeline.incremental import append_partitions
+
+
+def _partition(times):
+    return pd.DataFrame({
+        'session_user_id': ['a'] * len(times),
+        'session_action': ['show'] * len(times),
+        'session_action_type': ['view'] * len(times),
+        'session_action_detail': ['p3'] * len(times),
+        'session_device_type': ['Mac'] * len(times),
+        TIME_COLUMN: times,
+    })
+
+
+def _write(df, path):
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), path)
+
+
+def test_fingerprints_do_not_depend_on_float_width():
+    df = _partition([0.5, 3.0])
+    narrow = df.astype({TIME_COLUMN: np.float32})
+    np.testing.assert_array_equal(row_fingerprints(narrow), row_fingerprints(df))
+    np.testing.assert_array_equal(row_fingerprints(narrow, bits=128), row_fingerprints(df, bits=128))
+
+
+def test_duplicate_across_partitions_with_different_downcasts(tmp_path):
+    input_dir = tmp_path / 'clickstreams'
+    input_dir.mkdir()
+    # Erste Lieferung exakt als float32 darstellbar, zweite nicht (bleibt float64)
+    _write(_partition([0.5, 3.0]), input_dir / '2014-01-01.parquet')
+    _write(_partition([0.5, 16777217.5]), input_dir / '2014-01-02.parquet')
+    output_dir = tmp_path / 'clickstreams_filtered'
+    assert load_clickstreams(str(input_dir / '2014-01-01.parquet'))[TIME_COLUMN].dtype == np.float32
+    assert load_clickstreams(str(input_dir / '2014-01-02.parquet'))[TIME_COLUMN].dtype == np.float64
+
+    state, processed = append_partitions(str(input_dir), str(output_dir))
+    assert [entry['duplicates'] for entry in processed] == [0, 1]
+
+    # Die Ausgabe wird mit dem erweiterten Typ gelesen (keine Rundung auf float32)
+    df = load_clickstreams(str(output_dir))
+    assert df[TIME_COLUMN].tolist() == [0.5, 3.0, 16777217.5]
@@ -0,0 +1,25 @@
+"""Prüfregeln und Normalisierung der Benutzerdaten (pipeline/rules.py)."""
+
+import numpy as np
+import pandas as pd
+
+from pipeline.rules import normalize_gender
+
+
+def test_normalize_gender_keeps_categorical():
+    series = pd.Series(pd.Categorical(['MALE', 'female', None, '-unknown-', 'FEMALE']), name='user_gender')
+    result = normalize_gender(series)
+    assert isinstance(result.dtype, pd.CategoricalDtype)
+    assert result.name == 'user_gender'
+    assert sorted(result.cat.categories) == ['-unknown-', 'female', 'male']
+    # 'FEMALE' und 'female' werden zu einer Kategorie zusammengeführt
+    pd.testing.assert_series_equal(result.astype(object), normalize_gender(series.astype(object)))
+
+
+def test_normalize_gender_invalid_to_nan():
+    series = pd.Series(pd.Categorical(['MALE', '-unknown-', 'OTHER']))
+    result = normalize_gender(series, invalid_to_nan=True)
+    assert list(result.cat.categories) == ['male', 'other']
+    assert result.isna().tolist() == [False, True, False]
+    np.testing.assert_array_equal(result.astype(object).isna(),
+                                  normalize_gender(series.astype(object), invalid_to_nan=True).isna())
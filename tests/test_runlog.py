@@ -0,0 +1,45 @@
+"""Laufprotokoll (pipeline/runlog.py)."""
+
+import json
+
+import pytest
+
+from pipeline import runlog
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """Leeres Arbeitsverzeichnis, Protokoll abgeschaltet und ohne Umgebungsvariable."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv(runlog.ENV_VARIABLE, raising=False)
+    monkeypatch.setattr(runlog, '_enabled', False)
+    return tmp_path
+
+
+@runlog.measured('test.square')
+def _square(x):
+    return x * x
+
+
+def test_library_use_writes_nothing(workdir):
+    assert _square(3) == 9
+    assert runlog.log_path() is None
+    assert not (workdir / 'scripts').exists()
+
+
+def test_enable_writes_default_log(workdir):
+    runlog.enable()
+    _square(3)
+    records = [json.loads(line) for line in (workdir / runlog.RUN_LOG_PATH).read_text().splitlines()]
+    assert [record['step'] for record in records] == ['test.square']
+
+
+def test_environment_variable_takes_precedence(workdir, monkeypatch):
+    monkeypatch.setenv(runlog.ENV_VARIABLE, str(workdir / 'custom.jsonl'))
+    _square(3)
+    assert (workdir / 'custom.jsonl').exists()
+
+    runlog.enable()
+    monkeypatch.setenv(runlog.ENV_VARIABLE, '')
+    _square(3)
+    assert not (workdir / 'scripts').exists()
@@ -0,0 +1,59 @@
+"""Schlüssel des Stufen-Caches (pipeline/stages.py)."""
+
+import os
+import shutil
+
+import pytest
+
+from pipeline import stages
+
+# Darstellung und Messung: von I und II importiert, aber nicht Teil der Stufenschlüssel
+PRESENTATION_MODULES = ['pipeline/plots.py', 'pipeline/figures.py', 'pipeline/nullity.py', 'pipeline/runlog.py']
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    """Kopie der Skripte und des pipeline-Pakets mit Platzhaltern für Ein- und Ausgaben."""
+    for stage in stages.STAGES:
+        for path in stage.code_files():
+            target = tmp_path / path
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy(os.path.join(stages.PROJECT_ROOT, path), target)
+    for stage in stages.STAGES:
+        for path in stage.inputs + stage.outputs:
+            target = tmp_path / path
+            if not target.exists():
+                target.parent.mkdir(parents=True, exist_ok=True)
+                target.write_text(path)
+    for module in PRESENTATION_MODULES:
+        shutil.copy(os.path.join(stages.PROJECT_ROOT, module), tmp_path / module)
+    monkeypatch.setattr(stages, 'PROJECT_ROOT', str(tmp_path))
+    for stage in stages.STAGES:
+        stages._save_manifest(stage, {
+            'key': stage.key(),
+            'outputs': {path: stages.path_hash(stages._path(path)) for path in stage.outputs},
+        })
+    return tmp_path
+
+
+def _append_comment(path):
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('\n# Kommentar\n')
+
+
+@pytest.mark.parametrize('module', PRESENTATION_MODULES)
+def test_plot_change_keeps_data_stages_cached(project, module):
+    _append_comment(project / module)
+    for name in ('users', 'clickstreams', 'eda'):
+        assert stages.status(stages.get_stage(name)) == (True, 'aktuell')
+
+
+def test_presentation_modules_not_in_stage_code():
+    for stage in stages.STAGES:
+        assert not set(PRESENTATION_MODULES) & set(stage.code_files()), stage.name
+
+
+def test_cleaning_change_invalidates_stage(project):
+    _append_comment(project / 'pipeline' / 'cleaning.py')
+    assert stages.status(stages.get_stage('clickstreams')) == (False, 'Eingaben, Code oder Parameter geändert')
+    assert stages.status(stages.get_stage('users')) == (True, 'aktuell')